@@ -1,8 +1,9 @@
 from django.contrib import admin
 from .models import (
-    Role, Utilisateur, Produit, HistoriquePrix,
+    Role, Utilisateur, Produit, HistoriquePrix, IndicateurPrix, ObservationVentes,
     Entrepot, Emplacement, Lot, MouvementStock,
-    Livraison, LigneLivraison, PrevisionDemande, Tournee
+    Livraison, LigneLivraison, PrevisionDemande, NiveauReapprovisionnement, Tournee,
+    Compteur, SnapshotStock, MouvementStockArchive, ResumeMouvementMensuel, JetonAPI
 )
 
 
@@ -78,6 +79,24 @@ class HistoriquePrixAdmin(admin.ModelAdmin):
     list_filter = ('produit', 'date')
 
 
+@admin.register(IndicateurPrix)
+class IndicateurPrixAdmin(admin.ModelAdmin):
+    list_display = (
+        'produit', 'date', 'prix_moyen', 'moyenne_7j', 'moyenne_30j',
+        'volatilite_30j', 'ecart_reference', 'nb_releves'
+    )
+    list_filter = ('produit',)
+    date_hierarchy = 'date'
+    readonly_fields = ('date_calcul',)
+
+
+@admin.register(ObservationVentes)
+class ObservationVentesAdmin(admin.ModelAdmin):
+    list_display = ('date_observation', 'produit', 'superficie_totale', 'mois', 'ventes')
+    list_filter = ('produit', 'mois')
+    date_hierarchy = 'date_observation'
+
+
 # ====================
 # ENTREPOT
 # ====================
@@ -126,6 +145,41 @@ class MouvementStockAdmin(admin.ModelAdmin):
     readonly_fields = ('date',)
 
 
+# ====================
+# ARCHIVE MOUVEMENTS
+# ====================
+@admin.register(MouvementStockArchive)
+class MouvementStockArchiveAdmin(admin.ModelAdmin):
+    list_display = (
+        'id', 'lot', 'type_mouvement', 'quantite',
+        'source_emplacement', 'destination_emplacement',
+        'utilisateur', 'date'
+    )
+    list_filter = ('type_mouvement',)
+    search_fields = ('lot__code_lot',)
+
+
+@admin.register(ResumeMouvementMensuel)
+class ResumeMouvementMensuelAdmin(admin.ModelAdmin):
+    list_display = (
+        'mois', 'lot', 'type_mouvement',
+        'entrepot_source', 'entrepot_destination',
+        'quantite_totale', 'nombre_mouvements'
+    )
+    list_filter = ('mois', 'type_mouvement')
+    search_fields = ('lot__code_lot',)
+
+
+# ====================
+# SNAPSHOT STOCK
+# ====================
+@admin.register(SnapshotStock)
+class SnapshotStockAdmin(admin.ModelAdmin):
+    list_display = ('date', 'lot', 'entrepot', 'quantite')
+    list_filter = ('date', 'entrepot')
+    search_fields = ('lot__code_lot',)
+
+
 # ====================
 # LIVRAISON
 # ====================
@@ -155,8 +209,18 @@ class LigneLivraisonAdmin(admin.ModelAdmin):
 # ====================
 @admin.register(PrevisionDemande)
 class PrevisionDemandeAdmin(admin.ModelAdmin):
-    list_display = ('produit', 'periode', 'quantite_prevue', 'date_calcul')
-    list_filter = ('produit', 'periode')
+    list_display = ('produit', 'entrepot', 'periode', 'quantite_prevue', 'version_modele', 'date_calcul')
+    list_filter = ('produit', 'entrepot', 'version_modele')
+    readonly_fields = ('date_calcul',)
+
+
+@admin.register(NiveauReapprovisionnement)
+class NiveauReapprovisionnementAdmin(admin.ModelAdmin):
+    list_display = (
+        'produit', 'entrepot', 'stock', 'demande_journaliere', 'stock_securite',
+        'point_commande', 'jours_couverture', 'sous_seuil', 'date_calcul'
+    )
+    list_filter = ('sous_seuil', 'entrepot', 'produit')
     readonly_fields = ('date_calcul',)
 
 
@@ -171,3 +235,27 @@ class TourneeAdmin(admin.ModelAdmin):
     list_filter = ('entrepot', 'date')
     readonly_fields = ('date',)
 
+
+
+# ====================
+# COMPTEUR
+# ====================
+@admin.register(Compteur)
+class CompteurAdmin(admin.ModelAdmin):
+    list_display = ('nom', 'valeur')
+    search_fields = ('nom',)
+
+
+# ====================
+# JETON D'API
+# ====================
+@admin.register(JetonAPI)
+class JetonAPIAdmin(admin.ModelAdmin):
+    list_display = ('nom', 'utilisateur', 'prefixe', 'actif', 'date_creation', 'derniere_utilisation')
+    list_filter = ('actif',)
+    search_fields = ('nom', 'prefixe', 'utilisateur__username')
+    readonly_fields = ('utilisateur', 'prefixe', 'cle_hachee', 'date_creation', 'derniere_utilisation')
+
+    def has_add_permission(self, request):
+        # La clé n'est connue qu'à la création : manage.py creer_jeton_api
+        return False
@@ -0,0 +1,128 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .fragments import modeles_modifies
+from .models import (
+    MouvementStock, MouvementStockArchive, ResumeMouvementMensuel, SnapshotStock
+)
+
+
+RETENTION_MOIS_PAR_DEFAUT = 12
+TAILLE_LOT_ARCHIVAGE = 2000
+
+CHAMPS_MOUVEMENT = (
+    'id', 'lot_id', 'type_mouvement', 'quantite',
+    'source_emplacement_id', 'destination_emplacement_id',
+    'utilisateur_id', 'date',
+)
+
+
+def _premier_du_mois(jour):
+    return jour.replace(day=1)
+
+
+def _mois_suivant(mois):
+    return (mois.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _debut(jour):
+    return timezone.make_aware(datetime.combine(jour, time.min))
+
+
+def date_limite_archivage(retention_mois=None):
+    """Premier jour du plus ancien mois conservé dans la table principale."""
+    if retention_mois is None:
+        retention_mois = getattr(settings, 'MOUVEMENTS_RETENTION_MOIS', RETENTION_MOIS_PAR_DEFAUT)
+    mois = _premier_du_mois(timezone.localdate())
+    for _ in range(retention_mois):
+        mois = (mois - timedelta(days=1)).replace(day=1)
+    return mois
+
+
+@transaction.atomic
+def archiver_mois(mois):
+    """
+    Déplace les mouvements d'un mois vers l'archive et écrit leur résumé.
+
+    Renvoie le nombre de mouvements archivés.
+    """
+    mois = _premier_du_mois(mois)
+    chauds = MouvementStock.objects.filter(
+        date__gte=_debut(mois), date__lt=_debut(_mois_suivant(mois))
+    )
+
+    resumes = chauds.values(
+        'lot_id', 'type_mouvement',
+        'source_emplacement__entrepot_id', 'destination_emplacement__entrepot_id',
+    ).annotate(total=Sum('quantite'), nombre=Count('id'))
+    ResumeMouvementMensuel.objects.bulk_create([
+        ResumeMouvementMensuel(
+            mois=mois,
+            lot_id=r['lot_id'],
+            type_mouvement=r['type_mouvement'],
+            entrepot_source_id=r['source_emplacement__entrepot_id'],
+            entrepot_destination_id=r['destination_emplacement__entrepot_id'],
+            quantite_totale=r['total'],
+            nombre_mouvements=r['nombre'],
+        )
+        for r in resumes
+    ])
+
+    archives = 0
+    lot_courant = []
+    for ligne in chauds.values(*CHAMPS_MOUVEMENT).iterator(chunk_size=TAILLE_LOT_ARCHIVAGE):
+        lot_courant.append(MouvementStockArchive(**ligne))
+        if len(lot_courant) >= TAILLE_LOT_ARCHIVAGE:
+            MouvementStockArchive.objects.bulk_create(lot_courant)
+            archives += len(lot_courant)
+            lot_courant = []
+    if lot_courant:
+        MouvementStockArchive.objects.bulk_create(lot_courant)
+        archives += len(lot_courant)
+
+    # Un seul DELETE, sans charger les lignes pour les signaux post_delete :
+    # aucune table ne référence les mouvements, le tampon est changé ici
+    chauds._raw_delete(chauds.db)
+    modeles_modifies('MouvementStock')
+    return archives
+
+
+def alleger_snapshots(avant):
+    """Avant `avant`, ne garde que le snapshot du dernier jour de chaque mois."""
+    premier = SnapshotStock.objects.filter(date__lt=avant).order_by('date').values_list('date', flat=True).first()
+    if premier is None:
+        return 0
+
+    fins_de_mois = []
+    mois = _premier_du_mois(premier)
+    while mois < avant:
+        fins_de_mois.append(_mois_suivant(mois) - timedelta(days=1))
+        mois = _mois_suivant(mois)
+
+    supprimes, _ = SnapshotStock.objects.filter(date__lt=avant).exclude(date__in=fins_de_mois).delete()
+    return supprimes
+
+
+def archiver_mouvements(retention_mois=None):
+    """
+    Archive, mois par mois, tous les mouvements antérieurs à la rétention.
+
+    Renvoie {mois: nombre de mouvements archivés}.
+    """
+    limite = date_limite_archivage(retention_mois)
+    plus_ancien = MouvementStock.objects.filter(date__lt=_debut(limite)).order_by('date').first()
+
+    resultat = {}
+    if plus_ancien is not None:
+        mois = _premier_du_mois(timezone.localtime(plus_ancien.date).date())
+        while mois < limite:
+            resultat[mois] = archiver_mois(mois)
+            mois = _mois_suivant(mois)
+
+    alleger_snapshots(limite)
+    return resultat
+
@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+UserModel = get_user_model()
+
+
+class UtilisateurRoleBackend(ModelBackend):
+    """
+    ModelBackend qui charge le rôle avec l'utilisateur (select_related).
+
+    Les vérifications `request.user.role.nom` ne coûtent ainsi plus de
+    requête supplémentaire, et le rôle est relu à chaque requête : un
+    changement de rôle est pris en compte immédiatement.
+    """
+
+    def _utilisateurs(self):
+        return UserModel._default_manager.select_related('role')
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = self._utilisateurs().get(**{UserModel.USERNAME_FIELD: username})
+        except UserModel.DoesNotExist:
+            # Hachage factice pour ne pas révéler l'existence du compte par le temps de réponse
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
+
+    def get_user(self, user_id):
+        try:
+            user = self._utilisateurs().get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,130 @@
+import math
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_date
+
+from .fragments import modeles_modifies
+from .models import Livraison, LigneLivraison
+from .referentiel import ids_produits as produits_connus
+from .sequences import prochains_numeros
+
+
+def _valider_commandes(commandes):
+    """
+    Vérifie et normalise une liste de commandes :
+    [{'date_livraison': 'AAAA-MM-JJ', 'cle_idempotence': '...',
+      'lignes': [{'produit': id, 'quantite': kg}, ...]}, ...]
+    """
+    if not isinstance(commandes, list) or not commandes:
+        raise ValidationError("Aucune commande fournie")
+
+    ids_produits = set()
+    normalisees = []
+    for i, commande in enumerate(commandes, start=1):
+        if not isinstance(commande, dict):
+            raise ValidationError(f"Commande {i} : format invalide")
+
+        date_livraison = commande.get('date_livraison')
+        if not isinstance(date_livraison, str) or parse_date(date_livraison) is None:
+            raise ValidationError(f"Commande {i} : date de livraison invalide")
+
+        cle = commande.get('cle_idempotence') or None
+        if cle is not None and (not isinstance(cle, str) or len(cle) > 64):
+            raise ValidationError(f"Commande {i} : clé d'idempotence invalide")
+
+        lignes = commande.get('lignes')
+        if not isinstance(lignes, list) or not lignes:
+            raise ValidationError(f"Commande {i} : aucune ligne")
+
+        lignes_normalisees = []
+        for j, ligne in enumerate(lignes, start=1):
+            try:
+                produit_id = int(ligne['produit'])
+                quantite = float(ligne['quantite'])
+            except (KeyError, TypeError, ValueError):
+                raise ValidationError(f"Commande {i}, ligne {j} : produit ou quantité invalide")
+            # float() accepte "nan" et "inf", que la comparaison seule laisserait passer
+            if not math.isfinite(quantite) or quantite <= 0:
+                raise ValidationError(f"Commande {i}, ligne {j} : la quantité doit être positive")
+            ids_produits.add(produit_id)
+            lignes_normalisees.append((produit_id, quantite))
+
+        normalisees.append({
+            'date_livraison': parse_date(date_livraison),
+            'cle_idempotence': cle,
+            'lignes': lignes_normalisees,
+        })
+
+    cles = [c['cle_idempotence'] for c in normalisees if c['cle_idempotence']]
+    if len(cles) != len(set(cles)):
+        raise ValidationError("Clé d'idempotence en double dans la requête")
+
+    inconnus = ids_produits - produits_connus()
+    if inconnus:
+        raise ValidationError(f"Produit(s) inconnu(s) : {sorted(inconnus)}")
+
+    return normalisees
+
+
+def _livraisons_existantes(grossiste, cles):
+    if not cles:
+        return {}
+    return {
+        l.cle_idempotence: l
+        for l in Livraison.objects.filter(grossiste=grossiste, cle_idempotence__in=cles)
+    }
+
+
+def creer_commandes(grossiste, commandes):
+    """
+    Crée plusieurs commandes multi-produits en une seule transaction.
+
+    Les commandes dont la clé d'idempotence existe déjà pour ce grossiste
+    ne sont pas recréées : la livraison existante est renvoyée.
+    Renvoie une liste de tuples (livraison, creee) dans l'ordre des commandes.
+    """
+    normalisees = _valider_commandes(commandes)
+    cles = [c['cle_idempotence'] for c in normalisees if c['cle_idempotence']]
+
+    # Deux tentatives : une requête rejouée en parallèle peut insérer
+    # la même clé entre notre lecture et notre écriture.
+    for tentative in range(2):
+        existantes = _livraisons_existantes(grossiste, cles)
+        a_creer = [c for c in normalisees if c['cle_idempotence'] not in existantes]
+
+        # Numéros réservés hors transaction pour profiter des blocs
+        numeros = prochains_numeros('LIV', len(a_creer)) if a_creer else []
+
+        try:
+            with transaction.atomic():
+                livraisons = Livraison.objects.bulk_create([
+                    Livraison(
+                        numero=numero,
+                        grossiste=grossiste,
+                        statut='PREPARATION',
+                        date_livraison=c['date_livraison'],
+                        cle_idempotence=c['cle_idempotence'],
+                    )
+                    for numero, c in zip(numeros, a_creer)
+                ])
+                LigneLivraison.objects.bulk_create([
+                    LigneLivraison(livraison=livraison, produit_id=produit_id, quantite=quantite)
+                    for livraison, c in zip(livraisons, a_creer)
+                    for produit_id, quantite in c['lignes']
+                ])
+                # bulk_create n'envoie pas post_save
+                modeles_modifies('Livraison')
+            break
+        except IntegrityError:
+            if tentative == 1 or not cles:
+                raise
+
+    creees = iter(livraisons)
+    resultat = []
+    for c in normalisees:
+        if c['cle_idempotence'] in existantes:
+            resultat.append((existantes[c['cle_idempotence']], False))
+        else:
+            resultat.append((next(creees), True))
+    return resultat
@@ -0,0 +1,61 @@
+from functools import wraps
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.shortcuts import redirect
+from django.views.decorators.csrf import csrf_exempt
+
+from .jetons import utilisateur_du_jeton
+
+
+def _refus_csrf(request):
+    """Réponse d'échec de la vérification CSRF du middleware, ou None si la requête est valide."""
+    return CsrfViewMiddleware(lambda r: None).process_view(request, None, (), {})
+
+
+def _non_authentifie(message):
+    reponse = JsonResponse({'error': message}, status=401)
+    reponse['WWW-Authenticate'] = 'Bearer'
+    return reponse
+
+
+def role_requis(*roles, message=None, api=False):
+    """
+    Réserve une vue aux utilisateurs connectés ayant l'un des rôles donnés.
+
+    Sinon : redirection vers l'accueil (avec `message` en erreur s'il est
+    fourni), ou réponse JSON 403 pour les vues `api`.
+
+    Les vues `api` acceptent aussi un jeton (`Authorization: Bearer <clé>`,
+    voir `manage.py creer_jeton_api`), sans vérification CSRF puisqu'aucun
+    cookie n'est en jeu ; la session reste soumise au jeton CSRF. Un appel
+    non authentifié reçoit un JSON 401 au lieu de la redirection vers la
+    page de connexion.
+    """
+    def decorateur(vue):
+        @wraps(vue)
+        def _vue(request, *args, **kwargs):
+            if api:
+                autorisation = request.headers.get('Authorization', '')
+                if autorisation.startswith('Bearer '):
+                    utilisateur = utilisateur_du_jeton(autorisation[len('Bearer '):].strip())
+                    if utilisateur is None:
+                        return _non_authentifie("Jeton d'API invalide")
+                    request.user = utilisateur
+                elif not request.user.is_authenticated:
+                    return _non_authentifie("Authentification requise")
+                elif _refus_csrf(request) is not None:
+                    return JsonResponse({'error': "Jeton CSRF manquant ou invalide"}, status=403)
+
+            role = request.user.role.nom if request.user.role else None
+            if role not in roles:
+                if api:
+                    return JsonResponse({'error': message or "Accès refusé"}, status=403)
+                if message:
+                    messages.error(request, message)
+                return redirect('index')
+            return vue(request, *args, **kwargs)
+        return csrf_exempt(_vue) if api else login_required(_vue)
+    return decorateur
@@ -0,0 +1,128 @@
+"""
+Jeu de données synthétique pour les mesures de performance et les tests.
+
+Toutes les lignes créées portent le préfixe PREFIXE afin de pouvoir être
+supprimées sans toucher aux vraies données. Base de développement uniquement.
+"""
+import random
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import (
+    Role, Utilisateur, Produit, Entrepot, Emplacement, Lot,
+    MouvementStock, Livraison, LigneLivraison
+)
+
+
+PREFIXE = 'BENCH'
+
+
+def supprimer_donnees():
+    Livraison.objects.filter(numero__startswith=PREFIXE).delete()
+    Lot.objects.filter(code_lot__startswith=PREFIXE).delete()
+    Utilisateur.objects.filter(username__startswith=PREFIXE.lower()).delete()
+    Emplacement.objects.filter(code_emplacement__startswith=PREFIXE).delete()
+    Entrepot.objects.filter(nom__startswith=PREFIXE).delete()
+    Produit.objects.filter(nom__startswith=PREFIXE).delete()
+
+
+@transaction.atomic
+def generer_donnees(nb_mouvements, graine=42):
+    """
+    Crée nb_mouvements mouvements, nb_mouvements / 10 lots, nb_mouvements / 5
+    livraisons et les utilisateurs, produits et entrepôts associés.
+
+    Renvoie le nombre d'objets créés par type.
+    """
+    rng = random.Random(graine)
+    aujourd_hui = timezone.localdate()
+    maintenant = timezone.now()
+
+    roles = {
+        nom: Role.objects.get_or_create(nom=nom)[0]
+        for nom in ('GROSSISTE', 'LIVREUR', 'STOCK', 'GERANT')
+    }
+
+    produits = Produit.objects.bulk_create([
+        Produit(nom=f"{PREFIXE} {type_} {i}", type_produit=type_, unite='kg', prix_reference=1000)
+        for i in range(2) for type_ in ('CAFE', 'CACAO')
+    ])
+    entrepots = Entrepot.objects.bulk_create([
+        Entrepot(nom=f"{PREFIXE} entrepot {i}", latitude=6 + i / 10, longitude=1 + i / 10)
+        for i in range(5)
+    ])
+    emplacements = Emplacement.objects.bulk_create([
+        Emplacement(entrepot=e, code_emplacement=f"{PREFIXE}-{e.id}-{j}")
+        for e in entrepots for j in range(10)
+    ])
+
+    def utilisateur(role, i):
+        nom = f"{PREFIXE.lower()}_{role.nom.lower()}_{i}"
+        return Utilisateur(
+            username=nom, email=f"{nom}@bench.local", password='!',
+            nom=nom, prenom=role.nom, role=role, actif=rng.random() > 0.1,
+            latitude=6 + rng.random(), longitude=1 + rng.random(),
+        )
+
+    grossistes = Utilisateur.objects.bulk_create([utilisateur(roles['GROSSISTE'], i) for i in range(200)])
+    livreurs = Utilisateur.objects.bulk_create([utilisateur(roles['LIVREUR'], i) for i in range(20)])
+    magasiniers = Utilisateur.objects.bulk_create([utilisateur(roles['STOCK'], i) for i in range(10)])
+    gerants = Utilisateur.objects.bulk_create([utilisateur(roles['GERANT'], i) for i in range(2)])
+
+    nb_lots = max(nb_mouvements // 10, 10)
+    lots = []
+    for i in range(nb_lots):
+        quantite = rng.uniform(100, 5000)
+        lots.append(Lot(
+            code_lot=f"{PREFIXE}-LOT-{i:07d}",
+            produit=rng.choice(produits),
+            quantite_initiale=quantite,
+            quantite_restante=quantite if rng.random() > 0.7 else 0,
+            date_production=aujourd_hui - timedelta(days=rng.randint(0, 730)),
+            emplacement=rng.choice(emplacements),
+        ))
+    lots = Lot.objects.bulk_create(lots, batch_size=1000)
+
+    mouvements = []
+    for _ in range(nb_mouvements):
+        lot = rng.choice(lots)
+        type_ = rng.choice(['ENTREE', 'SORTIE', 'SORTIE', 'TRANSFERT'])
+        mouvements.append(MouvementStock(
+            lot=lot,
+            type_mouvement=type_,
+            quantite=rng.uniform(1, 200),
+            source_emplacement=None if type_ == 'ENTREE' else lot.emplacement,
+            destination_emplacement=None if type_ == 'SORTIE' else rng.choice(emplacements),
+            utilisateur=rng.choice(magasiniers),
+        ))
+    mouvements = MouvementStock.objects.bulk_create(mouvements, batch_size=2000)
+    # `date` est en auto_now_add : on étale les dates après coup
+    for mv in mouvements:
+        mv.date = maintenant - timedelta(minutes=rng.randint(0, 730 * 24 * 60))
+    MouvementStock.objects.bulk_update(mouvements, ['date'], batch_size=2000)
+
+    nb_livraisons = max(nb_mouvements // 5, 10)
+    livraisons = Livraison.objects.bulk_create([
+        Livraison(
+            numero=f"{PREFIXE}-LIV-{i:07d}",
+            grossiste=rng.choice(grossistes),
+            livreur=rng.choice(livreurs) if rng.random() > 0.2 else None,
+            statut=rng.choice(['PREPARATION', 'EN_ROUTE', 'LIVREE', 'LIVREE', 'LIVREE']),
+            date_livraison=aujourd_hui + timedelta(days=rng.randint(-365, 30)),
+        )
+        for i in range(nb_livraisons)
+    ], batch_size=2000)
+    lignes = LigneLivraison.objects.bulk_create([
+        LigneLivraison(livraison=l, produit=rng.choice(produits), quantite=rng.uniform(10, 500))
+        for l in livraisons for _ in range(rng.randint(1, 3))
+    ], batch_size=2000)
+
+    return {
+        'utilisateurs': len(grossistes) + len(livreurs) + len(magasiniers) + len(gerants),
+        'lots': len(lots),
+        'mouvements': len(mouvements),
+        'livraisons': len(livraisons),
+        'lignes': len(lignes),
+    }
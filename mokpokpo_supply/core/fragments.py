@@ -0,0 +1,54 @@
+"""
+Clés des fragments de template mis en cache ({% cache %}) sur les tableaux de bord.
+
+Une clé combine les tampons des modèles affichés par le fragment (voir
+versions.py) : toute écriture sur l'un d'eux, signalée par post_save /
+post_delete, rend la clé caduque sans purge explicite.
+"""
+from django.conf import settings
+
+from .models import Lot, Livraison, LigneLivraison, MouvementStock, Utilisateur
+from .referentiel import version_referentiel
+from .versions import version, changer_version_apres_commit
+
+
+DUREE_CACHE_FRAGMENTS = 600
+
+# Modèle modifié -> tampons à changer
+MODELES_SUIVIS = {
+    MouvementStock: ['MouvementStock'],
+    Lot: ['Lot'],
+    Livraison: ['Livraison'],
+    LigneLivraison: ['Livraison'],
+    Utilisateur: ['Utilisateur'],
+}
+
+# Fragment -> (tampons de modèles, jeux du référentiel)
+FRAGMENTS = {
+    'mouvements': (['MouvementStock', 'Lot', 'Utilisateur'], ['emplacements', 'entrepots']),
+    'employes': (['Utilisateur'], ['roles']),
+    'livraisons': (['Livraison', 'Utilisateur'], ['produits', 'entrepots', 'livreurs']),
+    'reapprovisionnement': (['NiveauReapprovisionnement'], ['produits', 'entrepots']),
+    'prix': (['IndicateurPrix'], ['produits']),
+}
+
+FILTRES_MOUVEMENTS = ('type', 'lot', 'entrepot', 'du', 'au')
+
+
+def duree_cache_fragments():
+    return getattr(settings, 'DUREE_CACHE_FRAGMENTS', DUREE_CACHE_FRAGMENTS)
+
+
+def modeles_modifies(*noms):
+    changer_version_apres_commit(*noms)
+
+
+def cle_fragment(nom, *variantes):
+    """Clé à passer en vary_on de {% cache %} pour le fragment `nom`."""
+    modeles, jeux = FRAGMENTS[nom]
+    return ":".join([version(*modeles), version_referentiel(*jeux), *map(str, variantes)])
+
+
+def cle_mouvements(params):
+    """Ne retient que les filtres reconnus : un paramètre parasite ne crée pas de nouvelle entrée."""
+    return cle_fragment('mouvements', *(params.get(f, '') for f in FILTRES_MOUVEMENTS))
@@ -1,3 +0,0 @@
-#!/usr/bin/python3
-
-print("give me a bottle of rum!")
@@ -0,0 +1,94 @@
+"""
+Cache mémoire des prédictions du modèle de ventes, propre à chaque processus.
+
+Clé : (version du modèle, vecteur de features normalisé). Les entrées sont
+bornées en nombre (éviction de la moins récemment utilisée) et en durée
+(TTL) ; un changement de version du modèle les rend inaccessibles sans purge.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+TAILLE_CACHE = 4096
+DUREE_CACHE = 3600  # secondes
+DECIMALES = 6  # 10.5 et 10.500000001 donnent la même clé
+
+
+def normaliser(ligne):
+    return tuple(round(float(v), DECIMALES) + 0.0 for v in ligne)
+
+
+class CachePredictions:
+
+    def __init__(self, taille=TAILLE_CACHE, duree=DUREE_CACHE):
+        self.taille = taille
+        self.duree = duree
+        self._entrees = OrderedDict()  # clé -> (expiration, prédiction)
+        self._verrou = threading.Lock()
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def lire(self, version, ligne):
+        """Prédiction en cache, ou None."""
+        cle = (version, normaliser(ligne))
+        maintenant = time.monotonic()
+        with self._verrou:
+            entree = self._entrees.get(cle)
+            if entree is not None and entree[0] <= maintenant:
+                del self._entrees[cle]
+                self.expirations += 1
+                entree = None
+            if entree is None:
+                self.echecs += 1
+                return None
+            self._entrees.move_to_end(cle)
+            self.succes += 1
+            return entree[1]
+
+    def ecrire(self, version, ligne, prediction):
+        cle = (version, normaliser(ligne))
+        with self._verrou:
+            self._entrees[cle] = (time.monotonic() + self.duree, prediction)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille:
+                self._entrees.popitem(last=False)
+                self.evictions += 1
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+
+    def statistiques(self):
+        total = self.succes + self.echecs
+        return {
+            'entrees': len(self._entrees),
+            'taille_max': self.taille,
+            'duree': self.duree,
+            'succes': self.succes,
+            'echecs': self.echecs,
+            'taux_succes': self.succes / total if total else None,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+
+_cache = None
+_verrou_cache = threading.Lock()
+
+
+def cache_predictions():
+    """Cache unique du processus, créé au premier appel."""
+    global _cache
+    if _cache is None:
+        with _verrou_cache:
+            if _cache is None:
+                _cache = CachePredictions(
+                    getattr(settings, 'ML_CACHE_PREDICTIONS_TAILLE', TAILLE_CACHE),
+                    getattr(settings, 'ML_CACHE_PREDICTIONS_DUREE', DUREE_CACHE),
+                )
+    return _cache
@@ -1,47 +1,183 @@
-# import matplotlib.pyplot as plt
-# import matplotlib
-# matplotlib.use('Agg')  # Mode non-interactif pour Django
-# import numpy as np
-# import io
-# import base64
-# from django.conf import settings
+"""
+Graphiques de la page prévisions, rendus côté serveur avec matplotlib (Agg).
+
+La page ne contient que des URL d'images : chaque graphique est rendu par la
+vue `gerant_graphique` lors d'une requête séparée, puis gardé dans le cache
+sous une clé qui combine le nom du graphique, la version du modèle servie,
+une empreinte des données d'entrée et le format. La même clé sert d'ETag :
+une image déjà vue n'est ni recalculée ni renvoyée.
+
+Le couple (prédicteur, métadonnées) est lu une fois dans le registre par
+l'appelant et passé aux fonctions de rendu : l'image mise en cache sous une
+version est toujours calculée avec cette version, même si une promotion a
+lieu pendant la requête.
+
+matplotlib n'est importé qu'au premier rendu ; les figures passent par
+l'API objet (Figure + FigureCanvasAgg) et non par pyplot, dont l'état global
+n'est pas sûr entre threads.
+"""
+import hashlib
+import io
+import json
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from .ml_service import MLPredictionService
+
+
+DUREE_CACHE_GRAPHIQUES = 7 * 24 * 3600
+FORMATS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+NOMS_MOIS = ['Jan', 'Fév', 'Mar', 'Avr', 'Mai', 'Juin', 'Juil', 'Août', 'Sep', 'Oct', 'Nov', 'Déc']
+VERT = '#2E7D32'
+VERT_CLAIR = '#A5D6A7'
+
+
+def _figure(largeur=7, hauteur=4):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(largeur, hauteur), dpi=100)
+    FigureCanvasAgg(figure)
+    return figure, figure.add_subplot()
+
+
+def _exporter(figure, format):
+    figure.tight_layout()
+    tampon = io.BytesIO()
+    figure.savefig(tampon, format=format)
+    return tampon.getvalue()
+
+
+def _reference(predicteur, n):
+    """Point moyen et écart type des features vus à l'entraînement (via le scaler)."""
+    scaler = getattr(predicteur, 'scaler', None)
+    moyenne = getattr(predicteur, 'moyenne', getattr(scaler, 'mean_', None))
+    echelle = getattr(predicteur, 'echelle', getattr(scaler, 'scale_', None))
+    return (
+        np.zeros(n) if moyenne is None else np.asarray(moyenne, dtype=float),
+        np.ones(n) if echelle is None else np.asarray(echelle, dtype=float),
+    )
+
+
+def _libelles(features):
+    descriptions = MLPredictionService().get_feature_info()['description']
+    return [descriptions.get(f, f).split(' (')[0] for f in features]
+
 
 class ChartGenerator:
     """Générateur de graphiques pour les prédictions ML"""
-    
+
     @staticmethod
-    def create_prediction_chart(prediction_result, input_data):
+    def create_prediction_chart(predicteur, meta, input_data, format='png'):
         """
-        Créer un graphique pour visualiser la prédiction
-        
-        Args:
-            prediction_result: dict avec le résultat de prédiction
-            input_data: dict avec les données d'entrée
-        
+        Contribution de chaque variable à la prédiction : écart entre la
+        prédiction et celle obtenue en ramenant cette seule variable à sa
+        valeur moyenne.
+
         Returns:
-            str: image encodée en base64
+            bytes: image au format demandé ; ValueError si input_data est incomplet
         """
-        # Temporairement désactivé en attendant matplotlib
-        return None
-    
+        features = meta['features'] or MLPredictionService().colonnes_attendues
+        try:
+            x = np.array([float(input_data[f]) for f in features])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("Données de prédiction invalides")
+        moyenne, _ = _reference(predicteur, len(features))
+
+        # Ligne 0 : saisie ; ligne i + 1 : saisie avec la variable i à sa moyenne
+        X = np.tile(x, (len(features) + 1, 1))
+        X[np.arange(1, len(features) + 1), np.arange(len(features))] = moyenne
+        predictions = predicteur.predict(X)
+        contributions = predictions[0] - predictions[1:]
+
+        figure, axe = _figure()
+        ordre = np.argsort(np.abs(contributions))
+        couleurs = [VERT if c >= 0 else '#C62828' for c in contributions[ordre]]
+        axe.barh(np.array(_libelles(features))[ordre], contributions[ordre], color=couleurs)
+        axe.axvline(0, color='#555', linewidth=0.8)
+        axe.set_xlabel("Effet sur la prédiction (tonnes)")
+        axe.set_title(f"Prédiction : {round(float(predictions[0]), 2)} tonnes")
+        return _exporter(figure, format)
+
     @staticmethod
-    def create_feature_importance_chart():
+    def create_feature_importance_chart(predicteur, meta, format='png'):
         """
-        Créer un graphique montrant l'importance des features
-        
+        Importance des variables : variation de la prédiction quand chaque
+        variable passe de moyenne − 1 écart type à moyenne + 1 écart type.
+
         Returns:
-            str: image encodée en base64
+            bytes: image au format demandé
         """
-        # Temporairement désactivé en attendant matplotlib
-        return None
-    
+        features = meta['features'] or MLPredictionService().colonnes_attendues
+        n = len(features)
+        moyenne, echelle = _reference(predicteur, n)
+
+        X = np.tile(moyenne, (2 * n, 1))
+        X[np.arange(n), np.arange(n)] += echelle
+        X[np.arange(n, 2 * n), np.arange(n)] -= echelle
+        predictions = predicteur.predict(X)
+        importance = np.abs(predictions[:n] - predictions[n:]) / 2
+
+        figure, axe = _figure()
+        ordre = np.argsort(importance)
+        axe.barh(np.array(_libelles(features))[ordre], importance[ordre], color=VERT)
+        axe.set_xlabel("Effet d'un écart type (tonnes)")
+        axe.set_title(f"Modèle {meta['version']}")
+        return _exporter(figure, format)
+
     @staticmethod
-    def create_seasonal_trend_chart():
+    def create_seasonal_trend_chart(predicteur, meta, format='png'):
         """
-        Créer un graphique des tendances saisonnières
-        
+        Prédiction mois par mois, les autres variables à leur valeur moyenne.
+
         Returns:
-            str: image encodée en base64
+            bytes: image au format demandé
         """
-        # Temporairement désactivé en attendant matplotlib
-        return None
+        features = meta['features'] or MLPredictionService().colonnes_attendues
+        moyenne, _ = _reference(predicteur, len(features))
+
+        mois = np.arange(1, 13)
+        X = np.tile(moyenne, (12, 1))
+        if 'mois' in features:
+            X[:, features.index('mois')] = mois
+        predictions = predicteur.predict(X)
+
+        figure, axe = _figure()
+        axe.fill_between(mois, predictions, color=VERT_CLAIR, alpha=0.5)
+        axe.plot(mois, predictions, marker='o', color=VERT)
+        axe.set_xticks(mois, NOMS_MOIS)
+        axe.set_ylabel("Rendement prédit (tonnes)")
+        axe.grid(alpha=0.3)
+        return _exporter(figure, format)
+
+
+GRAPHIQUES = {
+    'prediction': ChartGenerator.create_prediction_chart,
+    'importance': ChartGenerator.create_feature_importance_chart,
+    'saisonnalite': ChartGenerator.create_seasonal_trend_chart,
+}
+
+
+def cle_graphique(nom, version, format, donnees=None):
+    """Empreinte du graphique, clé de cache et ETag : change avec la version du modèle et les données."""
+    contenu = json.dumps([nom, version, format, donnees or {}], sort_keys=True, default=str)
+    return hashlib.sha256(contenu.encode()).hexdigest()[:32]
+
+
+def graphique(nom, predicteur, meta, format='png', donnees=None):
+    """
+    Image du graphique `nom` rendue avec `predicteur` (version meta['version']),
+    depuis le cache ou rendue puis mise en cache. `donnees` (valeurs saisies)
+    ne sert qu'au graphique 'prediction'.
+    """
+    cle = f"graphique:{cle_graphique(nom, meta['version'], format, donnees)}"
+    contenu = cache.get(cle)
+    if contenu is None:
+        if nom == 'prediction':
+            contenu = GRAPHIQUES[nom](predicteur, meta, donnees, format=format)
+        else:
+            contenu = GRAPHIQUES[nom](predicteur, meta, format=format)
+        cache.set(cle, contenu, getattr(settings, 'DUREE_CACHE_GRAPHIQUES', DUREE_CACHE_GRAPHIQUES))
+    return contenu
@@ -0,0 +1,111 @@
+"""
+Réentraînement du modèle de ventes à partir de ObservationVentes.
+
+Les observations sont lues en flux (QuerySet.iterator) par blocs de
+`taille_bloc` lignes converties en matrices NumPy : la mémoire utilisée ne
+dépend pas de la taille de l'historique. Le scaler est ajusté en une
+première passe (StandardScaler.partial_fit), puis le régresseur par
+partial_fit sur `epoques` passes. Une observation sur `MODULO_VALIDATION`
+(selon son id, donc toujours la même) est réservée à l'évaluation.
+"""
+import math
+
+import numpy as np
+from django.db.models.functions import Mod
+
+from core.models import ObservationVentes
+
+
+CIBLE = 'ventes'
+TAILLE_BLOC = 5000
+MODULO_VALIDATION = 5
+EPOQUES = 5
+
+
+def _observations(validation):
+    qs = ObservationVentes.objects.annotate(reste=Mod('id', MODULO_VALIDATION))
+    qs = qs.filter(reste=0) if validation else qs.exclude(reste=0)
+    return qs.order_by('id')
+
+
+def blocs(validation, features, taille_bloc=TAILLE_BLOC):
+    """Génère des couples (X, y) d'au plus `taille_bloc` lignes."""
+    lignes = _observations(validation).values_list(*features, CIBLE).iterator(chunk_size=taille_bloc)
+    tampon = []
+    for ligne in lignes:
+        tampon.append(ligne)
+        if len(tampon) == taille_bloc:
+            bloc = np.asarray(tampon, dtype=float)
+            tampon = []
+            yield bloc[:, :-1], bloc[:, -1]
+    if tampon:
+        bloc = np.asarray(tampon, dtype=float)
+        yield bloc[:, :-1], bloc[:, -1]
+
+
+class Evaluation:
+    """Métriques cumulées bloc par bloc (MAE, RMSE, R²) sans garder les prédictions."""
+
+    def __init__(self):
+        self.n = 0
+        self.somme_abs = 0.0
+        self.somme_carres = 0.0
+        self.somme_y = 0.0
+        self.somme_y2 = 0.0
+
+    def ajouter(self, y, prediction):
+        erreur = prediction - y
+        self.n += len(y)
+        self.somme_abs += float(np.abs(erreur).sum())
+        self.somme_carres += float((erreur * erreur).sum())
+        self.somme_y += float(y.sum())
+        self.somme_y2 += float((y * y).sum())
+
+    def metriques(self):
+        if not self.n:
+            return {}
+        variance_totale = self.somme_y2 - self.somme_y ** 2 / self.n
+        return {
+            'n_validation': self.n,
+            'mae': self.somme_abs / self.n,
+            'rmse': math.sqrt(self.somme_carres / self.n),
+            'r2': 1 - self.somme_carres / variance_totale if variance_totale > 0 else None,
+        }
+
+
+def entrainer(features, epoques=EPOQUES, taille_bloc=TAILLE_BLOC, alpha=1e-4, graine=0):
+    """
+    Ajuste un StandardScaler et un SGDRegressor sur les colonnes `features`
+    des observations d'entraînement. Renvoie (modele, scaler, metriques de validation), ou
+    lève ValueError s'il n'y a pas d'observation d'entraînement.
+    """
+    from sklearn.linear_model import SGDRegressor
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    n_entrainement = 0
+    for X, _ in blocs(False, features, taille_bloc):
+        scaler.partial_fit(X)
+        n_entrainement += len(X)
+    if not n_entrainement:
+        raise ValueError("Aucune observation d'entraînement")
+
+    modele = SGDRegressor(alpha=alpha, learning_rate='invscaling', random_state=graine)
+    for _ in range(epoques):
+        for X, y in blocs(False, features, taille_bloc):
+            modele.partial_fit(scaler.transform(X), y)
+
+    evaluation = Evaluation()
+    for X, y in blocs(True, features, taille_bloc):
+        evaluation.ajouter(y, modele.predict(scaler.transform(X)))
+
+    metriques = {'n_entrainement': n_entrainement, 'epoques': epoques, **evaluation.metriques()}
+    return modele, scaler, metriques
+
+
+def evaluer_predicteur(predicteur, features, taille_bloc=TAILLE_BLOC):
+    """Métriques d'un prédicteur du registre sur les mêmes observations de validation."""
+    evaluation = Evaluation()
+    for X, y in blocs(True, features, taille_bloc):
+        evaluation.ajouter(y, predicteur.predict(X))
+    return evaluation.metriques()
@@ -0,0 +1,223 @@
+"""
+Lissage exponentiel de Holt-Winters (additif, tendance amortie, saison
+hebdomadaire) appliqué à toutes les séries à la fois.
+
+Les séries sont les lignes d'une matrice séries × jours : la récursion avance
+jour par jour mais chaque pas traite toutes les séries et toutes les
+combinaisons de paramètres de la grille en une opération NumPy. Chaque série
+garde la combinaison qui minimise son erreur de prévision à un pas.
+
+La saisonnalité annuelle est estimée à part, par moindres carrés sur quelques
+harmoniques de Fourier, pour les séries ayant au moins deux ans d'historique ;
+elle est retirée avant le lissage puis rajoutée aux prévisions.
+"""
+import itertools
+import time
+
+import numpy as np
+
+
+SAISON = 7
+PHI = 0.9  # amortissement de la tendance
+GRILLE = {
+    'alpha': (0.05, 0.15, 0.35),
+    'beta': (0.0, 0.05),
+    'gamma': (0.05, 0.2, 0.4),
+}
+HARMONIQUES_ANNUELLES = 3
+HISTORIQUE_MIN_ANNUEL = 730
+
+
+def debuts_series(presents):
+    """Indice du premier jour avec une sortie, pour chaque série (T si aucune)."""
+    debut = presents.argmax(axis=1)
+    debut[~presents.any(axis=1)] = presents.shape[1]
+    return debut
+
+
+def _fourier(jours, harmoniques=HARMONIQUES_ANNUELLES):
+    """Matrice len(jours) × 2·harmoniques des termes sin / cos annuels (jours ordinaux)."""
+    angle = 2 * np.pi * np.asarray(jours, dtype=float)[:, None] / 365.25
+    k = np.arange(1, harmoniques + 1)[None, :]
+    return np.hstack([np.sin(k * angle), np.cos(k * angle)])
+
+
+def composante_annuelle(Y, debut, premier_ordinal, horizon):
+    """
+    Composante annuelle (historique, futur) : matrices S × T et S × horizon,
+    nulles pour les séries trop courtes. Un seul lstsq à seconds membres
+    multiples ajuste toutes les séries éligibles.
+    """
+    S, T = Y.shape
+    historique = np.zeros((S, T))
+    futur = np.zeros((S, horizon))
+    eligibles = np.flatnonzero(debut <= T - HISTORIQUE_MIN_ANNUEL)
+    if not len(eligibles):
+        return historique, futur
+
+    jours = premier_ordinal + np.arange(T + horizon)
+    F = _fourier(jours)
+    fenetre = slice(T - HISTORIQUE_MIN_ANNUEL, T)
+    X = np.hstack([np.ones((HISTORIQUE_MIN_ANNUEL, 1)), F[fenetre]])
+    coef, *_ = np.linalg.lstsq(X, Y[eligibles, fenetre].T, rcond=None)
+    composante = (F @ coef[1:]).T
+    historique[eligibles] = composante[:, :T]
+    futur[eligibles] = composante[:, T:]
+    return historique, futur
+
+
+def holt_winters(Y, debut, m=SAISON, grille=GRILLE, phi=PHI):
+    """
+    Ajuste toutes les séries de Y (S × T). Une série démarre à debut[s] ; ses
+    deux premières saisons (une seule si elle est trop courte) initialisent
+    niveau et saison.
+
+    Renvoie (niveau, tendance, saison S × m, phase, params S × 3) où phase est
+    l'indice saisonnier du dernier jour observé.
+    """
+    S, T = Y.shape
+    combinaisons = np.array(list(itertools.product(grille['alpha'], grille['beta'], grille['gamma'])))
+    a, b, g = (combinaisons[:, i][None, :] for i in range(3))
+    C = len(combinaisons)
+
+    # Initialisation : moyenne des deux premières semaines de chaque série
+    lignes = np.arange(S)[:, None]
+    decalages = np.arange(m)[None, :]
+    semaine1 = Y[lignes, np.clip(debut[:, None] + decalages, 0, T - 1)]
+    semaine2 = Y[lignes, np.clip(debut[:, None] + m + decalages, 0, T - 1)]
+    semaine2 = np.where((debut + 2 * m <= T)[:, None], semaine2, semaine1)
+    premiers = (semaine1 + semaine2) / 2
+    niveau0 = premiers.mean(axis=1)
+    saison0 = np.zeros((S, m))
+    saison0[lignes, (debut[:, None] + decalages) % m] = premiers - niveau0[:, None]
+
+    L = np.repeat(niveau0[:, None], C, axis=1)
+    B = np.zeros((S, C))
+    saison = np.repeat(saison0[:, None, :], C, axis=1)
+    sse = np.zeros((S, C))
+
+    depart = int(debut.min()) + m if S else T
+    for t in range(depart, T):
+        actif = (t >= debut + m)[:, None]
+        if not actif.any():
+            continue
+        y = Y[:, t][:, None]
+        k = t % m
+        s_t = saison[:, :, k]
+        tendance = phi * B
+        erreur = y - (L + tendance + s_t)
+        sse += np.where(actif, erreur * erreur, 0.0)
+
+        L_nouveau = a * (y - s_t) + (1 - a) * (L + tendance)
+        B_nouveau = b * (L_nouveau - L) + (1 - b) * tendance
+        saison[:, :, k] = np.where(actif, g * (y - L_nouveau) + (1 - g) * s_t, s_t)
+        L = np.where(actif, L_nouveau, L)
+        B = np.where(actif, B_nouveau, B)
+
+    meilleur = sse.argmin(axis=1)
+    lignes = np.arange(S)
+    return (
+        L[lignes, meilleur],
+        B[lignes, meilleur],
+        saison[lignes, meilleur],
+        (T - 1) % m,
+        combinaisons[meilleur],
+    )
+
+
+def prevoir(Y, debut, premier_ordinal, horizon, m=SAISON, phi=PHI):
+    """
+    Prévisions S × horizon pour les jours T, T+1, ... (T = nombre de colonnes de Y).
+
+    Les séries trop courtes pour être lissées (moins de deux saisons
+    d'historique) reçoivent leur moyenne journalière.
+    """
+    S, T = Y.shape
+    if S == 0 or T == 0:
+        return np.zeros((S, horizon))
+
+    annuel_historique, annuel_futur = composante_annuelle(Y, debut, premier_ordinal, horizon)
+    niveau, tendance, saison, phase, _ = holt_winters(Y - annuel_historique, debut, m=m, phi=phi)
+
+    pas = np.arange(1, horizon + 1)
+    cumul_phi = np.cumsum(phi ** pas)
+    indices = (phase + pas) % m
+    resultat = (
+        niveau[:, None]
+        + tendance[:, None] * cumul_phi[None, :]
+        + saison[:, indices]
+        + annuel_futur
+    )
+
+    courtes = debut > T - 2 * m
+    if courtes.any():
+        duree = np.maximum(T - debut[courtes], 1)
+        moyenne = Y[courtes].sum(axis=1) / duree
+        resultat[courtes] = moyenne[:, None]
+    return np.clip(resultat, 0.0, None)
+
+
+def moyenne_naive(Y, debut, horizon):
+    """Référence : moyenne journalière depuis le début de chaque série."""
+    T = Y.shape[1]
+    duree = np.maximum(T - debut, 1)
+    return np.repeat((Y.sum(axis=1) / duree)[:, None], horizon, axis=1)
+
+
+def saisonniere_naive(Y, horizon, m=SAISON):
+    """Référence : répète la dernière semaine observée."""
+    T = Y.shape[1]
+    indices = T - m + (np.arange(horizon) % m)
+    return Y[:, np.clip(indices, 0, T - 1)]
+
+
+def backtest(Y, presents, premier_ordinal, horizon=7, origines=4, pas=None):
+    """
+    Validation à origine glissante : pour chaque origine o (les `origines`
+    dernières, espacées de `pas` jours), ajuste sur Y[:, :o] et compare les
+    prévisions à Y[:, o:o + horizon].
+
+    Renvoie {méthode: {'mae', 'rmse', 'wape', 'secondes'}} agrégé sur toutes
+    les séries ayant au moins deux semaines d'historique à l'origine.
+    """
+    pas = pas or horizon
+    T = Y.shape[1]
+    methodes = {
+        'holt_winters': lambda Yo, d: prevoir(Yo, d, premier_ordinal, horizon),
+        'moyenne': lambda Yo, d: moyenne_naive(Yo, d, horizon),
+        'saisonniere_naive': lambda Yo, d: saisonniere_naive(Yo, horizon),
+    }
+    erreurs = {nom: [] for nom in methodes}
+    reels = []
+    durees = dict.fromkeys(methodes, 0.0)
+
+    for k in range(origines, 0, -1):
+        o = T - horizon - (k - 1) * pas
+        if o <= 2 * SAISON:
+            continue
+        Yo = Y[:, :o]
+        debut = debuts_series(presents[:, :o])
+        retenues = debut <= o - 2 * SAISON
+        if not retenues.any():
+            continue
+        verite = Y[retenues, o:o + horizon]
+        reels.append(verite)
+        for nom, methode in methodes.items():
+            chrono = time.perf_counter()
+            prevision = methode(Yo[retenues], debut[retenues])
+            durees[nom] += time.perf_counter() - chrono
+            erreurs[nom].append(prevision - verite)
+
+    if not reels:
+        return {}
+    total_reel = np.abs(np.concatenate(reels, axis=None)).sum()
+    resultat = {}
+    for nom, liste in erreurs.items():
+        e = np.concatenate(liste, axis=None)
+        resultat[nom] = {
+            'mae': float(np.abs(e).mean()),
+            'rmse': float(np.sqrt((e * e).mean())),
+            'wape': float(np.abs(e).sum() / total_reel) if total_reel else None,
+            'secondes': durees[nom],
+        }
+    return resultat
@@ -1,17 +1,29 @@
-import pickle
+import itertools
+import math
+
 import numpy as np
-import pandas as pd
-import os
-from pathlib import Path
+
+from .cache_predictions import cache_predictions
+from .registre import registre_modele, ModeleIndisponible
+
+
+# Lignes évaluées par appel au modèle dans predict_stream
+TAILLE_LOT_PREDICTION = 5000
+
 
 class MLPredictionService:
     """
-    Service de prédiction utilisant les modèles ML entraînés
+    Service de prédiction utilisant les modèles ML entraînés.
+
+    Le prédicteur (scaler + modèle) vient du registre versionné du processus
+    (voir registre.py) : instancier le service ne lit rien sur le disque.
+    Les prédictions unitaires passent par le cache LRU du processus
+    (voir cache_predictions.py).
     """
     
-    def __init__(self):
-        self.model = None
-        self.scaler = None
+    def __init__(self, registre=None, cache=None):
+        self.registre = registre or registre_modele()
+        self.cache = cache or cache_predictions()
         self.colonnes_attendues = [
             'superficie_totale', 
             'precipitations_mm', 
@@ -20,51 +32,56 @@ class MLPredictionService:
             'mois', 
             'cout_intrants'
         ]
-        self._load_models()
+
+    def est_pret(self):
+        return self.registre.est_pret()
     
-    def _load_models(self):
-        """Charger les modèles pickle"""
+    def version_modele(self):
+        """Métadonnées de la version servie (None si aucun modèle n'est chargé)."""
         try:
-            # Utiliser le chemin relatif depuis ce fichier jusqu'à la racine du projet
-            current_dir = Path(__file__).parent
-            project_root = current_dir.parent.parent.parent
-            
-            model_path = 'ml_models/modele_ventes_cafe_cacao.pkl'
-            scaler_path =  'ml_models/scaler.pkl'
-            
-            print(f"Dossier actuel: {current_dir}")
-            print(f"Racine projet: {project_root}")
-            print(f"Chemin modèle: {model_path}")
-            print(f"Chemin scaler: {scaler_path}")
-            print(f"Fichier modèle existe: {model_path.exists()}")
-            print(f"Fichier scaler existe: {scaler_path.exists()}")
-            
-            # Vérifier que les fichiers existent
-            if not model_path.exists():
-                raise FileNotFoundError(f"Fichier modèle non trouvé: {model_path}")
-            if not scaler_path.exists():
-                raise FileNotFoundError(f"Fichier scaler non trouvé: {scaler_path}")
-            
-            # Charger le modèle
-            with open(model_path, 'rb') as f:
-                self.model = pickle.load(f)
-            
-            # Charger le scaler
-            with open(scaler_path, 'rb') as f:
-                self.scaler = pickle.load(f)
-                
-            print(f"✅ Modèles chargés avec succès: {type(self.model)}, {type(self.scaler)}")
-            
-        except Exception as e:
-            print(f"❌ Erreur lors du chargement des modèles: {e}")
-            import traceback
-            traceback.print_exc()
-            self.model = None
-            self.scaler = None
-    
+            return self.registre.predicteur()[1]
+        except ModeleIndisponible:
+            return None
+
+    def _ligne(self, data, features):
+        """Valeurs de `data` dans l'ordre des features ; lève ValueError si invalide."""
+        if not isinstance(data, dict):
+            raise ValueError("Ligne invalide : un objet est attendu")
+        manquantes = [c for c in features if data.get(c) in (None, '')]
+        if manquantes:
+            raise ValueError(f"Champ(s) manquant(s) : {', '.join(manquantes)}")
+        ligne = []
+        for colonne in features:
+            try:
+                valeur = float(data[colonne])
+            except (TypeError, ValueError):
+                raise ValueError(f"Valeur non numérique pour {colonne}")
+            if not math.isfinite(valeur):
+                raise ValueError(f"Valeur non finie pour {colonne}")
+            ligne.append(valeur)
+        return ligne
+
+    @staticmethod
+    def _echec(erreur):
+        return {
+            'success': False,
+            'error': erreur,
+            'prediction': None
+        }
+
+    @staticmethod
+    def _succes(data, prediction):
+        return {
+            'success': True,
+            'prediction': prediction,
+            'input_data': data,
+            'prediction_rounded': round(prediction, 2)
+        }
+
     def predict(self, data):
         """
-        Faire une prédiction avec les données fournies
+        Faire une prédiction avec les données fournies. Un scénario déjà
+        calculé avec la même version du modèle est lu dans le cache.
         
         Args:
             data: dict avec les clés correspondant aux colonnes_attendues
@@ -72,52 +89,80 @@ class MLPredictionService:
         Returns:
             dict: résultat de la prédiction
         """
-        if not self.model or not self.scaler:
-            return {
-                'success': False,
-                'error': 'Modèles non chargés',
-                'prediction': None
-            }
-        
         try:
-            # Convertir en DataFrame avec les colonnes dans le bon ordre
-            df = pd.DataFrame([data], columns=self.colonnes_attendues)
-            
-            # Normaliser les données
-            scaled_data = self.scaler.transform(df)
-            
-            # Faire la prédiction
-            prediction = self.model.predict(scaled_data)[0]
-            
-            return {
-                'success': True,
-                'prediction': float(prediction),
-                'input_data': data,
-                'prediction_rounded': round(float(prediction), 2)
-            }
-            
-        except Exception as e:
-            return {
-                'success': False,
-                'error': str(e),
-                'prediction': None
-            }
+            predicteur, meta = self.registre.predicteur()
+        except ModeleIndisponible as e:
+            return self._echec(f'Modèles non chargés ({e})')
+        features = meta['features'] or self.colonnes_attendues
+        try:
+            ligne = self._ligne(data, features)
+        except ValueError as e:
+            return self._echec(str(e))
+
+        prediction = self.cache.lire(meta['version'], ligne)
+        if prediction is None:
+            try:
+                prediction = float(predicteur.predict(np.asarray([ligne], dtype=float))[0])
+            except Exception as e:
+                return self._echec(str(e))
+            self.cache.ecrire(meta['version'], ligne, prediction)
+        return self._succes(data, prediction)
+
+    def statistiques_cache(self):
+        return self.cache.statistiques()
     
     def predict_multiple(self, data_list):
         """
-        Faire plusieurs prédictions
+        Faire plusieurs prédictions en un seul appel au scaler et au modèle
         
         Args:
             data_list: liste de dicts avec les données
         
         Returns:
-            list: résultats des prédictions
+            list: résultats des prédictions, dans l'ordre de data_list ; une
+            ligne invalide a son propre résultat en échec sans bloquer les autres
         """
-        results = []
-        for data in data_list:
-            result = self.predict(data)
-            results.append(result)
+        try:
+            predicteur, meta = self.registre.predicteur()
+        except ModeleIndisponible as e:
+            return [self._echec(f'Modèles non chargés ({e})') for _ in data_list]
+        features = meta['features'] or self.colonnes_attendues
+
+        results = [None] * len(data_list)
+        lignes = []
+        indices = []
+        for i, data in enumerate(data_list):
+            try:
+                lignes.append(self._ligne(data, features))
+                indices.append(i)
+            except ValueError as e:
+                results[i] = self._echec(str(e))
+
+        if lignes:
+            try:
+                # Une seule matrice pour tout le lot
+                predictions = predicteur.predict(np.asarray(lignes, dtype=float))
+            except Exception as e:
+                for i in indices:
+                    results[i] = self._echec(str(e))
+                return results
+
+            for i, prediction in zip(indices, predictions.tolist()):
+                results[i] = self._succes(data_list[i], prediction)
         return results
+
+    def predict_stream(self, data_iter, taille_lot=TAILLE_LOT_PREDICTION):
+        """
+        Variante paresseuse de predict_multiple pour les gros fichiers de scénarios :
+        consomme `data_iter` par lots de `taille_lot` et renvoie les résultats
+        au fur et à mesure, dans l'ordre, sans tout garder en mémoire.
+        """
+        iterateur = iter(data_iter)
+        while True:
+            lot = list(itertools.islice(iterateur, taille_lot))
+            if not lot:
+                return
+            yield from self.predict_multiple(lot)
     
     def get_feature_info(self):
         """Retourner des informations sur les features attendues"""
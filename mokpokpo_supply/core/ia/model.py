@@ -1,49 +1,51 @@
-import pandas as pd
-import numpy as np
-from datetime import timedelta
-from core.models import Produit, Lot, MouvementStock, Livraison
-
-class StockPredictor:
-    """
-    Modèle simple de prédiction de stock basé sur la consommation historique.
-    Peut être remplacé par un vrai modèle ML plus tard.
-    """
-
-    def __init__(self):
-        # Paramètres simples
-        self.prediction_horizon_days = 7  # prévisions sur 7 jours
+from datetime import timezone as dt_timezone
 
-    def predict_from_db(self):
-        """
-        Récupère les données de la base et renvoie une liste de prédictions.
-        Chaque prédiction est un dict : {'produit': produit_obj, 'date': date, 'quantite_estimee': float}
-        """
-        predictions = []
-
-        produits = Produit.objects.all()
-
-        for produit in produits:
-            # Consommation moyenne par jour : somme des lots sortis pour ce produit
-            mouvements = MouvementStock.objects.filter(lot__produit=produit, type_mouvement='SORTIE')
-            if not mouvements.exists():
-                continue
+import numpy as np
+from django.db.models import Sum
+from django.db.models.functions import Coalesce, TruncDate
 
-            df = pd.DataFrame.from_records(mouvements.values('date', 'quantite'))
-            df['date'] = pd.to_datetime(df['date'])
-            df = df.set_index('date').resample('D').sum().fillna(0)
+from core.models import MouvementStock
 
-            # Consommation moyenne par jour
-            mean_daily = df['quantite'].mean()
 
-            # Générer prédiction pour les 7 prochains jours
-            start_date = pd.Timestamp.now().normalize() + pd.Timedelta(days=1)
-            for i in range(self.prediction_horizon_days):
-                pred_date = start_date + pd.Timedelta(days=i)
-                predictions.append({
-                    'produit': produit,
-                    'date': pred_date,
-                    'quantite_estimee': round(mean_daily, 2)
-                })
+def ventes_journalieres(par_entrepot=False):
+    """
+    Sorties de stock par série et par jour (UTC), agrégées en une requête.
 
-        return predictions
+    Une série est un produit, ou un couple (produit, entrepôt) si `par_entrepot`.
+    L'entrepôt d'une sortie est celui de son emplacement source, à défaut
+    celui de l'emplacement du lot.
 
+    Renvoie (series, premier_jour, quantites, presents) : `quantites` et
+    `presents` sont des matrices séries × jours ; `presents` indique les jours
+    ayant au moins un mouvement.
+    """
+    qs = (
+        MouvementStock.objects.filter(type_mouvement='SORTIE')
+        .annotate(jour=TruncDate('date', tzinfo=dt_timezone.utc))
+    )
+    champs = ['lot__produit_id', 'jour']
+    if par_entrepot:
+        qs = qs.annotate(entrepot=Coalesce(
+            'source_emplacement__entrepot_id', 'lot__emplacement__entrepot_id'
+        )).filter(entrepot__isnull=False)
+        champs.append('entrepot')
+    lignes = list(qs.values(*champs).annotate(total=Sum('quantite')).order_by())
+    if not lignes:
+        return [], None, np.zeros((0, 0)), np.zeros((0, 0), dtype=bool)
+
+    if par_entrepot:
+        cle = lambda l: (l['lot__produit_id'], l['entrepot'])
+    else:
+        cle = lambda l: l['lot__produit_id']
+    series = sorted({cle(l) for l in lignes})
+    rang = {serie: i for i, serie in enumerate(series)}
+    premier_jour = min(l['jour'] for l in lignes)
+    nb_jours = (max(l['jour'] for l in lignes) - premier_jour).days + 1
+
+    i = np.fromiter((rang[cle(l)] for l in lignes), dtype=np.int64, count=len(lignes))
+    j = np.fromiter(((l['jour'] - premier_jour).days for l in lignes), dtype=np.int64, count=len(lignes))
+    quantites = np.zeros((len(series), nb_jours))
+    presents = np.zeros((len(series), nb_jours), dtype=bool)
+    quantites[i, j] = [l['total'] or 0 for l in lignes]
+    presents[i, j] = True
+    return series, premier_jour, quantites, presents
@@ -0,0 +1,259 @@
+"""
+Prédicteurs chargés par le registre : scaler + modèle derrière une seule
+méthode `predict(X)` qui prend la matrice brute (colonnes dans l'ordre des
+features de la version).
+
+- PredicteurLineaire : régression linéaire à lien identité exportée en
+  tableaux .npy, lus en mémoire partagée (mmap) ; aucun unpickling, aucune
+  dépendance à scikit-learn.
+- PredicteurArbres : arbre de décision, forêt aléatoire ou gradient boosting,
+  dont tous les arbres sont aplatis dans quelques tableaux .npy et parcourus
+  en NumPy pour toutes les lignes à la fois.
+- PredicteurSklearn : tout autre modèle, conservé en pickle joblib.
+
+Les deux premiers formats n'importent ni pandas ni scikit-learn. Seuls les
+types de modèles dont la formule est connue sont exportés en NumPy, et
+l'export est comparé au modèle d'origine sur un échantillon avant d'être
+retenu.
+"""
+import importlib
+import json
+import logging
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# predict(X) = X · coef + intercept ; les GLM (Poisson, Gamma, Tweedie) ont un lien log
+REGRESSIONS_LINEAIRES = (
+    'LinearRegression', 'Ridge', 'RidgeCV', 'Lasso', 'LassoCV', 'ElasticNet', 'ElasticNetCV',
+    'Lars', 'LarsCV', 'LassoLars', 'LassoLarsCV', 'LassoLarsIC',
+    'OrthogonalMatchingPursuit', 'OrthogonalMatchingPursuitCV', 'BayesianRidge', 'ARDRegression',
+    'HuberRegressor', 'TheilSenRegressor', 'QuantileRegressor', 'SGDRegressor',
+)
+# Un arbre, la moyenne des arbres (forêts) ou leur somme pondérée (boosting) ;
+# AdaBoost (médiane pondérée) et le bagging (sous-ensembles de colonnes) en sont exclus
+ARBRES = {
+    'sklearn.tree': ('DecisionTreeRegressor',),
+    'sklearn.ensemble': ('RandomForestRegressor', 'ExtraTreesRegressor', 'GradientBoostingRegressor'),
+}
+TAILLE_ECHANTILLON_CONTROLE = 256
+
+
+def _est_de_type(modele, module, noms):
+    """Vrai si `modele` est exactement l'une des classes `noms` de `module` (pas une sous-classe)."""
+    module = importlib.import_module(module)
+    return any(type(modele) is getattr(module, nom, None) for nom in noms)
+
+
+class _TableauxNpy:
+    """Un fichier .npy par attribut listé dans FICHIERS, relu en mmap."""
+    FICHIERS = ()
+
+    def sauvegarder(self, dossier):
+        for nom in self.FICHIERS:
+            np.save(dossier / f"{nom}.npy", getattr(self, nom))
+
+    @classmethod
+    def charger(cls, dossier):
+        return cls(*(np.load(dossier / f"{nom}.npy", mmap_mode='r') for nom in cls.FICHIERS))
+
+
+def _moyenne_echelle(scaler, n):
+    """
+    Centrage et échelle appliqués par `scaler`, sous la forme (X - moyenne) / échelle.
+
+    Seul un StandardScaler complet (with_mean et with_std) se réduit à cette
+    formule ; tout autre scaler lève ValueError et le couple est exporté en joblib.
+    """
+    if scaler is None:
+        return np.zeros(n), np.ones(n)
+    from sklearn.preprocessing import StandardScaler
+
+    if type(scaler) is not StandardScaler or not (scaler.with_mean and scaler.with_std):
+        raise ValueError(f"{type(scaler).__name__} n'est pas exportable en NumPy")
+    return np.asarray(scaler.mean_, dtype=float), np.asarray(scaler.scale_, dtype=float)
+
+
+class PredicteurLineaire(_TableauxNpy):
+    FORMAT = 'lineaire'
+    FICHIERS = ('moyenne', 'echelle', 'coef', 'intercept')
+
+    def __init__(self, moyenne, echelle, coef, intercept):
+        self.moyenne = moyenne
+        self.echelle = echelle
+        self.coef = coef
+        self.intercept = intercept
+
+    @classmethod
+    def depuis_sklearn(cls, modele, scaler):
+        if not _est_de_type(modele, 'sklearn.linear_model', REGRESSIONS_LINEAIRES):
+            raise ValueError(f"{type(modele).__name__} n'est pas une régression linéaire exportable")
+        coef = np.asarray(modele.coef_, dtype=float)
+        if coef.ndim != 1:
+            raise ValueError("Seules les régressions à une sortie sont exportables")
+        moyenne, echelle = _moyenne_echelle(scaler, coef.shape[0])
+        return cls(
+            moyenne, echelle,
+            coef,
+            np.asarray(modele.intercept_, dtype=float).reshape(()),
+        )
+
+    def predict(self, X):
+        return ((X - self.moyenne) / self.echelle) @ self.coef + self.intercept
+
+class PredicteurArbres(_TableauxNpy):
+    """
+    prédiction = base + facteur * somme des feuilles atteintes dans chaque arbre
+
+    Les nœuds de tous les arbres sont concaténés ; `racines` donne l'indice du
+    premier nœud de chaque arbre et les enfants sont des indices globaux
+    (-1 pour une feuille).
+    """
+    FORMAT = 'arbres'
+    FICHIERS = ('moyenne', 'echelle', 'racines', 'gauche', 'droite', 'feature', 'seuil', 'valeur', 'constantes')
+
+    def __init__(self, moyenne, echelle, racines, gauche, droite, feature, seuil, valeur, constantes):
+        self.moyenne = moyenne
+        self.echelle = echelle
+        self.racines = racines
+        self.gauche = gauche
+        self.droite = droite
+        self.feature = feature
+        self.seuil = seuil
+        self.valeur = valeur
+        self.constantes = constantes  # [base, facteur, profondeur max]
+
+    @classmethod
+    def depuis_sklearn(cls, modele, scaler):
+        if not any(_est_de_type(modele, module, noms) for module, noms in ARBRES.items()):
+            raise ValueError(f"{type(modele).__name__} n'est pas un modèle à arbres exportable")
+        estimateurs = getattr(modele, 'estimators_', None)
+        if hasattr(modele, 'tree_'):
+            arbres, base, facteur = [modele.tree_], 0.0, 1.0
+        elif hasattr(modele, 'init_'):
+            # GradientBoostingRegressor : estimators_ est une matrice (n, 1)
+            init = modele.init_
+            if init == 'zero':
+                base = 0.0
+            elif hasattr(init, 'constant_'):
+                base = float(np.ravel(init.constant_)[0])
+            else:
+                raise ValueError("Initialisation du boosting non exportable")
+            arbres, facteur = [e.tree_ for e in np.ravel(estimateurs)], modele.learning_rate
+        else:
+            # Forêts : moyenne des arbres
+            arbres, base, facteur = [e.tree_ for e in estimateurs], 0.0, 1.0 / len(estimateurs)
+        if any(a.n_outputs != 1 for a in arbres):
+            raise ValueError("Seuls les modèles à une sortie sont exportables")
+
+        racines, gauche, droite, feature, seuil, valeur = [], [], [], [], [], []
+        decalage = 0
+        for arbre in arbres:
+            racines.append(decalage)
+            feuille = arbre.children_left < 0
+            gauche.append(np.where(feuille, -1, arbre.children_left + decalage))
+            droite.append(np.where(feuille, -1, arbre.children_right + decalage))
+            feature.append(np.where(feuille, 0, arbre.feature))
+            seuil.append(arbre.threshold)
+            valeur.append(arbre.value[:, 0, 0])
+            decalage += arbre.node_count
+
+        moyenne, echelle = _moyenne_echelle(scaler, modele.n_features_in_)
+        return cls(
+            moyenne, echelle,
+            np.asarray(racines, dtype=np.int64),
+            np.concatenate(gauche).astype(np.int64),
+            np.concatenate(droite).astype(np.int64),
+            np.concatenate(feature).astype(np.int64),
+            np.concatenate(seuil).astype(float),
+            np.concatenate(valeur).astype(float),
+            np.array([base, facteur, max(a.max_depth for a in arbres)], dtype=float),
+        )
+
+    def predict(self, X):
+        # scikit-learn compare en float32 : même conversion pour des résultats identiques
+        X = ((X - self.moyenne) / self.echelle).astype(np.float32)
+        lignes = np.arange(X.shape[0])[:, None]
+        noeuds = np.broadcast_to(np.asarray(self.racines), (X.shape[0], len(self.racines))).copy()
+        base, facteur, profondeur = self.constantes
+        for _ in range(int(profondeur)):
+            gauche = self.gauche[noeuds]
+            feuille = gauche < 0
+            if feuille.all():
+                break
+            valeurs = X[lignes, self.feature[noeuds]]
+            suivant = np.where(valeurs <= self.seuil[noeuds], gauche, self.droite[noeuds])
+            noeuds = np.where(feuille, noeuds, suivant)
+        return base + facteur * self.valeur[noeuds].sum(axis=1)
+
+
+class PredicteurSklearn:
+    FORMAT = 'joblib'
+
+    def __init__(self, modele, scaler, features):
+        self.modele = modele
+        self.scaler = scaler
+        self.features = list(features)
+
+    def predict(self, X):
+        if hasattr(self.scaler, 'feature_names_in_'):
+            import pandas as pd
+
+            # Scaler ajusté sur un DataFrame : il attend les noms de colonnes
+            X = pd.DataFrame(X, columns=self.features)
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        return np.asarray(self.modele.predict(X), dtype=float)
+
+    def sauvegarder(self, dossier):
+        import joblib
+
+        joblib.dump(self.modele, dossier / 'modele.joblib')
+        joblib.dump(self.scaler, dossier / 'scaler.joblib')
+
+    @classmethod
+    def charger(cls, dossier):
+        import joblib
+
+        features = json.loads((dossier / 'metadata.json').read_text(encoding='utf-8'))['features']
+        return cls(joblib.load(dossier / 'modele.joblib'), joblib.load(dossier / 'scaler.joblib'), features)
+
+
+FORMATS = {cls.FORMAT: cls for cls in (PredicteurLineaire, PredicteurArbres, PredicteurSklearn)}
+
+
+def echantillon_controle(scaler, n_features, taille=TAILLE_ECHANTILLON_CONTROLE):
+    """Lignes aléatoires autour de la moyenne vue par le scaler, ou centrées réduites sans scaler."""
+    rng = np.random.default_rng(0)
+    moyenne = np.asarray(getattr(scaler, 'mean_', np.zeros(n_features)), dtype=float)
+    echelle = np.asarray(getattr(scaler, 'scale_', np.ones(n_features)), dtype=float)
+    return rng.normal(moyenne, 2 * echelle, size=(taille, n_features))
+
+
+def depuis_sklearn(modele, scaler, features, echantillon=None):
+    """
+    Exporte un couple (modèle, scaler) ajusté vers la représentation la plus
+    légère disponible : NumPy pur si possible, pickle joblib sinon.
+
+    Un export NumPy n'est retenu que s'il reproduit `modele.predict` sur
+    `echantillon` (par défaut, voir `echantillon_controle`).
+    """
+    reference = PredicteurSklearn(modele, scaler, features)
+    for cls in (PredicteurLineaire, PredicteurArbres):
+        try:
+            predicteur = cls.depuis_sklearn(modele, scaler)
+        except (AttributeError, ValueError):
+            continue
+        if echantillon is None:
+            echantillon = echantillon_controle(scaler, len(features) or modele.n_features_in_)
+        X = np.asarray(echantillon, dtype=float)
+        if np.allclose(predicteur.predict(X), reference.predict(X), rtol=1e-6, atol=1e-6):
+            return predicteur
+        logger.warning(
+            "Export %s de %s différent du modèle sur l'échantillon de contrôle : pickle joblib conservé",
+            cls.FORMAT, type(modele).__name__,
+        )
+        break
+    return reference
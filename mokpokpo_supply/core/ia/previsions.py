@@ -0,0 +1,109 @@
+"""
+Calcul et stockage des prévisions de demande (PrevisionDemande).
+
+Les prévisions sont calculées hors requête HTTP par `manage.py
+calculer_previsions` (planifié, ou déclenché par le volume de sorties) et
+écrites en un upsert groupé ; la page prévisions du gérant se contente de
+relire la table.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from core.models import MouvementStock, PrevisionDemande
+
+from .lissage import debuts_series, prevoir
+from .model import ventes_journalieres
+
+
+HORIZON_PAR_DEFAUT = 7
+VERSION_HOLT_WINTERS = 'holt-winters-v1'
+TAILLE_LOT_UPSERT = 1000
+
+
+def historique_jusqua_hier(quantites, presents, premier_jour, aujourd_hui):
+    """
+    Recale les matrices séries × jours sur [premier_jour, hier] : jours sans
+    sortie ajoutés à 0, journée en cours (incomplète) retirée.
+    """
+    T = (aujourd_hui - premier_jour).days
+    manque = T - quantites.shape[1]
+    if manque > 0:
+        quantites = np.pad(quantites, ((0, 0), (0, manque)))
+        presents = np.pad(presents, ((0, 0), (0, manque)))
+    return quantites[:, :max(T, 0)], presents[:, :max(T, 0)]
+
+
+def calculer_previsions(horizon=HORIZON_PAR_DEFAUT):
+    """
+    Prévisions journalières par (produit, entrepôt) pour les `horizon` jours
+    à venir, par lissage de Holt-Winters de toutes les séries à la fois.
+    Renvoie (previsions non enregistrées, version du modèle).
+    """
+    series, premier_jour, quantites, presents = ventes_journalieres(par_entrepot=True)
+    if not series:
+        return [], VERSION_HOLT_WINTERS
+
+    aujourd_hui = timezone.localdate()
+    quantites, presents = historique_jusqua_hier(quantites, presents, premier_jour, aujourd_hui)
+    # L'historique s'arrête hier : le premier pas prévu est aujourd'hui
+    valeurs = prevoir(
+        quantites, debuts_series(presents), premier_jour.toordinal(), horizon + 1
+    )[:, 1:]
+
+    periodes = [(aujourd_hui + timedelta(days=h)).isoformat() for h in range(1, horizon + 1)]
+    previsions = [
+        PrevisionDemande(
+            produit_id=produit_id,
+            entrepot_id=entrepot_id,
+            periode=periode,
+            quantite_prevue=round(quantite, 2),
+            version_modele=VERSION_HOLT_WINTERS,
+        )
+        for (produit_id, entrepot_id), ligne in zip(series, valeurs.tolist())
+        for periode, quantite in zip(periodes, ligne)
+    ]
+    return previsions, VERSION_HOLT_WINTERS
+
+
+@transaction.atomic
+def enregistrer_previsions(previsions):
+    """
+    Upsert sur (produit, entrepot, periode) : une relance remplace les valeurs.
+    Les prévisions des mêmes périodes qui n'ont pas été recalculées (série
+    disparue) sont supprimées.
+    """
+    if not previsions:
+        return 0
+    PrevisionDemande.objects.bulk_create(
+        previsions,
+        batch_size=TAILLE_LOT_UPSERT,
+        update_conflicts=True,
+        unique_fields=['produit', 'entrepot', 'periode'],
+        update_fields=['quantite_prevue', 'version_modele', 'date_calcul'],
+    )
+    PrevisionDemande.objects.filter(
+        periode__in={p.periode for p in previsions},
+        date_calcul__lt=min(p.date_calcul for p in previsions),
+    ).delete()
+    return len(previsions)
+
+
+def sorties_depuis_dernier_calcul():
+    """Nombre de sorties enregistrées depuis le dernier calcul (toutes si aucun)."""
+    dernier = PrevisionDemande.objects.aggregate(d=Max('date_calcul'))['d']
+    sorties = MouvementStock.objects.filter(type_mouvement='SORTIE')
+    if dernier is not None:
+        sorties = sorties.filter(date__gt=dernier)
+    return sorties.count()
+
+
+def previsions_a_venir():
+    """Lecture de la page prévisions : périodes à partir de demain (index sur periode)."""
+    demain = (timezone.localdate() + timedelta(days=1)).isoformat()
+    return PrevisionDemande.objects.filter(periode__gte=demain).select_related(
+        'produit', 'entrepot'
+    ).order_by('produit__nom', 'entrepot__nom', 'periode')
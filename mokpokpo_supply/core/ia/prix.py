@@ -0,0 +1,186 @@
+"""
+Indicateurs de prix par produit (IndicateurPrix), calculés depuis HistoriquePrix.
+
+Les relevés sont agrégés par (produit, jour) en une requête puis rangés dans
+une matrice produits × jours ; les jours sans relevé reprennent le dernier
+prix connu. Moyennes glissantes et volatilité sont calculées pour tous les
+produits à la fois par sommes cumulées le long des jours.
+
+La mise à jour est incrémentale : seuls les jours postérieurs au dernier
+indicateur de chaque produit sont écrits, en relisant juste assez
+d'historique pour remplir les fenêtres. Un relevé ajouté, modifié ou
+supprimé dans le passé efface les indicateurs à partir de sa date (signal),
+qui sont alors recalculés au passage suivant.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Avg, Count, Max, OuterRef, Subquery
+
+from core.fragments import modeles_modifies
+from core.models import HistoriquePrix, IndicateurPrix, Produit
+
+
+FENETRE_COURTE = 7
+FENETRE_LONGUE = 30
+TAILLE_LOT_UPSERT = 1000
+
+
+def somme_glissante(X, fenetre):
+    """Somme sur les `fenetre` derniers jours (fenêtre tronquée au début), ligne par ligne."""
+    cumul = np.cumsum(X, axis=1)
+    decale = np.zeros_like(cumul)
+    decale[:, fenetre:] = cumul[:, :-fenetre]
+    return cumul - decale
+
+
+def prix_journaliers(depuis=None, amorces=None):
+    """
+    Renvoie (produit_ids, premier_jour, prix, releves) : `prix` est la matrice
+    produits × jours du prix moyen du jour, prolongé par le dernier prix connu
+    (NaN avant le premier relevé du produit) ; `releves` le nombre de relevés.
+
+    Avec `depuis`, seuls les relevés à partir de cette date sont lus ;
+    `amorces` ({produit_id: prix}) donne alors le prix connu la veille, qui
+    occupe la première colonne.
+    """
+    qs = HistoriquePrix.objects.all()
+    if depuis is not None:
+        qs = qs.filter(date__gte=depuis)
+    lignes = list(qs.values('produit_id', 'date').annotate(prix=Avg('prix'), n=Count('id')).order_by())
+    amorces = amorces or {}
+    if not lignes:
+        return [], None, np.zeros((0, 0)), np.zeros((0, 0), dtype=np.int64)
+
+    produit_ids = sorted({l['produit_id'] for l in lignes} | amorces.keys())
+    rang = {p: i for i, p in enumerate(produit_ids)}
+    premier_jour = depuis - timedelta(days=1) if depuis is not None else min(l['date'] for l in lignes)
+    nb_jours = (max(l['date'] for l in lignes) - premier_jour).days + 1
+
+    i = np.array([rang[l['produit_id']] for l in lignes])
+    j = np.array([(l['date'] - premier_jour).days for l in lignes])
+    prix = np.full((len(produit_ids), nb_jours), np.nan)
+    releves = np.zeros((len(produit_ids), nb_jours), dtype=np.int64)
+    prix[i, j] = [float(l['prix']) for l in lignes]
+    releves[i, j] = [l['n'] for l in lignes]
+    for produit_id, valeur in amorces.items():
+        prix[rang[produit_id], 0] = valeur
+
+    # Report du dernier prix connu : indice du dernier jour avec un prix
+    dernier = np.where(~np.isnan(prix), np.arange(nb_jours)[None, :], 0)
+    np.maximum.accumulate(dernier, axis=1, out=dernier)
+    prix = prix[np.arange(len(produit_ids))[:, None], dernier]
+    return produit_ids, premier_jour, prix, releves
+
+
+def indicateurs(prix):
+    """
+    Moyennes glissantes 7 / 30 jours et volatilité 30 jours (écart type des
+    variations journalières log(p_t / p_t-1)) de chaque ligne de `prix`.
+    Les jours avant le premier relevé (NaN) sont exclus des fenêtres.
+    """
+    connus = ~np.isnan(prix)
+    valeurs = np.where(connus, prix, 0.0)
+
+    moyennes = {}
+    for fenetre in (FENETRE_COURTE, FENETRE_LONGUE):
+        n = somme_glissante(connus.astype(float), fenetre)
+        moyennes[fenetre] = somme_glissante(valeurs, fenetre) / np.maximum(n, 1)
+
+    rendements = np.zeros_like(valeurs)
+    avec_rendement = np.zeros_like(connus)
+    avec_rendement[:, 1:] = connus[:, 1:] & connus[:, :-1] & (valeurs[:, :-1] > 0) & (valeurs[:, 1:] > 0)
+    rendements[:, 1:] = np.log(
+        np.where(avec_rendement[:, 1:], valeurs[:, 1:], 1.0) / np.where(avec_rendement[:, 1:], valeurs[:, :-1], 1.0)
+    )
+    n = somme_glissante(avec_rendement.astype(float), FENETRE_LONGUE)
+    somme = somme_glissante(rendements, FENETRE_LONGUE)
+    somme_carres = somme_glissante(rendements * rendements, FENETRE_LONGUE)
+    variance = (somme_carres - somme * somme / np.maximum(n, 1)) / np.maximum(n - 1, 1)
+    volatilite = np.where(n >= 2, np.sqrt(np.clip(variance, 0.0, None)), np.nan)
+    return moyennes[FENETRE_COURTE], moyennes[FENETRE_LONGUE], volatilite
+
+
+def mettre_a_jour_indicateurs(complet=False):
+    """
+    Calcule les indicateurs manquants (tous si `complet`) et les enregistre.
+    Renvoie le nombre de lignes écrites.
+    """
+    derniers = {} if complet else dict(
+        IndicateurPrix.objects.values('produit_id').annotate(d=Max('date')).order_by()
+        .values_list('produit_id', 'd')
+    )
+    depuis, amorces = None, None
+    # Produits sans indicateur : tout leur historique est nécessaire
+    sans_indicateur = HistoriquePrix.objects.exclude(produit_id__in=derniers).exists()
+    if derniers and not sans_indicateur:
+        # Assez de jours pour remplir les fenêtres, et le prix reporté de la veille
+        depuis = min(derniers.values()) - timedelta(days=FENETRE_LONGUE)
+        amorces = dict(IndicateurPrix.objects.filter(
+            date=depuis - timedelta(days=1)
+        ).values_list('produit_id', 'prix_moyen'))
+
+    produit_ids, premier_jour, prix, releves = prix_journaliers(depuis, amorces)
+    if not produit_ids:
+        return 0
+    moyenne_courte, moyenne_longue, volatilite = indicateurs(prix)
+    references = dict(Produit.objects.filter(id__in=produit_ids).values_list('id', 'prix_reference'))
+
+    lignes = []
+    for i, produit_id in enumerate(produit_ids):
+        # Jours déjà calculés ignorés ; jours avant le premier relevé sans objet
+        debut = 0
+        if produit_id in derniers:
+            debut = max((derniers[produit_id] - premier_jour).days + 1, 0)
+        connus = np.flatnonzero(~np.isnan(prix[i, debut:])) + debut
+        if not len(connus):
+            continue
+        reference = float(references.get(produit_id) or 0)
+        ecarts = prix[i] / reference - 1 if reference else np.full(prix.shape[1], np.nan)
+        for j in connus.tolist():
+            lignes.append(IndicateurPrix(
+                produit_id=produit_id,
+                date=premier_jour + timedelta(days=j),
+                prix_moyen=round(float(prix[i, j]), 4),
+                nb_releves=int(releves[i, j]),
+                moyenne_7j=round(float(moyenne_courte[i, j]), 4),
+                moyenne_30j=round(float(moyenne_longue[i, j]), 4),
+                volatilite_30j=None if np.isnan(volatilite[i, j]) else round(float(volatilite[i, j]), 6),
+                ecart_reference=None if np.isnan(ecarts[j]) else round(float(ecarts[j]), 6),
+            ))
+    if not lignes:
+        return 0
+
+    with transaction.atomic():
+        if complet:
+            IndicateurPrix.objects.all().delete()
+        IndicateurPrix.objects.bulk_create(
+            lignes,
+            batch_size=TAILLE_LOT_UPSERT,
+            update_conflicts=True,
+            unique_fields=['produit', 'date'],
+            update_fields=[
+                'prix_moyen', 'nb_releves', 'moyenne_7j', 'moyenne_30j',
+                'volatilite_30j', 'ecart_reference', 'date_calcul',
+            ],
+        )
+        modeles_modifies('IndicateurPrix')
+    return len(lignes)
+
+
+def invalider_indicateurs(produit_id, depuis):
+    """Efface les indicateurs d'un produit à partir de `depuis` : recalculés au prochain passage."""
+    supprimes, _ = IndicateurPrix.objects.filter(produit_id=produit_id, date__gte=depuis).delete()
+    if supprimes:
+        modeles_modifies('IndicateurPrix')
+
+
+def tendances_prix():
+    """Dernier indicateur de chaque produit, pour le tableau de bord (une requête)."""
+    derniere_date = IndicateurPrix.objects.filter(
+        produit=OuterRef('produit')
+    ).order_by('-date').values('date')[:1]
+    return IndicateurPrix.objects.filter(
+        date=Subquery(derniere_date)
+    ).select_related('produit').order_by('produit__nom')
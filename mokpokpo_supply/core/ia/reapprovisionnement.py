@@ -0,0 +1,145 @@
+"""
+Stock de sécurité, point de commande et jours de couverture par
+(produit, entrepôt), recalculés par `manage.py calculer_reapprovisionnement`.
+
+Pour chaque couple, avec d la demande journalière prévue, σ l'écart type de
+la demande journalière observée, L le délai de réapprovisionnement (jours) et
+z le quantile du niveau de service :
+
+    stock de sécurité = z · σ · √L
+    point de commande = d · L + stock de sécurité
+    couverture        = stock / d
+
+Trois requêtes agrégées (prévisions, sorties, soldes des lots) remplissent des
+vecteurs alignés sur la liste des couples ; tout le calcul se fait ensuite en
+une passe NumPy.
+"""
+from datetime import timedelta
+from statistics import NormalDist
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Sum
+from django.utils import timezone
+
+from core.fragments import modeles_modifies
+from core.models import Lot, NiveauReapprovisionnement, PrevisionDemande
+
+from .model import ventes_journalieres
+from .previsions import historique_jusqua_hier
+
+
+DELAI_REAPPRO_JOURS = 7
+NIVEAU_SERVICE = 0.95
+FENETRE_ECART_TYPE = 90  # jours d'historique pour la variabilité de la demande
+
+
+def parametres():
+    """(délai en jours, niveau de service) depuis les settings."""
+    return (
+        getattr(settings, 'DELAI_REAPPRO_JOURS', DELAI_REAPPRO_JOURS),
+        getattr(settings, 'NIVEAU_SERVICE_REAPPRO', NIVEAU_SERVICE),
+    )
+
+
+def statistiques_demande(quantites, presents, fenetre=FENETRE_ECART_TYPE):
+    """
+    Moyenne et écart type de la demande journalière de chaque série sur ses
+    `fenetre` derniers jours (à partir de sa première sortie, jours sans
+    sortie comptés à 0).
+    """
+    S, T = quantites.shape
+    debut = np.where(presents.any(axis=1), presents.argmax(axis=1), T)
+    jours = np.arange(max(T - fenetre, 0), T)
+    retenus = jours[None, :] >= debut[:, None]
+    valeurs = np.where(retenus, quantites[:, jours], 0.0)
+    n = retenus.sum(axis=1)
+    moyenne = valeurs.sum(axis=1) / np.maximum(n, 1)
+    ecarts = np.where(retenus, valeurs - moyenne[:, None], 0.0)
+    variance = (ecarts * ecarts).sum(axis=1) / np.maximum(n - 1, 1)
+    return moyenne, np.sqrt(variance)
+
+
+def calculer_niveaux(delai=None, niveau_service=None):
+    """Renvoie la liste des NiveauReapprovisionnement (non enregistrés)."""
+    delai_defaut, service_defaut = parametres()
+    delai = delai_defaut if delai is None else delai
+    z = NormalDist().inv_cdf(service_defaut if niveau_service is None else niveau_service)
+    aujourd_hui = timezone.localdate()
+
+    series, premier_jour, quantites, presents = ventes_journalieres(par_entrepot=True)
+    if series:
+        quantites, presents = historique_jusqua_hier(quantites, presents, premier_jour, aujourd_hui)
+    historique_moyen, historique_ecart = statistiques_demande(quantites, presents)
+
+    prevues = {
+        (l['produit_id'], l['entrepot_id']): l['moyenne']
+        for l in PrevisionDemande.objects.filter(
+            periode__gte=(aujourd_hui + timedelta(days=1)).isoformat()
+        ).values('produit_id', 'entrepot_id').annotate(moyenne=Avg('quantite_prevue')).order_by()
+    }
+    soldes = {
+        (l['produit_id'], l['emplacement__entrepot_id']): l['total']
+        for l in Lot.objects.filter(
+            quantite_restante__gt=0, emplacement__isnull=False
+        ).values('produit_id', 'emplacement__entrepot_id').annotate(total=Sum('quantite_restante')).order_by()
+    }
+
+    couples = sorted(set(series) | prevues.keys() | soldes.keys())
+    if not couples:
+        return []
+    rang = {couple: i for i, couple in enumerate(series)}
+    n = len(couples)
+
+    # Vecteurs alignés sur `couples`
+    indices = np.array([rang.get(c, -1) for c in couples])
+    connus = indices >= 0
+    moyenne_observee = np.zeros(n)
+    ecart_type = np.zeros(n)
+    moyenne_observee[connus] = historique_moyen[indices[connus]]
+    ecart_type[connus] = historique_ecart[indices[connus]]
+    prevision = np.array([prevues.get(c, np.nan) for c in couples], dtype=float)
+    demande = np.where(np.isnan(prevision), moyenne_observee, prevision)
+    stock = np.array([soldes.get(c, 0.0) for c in couples], dtype=float)
+
+    stock_securite = z * ecart_type * np.sqrt(delai)
+    point_commande = demande * delai + stock_securite
+    avec_demande = demande > 0
+    couverture = np.divide(stock, demande, out=np.full(n, np.nan), where=avec_demande)
+    sous_seuil = avec_demande & (stock <= point_commande)
+
+    return [
+        NiveauReapprovisionnement(
+            produit_id=produit_id,
+            entrepot_id=entrepot_id,
+            stock=round(s, 2),
+            demande_journaliere=round(d, 3),
+            ecart_type_journalier=round(e, 3),
+            stock_securite=round(ss, 2),
+            point_commande=round(pc, 2),
+            jours_couverture=None if np.isnan(j) else round(j, 1),
+            sous_seuil=alerte,
+        )
+        for (produit_id, entrepot_id), s, d, e, ss, pc, j, alerte in zip(
+            couples, stock.tolist(), demande.tolist(), ecart_type.tolist(),
+            stock_securite.tolist(), point_commande.tolist(), couverture.tolist(),
+            sous_seuil.tolist(),
+        )
+    ]
+
+
+@transaction.atomic
+def enregistrer_niveaux(niveaux):
+    """Remplace le contenu de la table ; renvoie le nombre de couples sous le seuil."""
+    NiveauReapprovisionnement.objects.all().delete()
+    NiveauReapprovisionnement.objects.bulk_create(niveaux, batch_size=1000)
+    modeles_modifies('NiveauReapprovisionnement')
+    return sum(n.sous_seuil for n in niveaux)
+
+
+def niveaux_sous_seuil():
+    """Lecture du tableau de bord : couples à réapprovisionner, les plus urgents d'abord."""
+    return NiveauReapprovisionnement.objects.filter(sous_seuil=True).select_related(
+        'produit', 'entrepot'
+    ).order_by('jours_couverture', 'produit__nom', 'entrepot__nom')
@@ -0,0 +1,273 @@
+"""
+Registre versionné du modèle de ventes.
+
+Organisation de settings.ML_MODELS_DIR :
+
+    VERSION_ACTIVE              nom de la version servie (remplacé atomiquement)
+    versions/<version>/
+        metadata.json           features, date d'entraînement, métriques, format
+        *.npy                   format 'lineaire' : tableaux lus en mmap
+        *.joblib                format 'joblib' : autres modèles
+
+Une version publiée n'est jamais modifiée : promouvoir une version revient à
+réécrire VERSION_ACTIVE (os.replace). Chaque processus garde le prédicteur
+actif en mémoire et ne fait qu'un stat() de VERSION_ACTIVE, au plus toutes les
+ML_VERIFICATION_INTERVALLE secondes ; les workers basculent donc sur la
+nouvelle version sans redémarrage.
+
+Sans VERSION_ACTIVE, le registre retombe sur les anciens fichiers
+modele_ventes_cafe_cacao.pkl / scaler.pkl, rechargés si leur empreinte change.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.utils import timezone
+
+from .predicteurs import FORMATS, depuis_sklearn
+
+
+logger = logging.getLogger(__name__)
+
+FICHIER_VERSION_ACTIVE = 'VERSION_ACTIVE'
+DOSSIER_VERSIONS = 'versions'
+FICHIER_MODELE = 'modele_ventes_cafe_cacao.pkl'
+FICHIER_SCALER = 'scaler.pkl'
+VERIFICATION_INTERVALLE = 30
+
+
+class ModeleIndisponible(Exception):
+    """Aucune version du modèle n'a pu être chargée."""
+
+
+def _empreinte(chemins):
+    h = hashlib.sha256()
+    for chemin in sorted(chemins):
+        with open(chemin, 'rb') as f:
+            for bloc in iter(lambda: f.read(1 << 20), b''):
+                h.update(bloc)
+    return h.hexdigest()
+
+
+def _signature(chemins):
+    return tuple((s.st_mtime_ns, s.st_size) for s in (chemin.stat() for chemin in chemins))
+
+
+def _ecrire_atomiquement(chemin, contenu):
+    temporaire = chemin.with_name(f".{chemin.name}.{uuid.uuid4().hex}")
+    temporaire.write_text(contenu)
+    os.replace(temporaire, chemin)
+
+
+def _dossier_version(racine, version):
+    return racine / DOSSIER_VERSIONS / version
+
+
+def lire_metadonnees(racine, version):
+    return json.loads((_dossier_version(racine, version) / 'metadata.json').read_text(encoding='utf-8'))
+
+
+def version_active(racine):
+    try:
+        return (racine / FICHIER_VERSION_ACTIVE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def lister_versions(racine):
+    """Métadonnées de toutes les versions publiées, la plus récente d'abord."""
+    dossier = racine / DOSSIER_VERSIONS
+    if not dossier.is_dir():
+        return []
+    active = version_active(racine)
+    versions = []
+    for chemin in dossier.iterdir():
+        if chemin.name.startswith('.') or not (chemin / 'metadata.json').exists():
+            continue
+        meta = lire_metadonnees(racine, chemin.name)
+        meta['active'] = meta['version'] == active
+        versions.append(meta)
+    return sorted(versions, key=lambda m: m['date_publication'], reverse=True)
+
+
+def publier_version(racine, modele, scaler, features, metriques=None,
+                    date_entrainement=None, promouvoir=False, echantillon=None):
+    """
+    Enregistre un couple (modèle, scaler) ajusté comme nouvelle version.
+
+    `echantillon` (lignes brutes) sert à vérifier que l'export NumPy reproduit
+    le modèle ; à défaut, un échantillon est tiré autour des moyennes du scaler.
+
+    Les fichiers sont écrits dans un dossier temporaire renommé à la fin :
+    une version visible est toujours complète. Renvoie le nom de la version.
+    """
+    predicteur = depuis_sklearn(modele, scaler, features, echantillon=echantillon)
+    maintenant = timezone.now()
+    version = f"{maintenant:%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+    (racine / DOSSIER_VERSIONS).mkdir(parents=True, exist_ok=True)
+    temporaire = racine / DOSSIER_VERSIONS / f".{version}"
+    temporaire.mkdir()
+    try:
+        predicteur.sauvegarder(temporaire)
+        (temporaire / 'metadata.json').write_text(json.dumps({
+            'version': version,
+            'format': predicteur.FORMAT,
+            'type_modele': type(modele).__name__,
+            'features': list(features),
+            'date_entrainement': (date_entrainement or maintenant).isoformat(),
+            'date_publication': maintenant.isoformat(),
+            'metriques': metriques or {},
+            'empreinte': _empreinte(list(temporaire.iterdir())),
+        }, indent=2, ensure_ascii=False), encoding='utf-8')
+        os.rename(temporaire, _dossier_version(racine, version))
+    except Exception:
+        shutil.rmtree(temporaire, ignore_errors=True)
+        raise
+
+    if promouvoir:
+        promouvoir_version(racine, version)
+    return version
+
+
+def promouvoir_version(racine, version):
+    """Fait servir `version` par tous les workers (au plus tard après l'intervalle de vérification)."""
+    meta = lire_metadonnees(racine, version)
+    if meta['format'] not in FORMATS:
+        raise ValueError(f"Format inconnu : {meta['format']}")
+    _ecrire_atomiquement(racine / FICHIER_VERSION_ACTIVE, version + "\n")
+
+
+class RegistreModele:
+
+    def __init__(self, racine, intervalle=VERIFICATION_INTERVALLE):
+        self.racine = racine
+        self.intervalle = intervalle
+        self._verrou = threading.Lock()
+        self._predicteur = None
+        self._metadonnees = None
+        self._signature = None
+        self._erreur = None
+        self._prochaine_verification = 0.0
+
+    def _fichiers_historiques(self):
+        return (self.racine / FICHIER_MODELE, self.racine / FICHIER_SCALER)
+
+    def _fichiers_surveilles(self):
+        pointeur = self.racine / FICHIER_VERSION_ACTIVE
+        return (pointeur,) if pointeur.exists() else self._fichiers_historiques()
+
+    def _charger_version(self, version):
+        if self._metadonnees is not None and self._metadonnees['version'] == version:
+            return
+        meta = lire_metadonnees(self.racine, version)
+        predicteur = FORMATS[meta['format']].charger(_dossier_version(self.racine, version))
+        self._predicteur, self._metadonnees = predicteur, meta
+        logger.info("Modèle de ventes : version %s chargée", version)
+
+    def _charger_historique(self):
+        import joblib
+
+        fichiers = self._fichiers_historiques()
+        empreinte = _empreinte(fichiers)
+        if self._metadonnees is not None and self._metadonnees.get('empreinte') == empreinte:
+            return  # fichiers réécrits à l'identique
+
+        modele, scaler = (joblib.load(chemin) for chemin in fichiers)
+        features = list(getattr(scaler, 'feature_names_in_', []))
+        predicteur = depuis_sklearn(modele, scaler, features)
+        self._predicteur, self._metadonnees = predicteur, {
+            'version': f"historique-{empreinte[:12]}",
+            'format': predicteur.FORMAT,
+            'type_modele': type(modele).__name__,
+            'features': features,
+            'date_entrainement': None,
+            'metriques': {},
+            'empreinte': empreinte,
+        }
+        logger.info("Modèle de ventes : fichiers historiques chargés (empreinte %s)", empreinte[:12])
+
+    def _recharger_si_modifie(self):
+        try:
+            surveilles = self._fichiers_surveilles()
+            signature = (surveilles, _signature(surveilles))
+        except OSError as e:
+            self._erreur = f"{type(e).__name__}: {e}"
+            return
+        if signature == self._signature:
+            return
+        # Retenue même en cas d'échec : on ne réessaie qu'au prochain changement
+        self._signature = signature
+        try:
+            version = version_active(self.racine)
+            if version:
+                self._charger_version(version)
+            else:
+                self._charger_historique()
+            self._erreur = None
+        except Exception as e:
+            # On garde la version déjà chargée si la nouvelle est illisible
+            self._erreur = f"{type(e).__name__}: {e}"
+            logger.exception("Échec du chargement du modèle de ventes")
+
+    def _verifier(self):
+        if time.monotonic() < self._prochaine_verification:
+            return
+        with self._verrou:
+            # Un autre thread a pu vérifier pendant l'attente du verrou
+            if time.monotonic() < self._prochaine_verification:
+                return
+            try:
+                self._recharger_si_modifie()
+            finally:
+                # Échéance fixée après le chargement seulement : les threads arrivés
+                # entre-temps attendent le verrou au lieu de repartir sans modèle
+                self._prochaine_verification = time.monotonic() + self.intervalle
+
+    def predicteur(self):
+        """Renvoie (prédicteur, métadonnées) ; lève ModeleIndisponible si rien n'a pu être chargé."""
+        self._verifier()
+        predicteur, meta = self._predicteur, self._metadonnees
+        if predicteur is None:
+            raise ModeleIndisponible(self._erreur or "Modèle non chargé")
+        return predicteur, meta
+
+    def est_pret(self):
+        self._verifier()
+        return self._predicteur is not None
+
+    def etat(self):
+        """Résumé pour les pages d'administration ou de santé."""
+        pret = self.est_pret()
+        meta = self._metadonnees or {}
+        return {
+            'pret': pret,
+            'version': meta.get('version'),
+            'format': meta.get('format'),
+            'date_entrainement': meta.get('date_entrainement'),
+            'metriques': meta.get('metriques'),
+            'erreur': self._erreur,
+        }
+
+
+_registre = None
+_verrou_registre = threading.Lock()
+
+
+def registre_modele():
+    """Registre unique du processus, créé au premier appel."""
+    global _registre
+    if _registre is None:
+        with _verrou_registre:
+            if _registre is None:
+                _registre = RegistreModele(
+                    settings.ML_MODELS_DIR,
+                    getattr(settings, 'ML_VERIFICATION_INTERVALLE', VERIFICATION_INTERVALLE),
+                )
+    return _registre
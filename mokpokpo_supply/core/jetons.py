@@ -0,0 +1,43 @@
+import hashlib
+import secrets
+from datetime import timedelta
+
+from django.utils import timezone
+
+from .models import JetonAPI
+
+
+# Date de dernière utilisation rafraîchie au plus une fois par intervalle
+INTERVALLE_MISE_A_JOUR = timedelta(minutes=5)
+
+
+def empreinte(cle):
+    """Empreinte SHA-256 d'une clé : les clés sont aléatoires, un sel est inutile."""
+    return hashlib.sha256(cle.encode()).hexdigest()
+
+
+def creer_jeton(utilisateur, nom):
+    """Crée un jeton et renvoie `(jeton, cle)` ; la clé n'est plus récupérable ensuite."""
+    cle = secrets.token_urlsafe(32)
+    jeton = JetonAPI.objects.create(
+        utilisateur=utilisateur, nom=nom, prefixe=cle[:8], cle_hachee=empreinte(cle),
+    )
+    return jeton, cle
+
+
+def utilisateur_du_jeton(cle):
+    """Utilisateur actif porteur de la clé, ou None si la clé est inconnue ou révoquée."""
+    if not cle:
+        return None
+    jeton = (
+        JetonAPI.objects.select_related('utilisateur__role')
+        .filter(cle_hachee=empreinte(cle), actif=True, utilisateur__is_active=True)
+        .first()
+    )
+    if jeton is None:
+        return None
+
+    maintenant = timezone.now()
+    if jeton.derniere_utilisation is None or maintenant - jeton.derniere_utilisation > INTERVALLE_MISE_A_JOUR:
+        JetonAPI.objects.filter(pk=jeton.pk).update(derniere_utilisation=maintenant)
+    return jeton.utilisateur
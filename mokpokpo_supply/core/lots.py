@@ -0,0 +1,48 @@
+from django.core.cache import cache
+
+from .models import Lot
+
+
+DUREE_CACHE_LOTS = 60  # secondes, filet de sécurité en plus de l'invalidation
+
+
+def _cle_version(produit_id):
+    return f"lots_disponibles:version:{produit_id}"
+
+
+def invalider_lots_disponibles(produit_id):
+    """Change la version du produit : les entrées en cache deviennent inaccessibles."""
+    try:
+        cache.incr(_cle_version(produit_id))
+    except ValueError:
+        cache.set(_cle_version(produit_id), 1, None)
+
+
+def lots_disponibles(produit_id, entrepot_id=None):
+    """
+    Lots encore en stock pour un produit (et éventuellement un entrepôt),
+    mis en cache jusqu'à la prochaine modification d'un lot de ce produit.
+    """
+    version = cache.get_or_set(_cle_version(produit_id), 1, None)
+    cle = f"lots_disponibles:{produit_id}:{entrepot_id or '*'}:v{version}"
+
+    lots = cache.get(cle)
+    if lots is None:
+        qs = Lot.objects.filter(
+            produit_id=produit_id, quantite_restante__gt=0
+        ).select_related('emplacement__entrepot').order_by('-date_production')
+        if entrepot_id:
+            qs = qs.filter(emplacement__entrepot_id=entrepot_id)
+        lots = [
+            {
+                'id': lot.id,
+                'code_lot': lot.code_lot,
+                'quantite_restante': lot.quantite_restante,
+                'emplacement': lot.emplacement.code_emplacement if lot.emplacement else None,
+                'entrepot': lot.emplacement.entrepot.nom if lot.emplacement else None,
+                'entrepot_id': lot.emplacement.entrepot_id if lot.emplacement else None,
+            }
+            for lot in qs
+        ]
+        cache.set(cle, lots, DUREE_CACHE_LOTS)
+    return lots
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from core.archivage import archiver_mouvements, date_limite_archivage
+
+
+class Command(BaseCommand):
+    help = (
+        "Déplace les mouvements de stock plus anciens que la rétention vers "
+        "l'archive, avec un résumé mensuel. À lancer chaque mois."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retention', type=int,
+            help="Nombre de mois gardés dans la table principale (défaut : MOUVEMENTS_RETENTION_MOIS)"
+        )
+
+    def handle(self, *args, **options):
+        limite = date_limite_archivage(options['retention'])
+        self.stdout.write(f"Archivage des mouvements antérieurs au {limite}")
+
+        resultat = archiver_mouvements(options['retention'])
+        for mois, nombre in resultat.items():
+            self.stdout.write(f"{mois:%Y-%m} : {nombre} mouvement(s) archivé(s)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{sum(resultat.values())} mouvement(s) archivé(s) au total"
+        ))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.ia.lissage import backtest
+from core.ia.model import ventes_journalieres
+from core.ia.previsions import HORIZON_PAR_DEFAUT, historique_jusqua_hier
+
+
+class Command(BaseCommand):
+    help = (
+        "Évalue les prévisions de demande par validation à origine glissante : "
+        "Holt-Winters comparé à la moyenne journalière et à la semaine précédente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horizon', type=int, default=HORIZON_PAR_DEFAUT,
+            help=f"Nombre de jours prévus à chaque origine (défaut : {HORIZON_PAR_DEFAUT})"
+        )
+        parser.add_argument(
+            '--origines', type=int, default=4,
+            help="Nombre d'origines évaluées, les plus récentes (défaut : 4)"
+        )
+        parser.add_argument(
+            '--pas', type=int, default=None,
+            help="Écart en jours entre deux origines (défaut : l'horizon)"
+        )
+
+    def handle(self, *args, **options):
+        series, premier_jour, quantites, presents = ventes_journalieres(par_entrepot=True)
+        if not series:
+            self.stdout.write("Aucune sortie de stock : rien à évaluer")
+            return
+        quantites, presents = historique_jusqua_hier(
+            quantites, presents, premier_jour, timezone.localdate()
+        )
+
+        resultats = backtest(
+            quantites, presents, premier_jour.toordinal(),
+            horizon=options['horizon'], origines=options['origines'], pas=options['pas'],
+        )
+        if not resultats:
+            self.stdout.write("Historique trop court pour les origines demandées")
+            return
+
+        self.stdout.write(
+            f"{len(series)} série(s) produit × entrepôt, {quantites.shape[1]} jour(s) d'historique"
+        )
+        self.stdout.write(f"{'méthode':<20} {'MAE':>10} {'RMSE':>10} {'WAPE':>8} {'durée':>9}")
+        for nom, m in resultats.items():
+            wape = f"{m['wape']:.1%}" if m['wape'] is not None else '-'
+            self.stdout.write(
+                f"{nom:<20} {m['mae']:>10.3f} {m['rmse']:>10.3f} {wape:>8} {m['secondes']:>8.2f}s"
+            )
@@ -0,0 +1,119 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+
+from core.donnees_synthetiques import generer_donnees, supprimer_donnees
+from core.models import Utilisateur, Produit, Lot, MouvementStock, Livraison
+from core.mouvements import mouvements_filtres, page_mouvements, decoder_curseur
+
+
+# Index ajoutés pour les requêtes des tableaux de bord (migration 0018)
+INDEX_MESURES = [
+    (Utilisateur, 'idx_utilisateur_role_actif'),
+    (Lot, 'idx_lot_disponible'),
+    (MouvementStock, 'idx_mouvement_date_id'),
+    (MouvementStock, 'idx_mouvement_lot_type_date'),
+    (Livraison, 'idx_livraison_livreur_date'),
+    (Livraison, 'idx_livraison_statut_date'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure les requêtes des tableaux de bord (EXPLAIN + temps). "
+        "--generer crée un jeu de données synthétique : base de développement uniquement."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--generer', type=int, metavar='N',
+                            help="Crée N mouvements synthétiques (et lots, livraisons associés)")
+        parser.add_argument('--comparer', action='store_true',
+                            help="Mesure aussi sans les index composites (supprimés puis recréés)")
+        parser.add_argument('--repetitions', type=int, default=20)
+        parser.add_argument('--nettoyer', action='store_true',
+                            help="Supprime les données synthétiques puis quitte")
+
+    def requetes(self):
+        """Requêtes des tableaux de bord : {nom: (queryset pour EXPLAIN, exécution)}."""
+        livreur = Utilisateur.objects.filter(role__nom='LIVREUR').order_by('id').first()
+        lot = Lot.objects.order_by('-id').first()
+        produit = Produit.objects.order_by('id').first()
+        _, curseur = page_mouvements(mouvements_filtres({}))
+
+        querysets = {
+            "dashboard_livreur : livraisons du livreur":
+                Livraison.objects.filter(livreur=livreur).order_by('date_livraison'),
+            "optimiser_tournee : livraisons du jour":
+                Livraison.objects.filter(
+                    livreur=livreur, date_livraison=date.today(),
+                    statut__in=['PREPARATION', 'EN_ROUTE'],
+                ),
+            "dashboard_stock : livraisons en préparation":
+                Livraison.objects.filter(statut='PREPARATION').order_by('date_livraison'),
+            "dashboard_stock : livreurs actifs":
+                Utilisateur.objects.filter(role__nom='LIVREUR', actif=True),
+            "dashboard_stock : lots disponibles d'un produit":
+                Lot.objects.filter(produit=produit, quantite_restante__gt=0).order_by('-date_production'),
+            "historique : première page":
+                mouvements_filtres({}).order_by('-date', '-id')[:51],
+            "historique : sorties d'un lot":
+                MouvementStock.objects.filter(lot=lot, type_mouvement='SORTIE').order_by('date'),
+        }
+        requetes = {
+            nom: (qs, lambda qs=qs: list(qs.all()))
+            for nom, qs in querysets.items()
+        }
+        if curseur:
+            date_curseur, id_curseur = decoder_curseur(curseur)
+            qs = mouvements_filtres({}).filter(
+                Q(date__lt=date_curseur) | Q(date=date_curseur, id__lt=id_curseur)
+            ).order_by('-date', '-id')[:51]
+            requetes["historique : page suivante (curseur)"] = (qs, lambda qs=qs: list(qs.all()))
+        return requetes
+
+    def mesurer(self, repetitions):
+        for nom, (qs, executer) in self.requetes().items():
+            executer()  # échauffement du cache
+            debut = time.perf_counter()
+            for _ in range(repetitions):
+                executer()
+            duree_ms = (time.perf_counter() - debut) * 1000 / repetitions
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{nom} : {duree_ms:.2f} ms"))
+            self.stdout.write(qs.explain())
+
+    def handle(self, *args, **options):
+        if options['nettoyer']:
+            supprimer_donnees()
+            self.stdout.write(self.style.SUCCESS("Données synthétiques supprimées"))
+            return
+
+        if options['generer']:
+            if options['generer'] <= 0:
+                raise CommandError("--generer doit être positif")
+            nombres = generer_donnees(options['generer'])
+            self.stdout.write(
+                "Généré : " + ", ".join(f"{n} {nom}" for nom, n in nombres.items())
+            )
+
+        if options['comparer']:
+            index = [
+                (modele, next(i for i in modele._meta.indexes if i.name == nom))
+                for modele, nom in INDEX_MESURES
+            ]
+            self.stdout.write(self.style.WARNING("\n=== SANS index composites ==="))
+            with connection.schema_editor() as editor:
+                for modele, i in index:
+                    editor.remove_index(modele, i)
+            try:
+                self.mesurer(options['repetitions'])
+            finally:
+                with connection.schema_editor() as editor:
+                    for modele, i in index:
+                        editor.add_index(modele, i)
+
+        self.stdout.write(self.style.WARNING("\n=== AVEC index composites ==="))
+        self.mesurer(options['repetitions'])
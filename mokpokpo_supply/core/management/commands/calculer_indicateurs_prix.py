@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.ia.prix import mettre_a_jour_indicateurs
+
+
+class Command(BaseCommand):
+    help = (
+        "Met à jour les indicateurs journaliers de prix (moyennes glissantes, "
+        "volatilité, écart au prix de référence) à partir de HistoriquePrix. "
+        "À planifier (cron), par exemple chaque nuit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--complet', action='store_true',
+            help="Recalcule tout l'historique au lieu des seuls jours manquants"
+        )
+
+    def handle(self, *args, **options):
+        debut = time.perf_counter()
+        lignes = mettre_a_jour_indicateurs(complet=options['complet'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{lignes} indicateur(s) de prix enregistré(s) en {time.perf_counter() - debut:.2f} s"
+        ))
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.ia.previsions import (
+    HORIZON_PAR_DEFAUT, calculer_previsions, enregistrer_previsions, sorties_depuis_dernier_calcul
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcule les prévisions de demande par produit et entrepôt et les "
+        "enregistre dans PrevisionDemande. À planifier (cron), par exemple chaque nuit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horizon', type=int, default=HORIZON_PAR_DEFAUT,
+            help=f"Nombre de jours prévus (défaut : {HORIZON_PAR_DEFAUT})"
+        )
+        parser.add_argument(
+            '--seuil-sorties', type=int, default=0,
+            help="Ne recalcule que si au moins ce nombre de sorties a été saisi depuis le dernier calcul"
+        )
+
+    def handle(self, *args, **options):
+        if options['seuil_sorties']:
+            nouvelles = sorties_depuis_dernier_calcul()
+            if nouvelles < options['seuil_sorties']:
+                self.stdout.write(
+                    f"{nouvelles} sortie(s) depuis le dernier calcul "
+                    f"(seuil {options['seuil_sorties']}) : rien à faire"
+                )
+                return
+
+        debut = time.perf_counter()
+        previsions, version = calculer_previsions(options['horizon'])
+        nombre = enregistrer_previsions(previsions)
+        self.stdout.write(self.style.SUCCESS(
+            f"{nombre} prévision(s) enregistrée(s) (modèle {version}) "
+            f"en {time.perf_counter() - debut:.2f} s"
+        ))
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.ia.reapprovisionnement import calculer_niveaux, enregistrer_niveaux, parametres
+
+
+class Command(BaseCommand):
+    help = (
+        "Calcule stock de sécurité, point de commande et jours de couverture "
+        "par produit et entrepôt. À lancer après calculer_previsions."
+    )
+
+    def add_arguments(self, parser):
+        delai, niveau_service = parametres()
+        parser.add_argument(
+            '--delai', type=float, default=delai,
+            help=f"Délai de réapprovisionnement en jours (défaut : {delai})"
+        )
+        parser.add_argument(
+            '--niveau-service', type=float, default=niveau_service,
+            help=f"Probabilité de ne pas tomber en rupture pendant le délai (défaut : {niveau_service})"
+        )
+
+    def handle(self, *args, **options):
+        if not 0 < options['niveau_service'] < 1:
+            raise CommandError("Le niveau de service doit être strictement compris entre 0 et 1")
+        if options['delai'] < 0:
+            raise CommandError("Le délai doit être positif")
+
+        debut = time.perf_counter()
+        niveaux = calculer_niveaux(options['delai'], options['niveau_service'])
+        alertes = enregistrer_niveaux(niveaux)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(niveaux)} couple(s) produit × entrepôt calculé(s), "
+            f"{alertes} sous le point de commande, en {time.perf_counter() - debut:.2f} s"
+        ))
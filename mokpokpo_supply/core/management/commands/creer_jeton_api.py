@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from core.jetons import creer_jeton
+
+
+class Command(BaseCommand):
+    help = (
+        "Crée un jeton d'API pour un utilisateur (en-tête Authorization: Bearer <clé>). "
+        "La clé n'est affichée qu'une fois : seule son empreinte est conservée."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help="Utilisateur porteur du jeton ; ses droits sont ceux de son rôle")
+        parser.add_argument('--nom', default="Outil", help="Outil ou usage du jeton (défaut : Outil)")
+
+    def handle(self, *args, **options):
+        try:
+            utilisateur = get_user_model().objects.get(username=options['username'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"Utilisateur inconnu : {options['username']}")
+
+        jeton, cle = creer_jeton(utilisateur, options['nom'])
+        self.stdout.write(self.style.SUCCESS(f"Jeton « {jeton.nom} » créé pour {utilisateur.username}"))
+        self.stdout.write(cle)
@@ -0,0 +1,86 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.ia.entrainement import EPOQUES, TAILLE_BLOC, entrainer, evaluer_predicteur
+from core.ia.ml_service import MLPredictionService
+from core.ia.registre import ModeleIndisponible, promouvoir_version, publier_version, registre_modele
+
+
+class Command(BaseCommand):
+    help = (
+        "Réentraîne le modèle de ventes sur ObservationVentes (lecture en flux, "
+        "ajustement incrémental), l'évalue sur les observations de validation "
+        "et le publie comme nouvelle version du registre."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--epoques', type=int, default=EPOQUES,
+            help=f"Passes sur les observations d'entraînement (défaut : {EPOQUES})"
+        )
+        parser.add_argument(
+            '--taille-bloc', type=int, default=TAILLE_BLOC,
+            help=f"Lignes lues et ajustées à la fois (défaut : {TAILLE_BLOC})"
+        )
+        promotion = parser.add_mutually_exclusive_group()
+        promotion.add_argument('--promouvoir', action='store_true', help="Sert immédiatement la nouvelle version")
+        promotion.add_argument(
+            '--promouvoir-si-meilleur', action='store_true',
+            help="Ne sert la nouvelle version que si son RMSE de validation bat celui de la version active"
+        )
+
+    def handle(self, *args, **options):
+        if options['epoques'] < 1 or options['taille_bloc'] < 1:
+            raise CommandError("--epoques et --taille-bloc doivent être positifs")
+
+        features = MLPredictionService().colonnes_attendues
+        debut = time.perf_counter()
+        try:
+            modele, scaler, metriques = entrainer(
+                features, epoques=options['epoques'], taille_bloc=options['taille_bloc']
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        self.stdout.write(
+            f"{metriques['n_entrainement']} observation(s) d'entraînement, "
+            f"{metriques.get('n_validation', 0)} de validation, en {time.perf_counter() - debut:.1f} s"
+        )
+        for nom in ('mae', 'rmse', 'r2'):
+            if metriques.get(nom) is not None:
+                self.stdout.write(f"  {nom.upper()} : {metriques[nom]:.4f}")
+
+        racine = settings.ML_MODELS_DIR
+        version = publier_version(
+            racine, modele, scaler, features,
+            metriques=metriques,
+            date_entrainement=timezone.now(),
+            promouvoir=options['promouvoir'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Version {version} publiée"))
+
+        if options['promouvoir']:
+            self.stdout.write(self.style.SUCCESS("Nouvelle version promue"))
+        elif options['promouvoir_si_meilleur']:
+            self._promouvoir_si_meilleur(racine, version, metriques)
+
+    def _promouvoir_si_meilleur(self, racine, version, metriques):
+        if metriques.get('rmse') is None:
+            self.stdout.write("Pas d'observation de validation : version non promue")
+            return
+        try:
+            predicteur, meta = registre_modele().predicteur()
+        except ModeleIndisponible:
+            actuelles = {}
+        else:
+            actuelles = evaluer_predicteur(predicteur, meta['features'] or MLPredictionService().colonnes_attendues)
+        if actuelles.get('rmse') is not None and actuelles['rmse'] <= metriques['rmse']:
+            self.stdout.write(
+                f"Version active {meta['version']} conservée "
+                f"(RMSE {actuelles['rmse']:.4f} contre {metriques['rmse']:.4f})"
+            )
+            return
+        promouvoir_version(racine, version)
+        self.stdout.write(self.style.SUCCESS("Nouvelle version promue"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.ia.charts import FORMATS, graphique
+from core.ia.ml_service import MLPredictionService
+from core.ia.registre import ModeleIndisponible
+
+
+class Command(BaseCommand):
+    help = (
+        "Rend et met en cache les graphiques de la page prévisions pour la "
+        "version active du modèle. À lancer après une promotion."
+    )
+
+    def handle(self, *args, **options):
+        try:
+            predicteur, meta = MLPredictionService().registre.predicteur()
+        except ModeleIndisponible as e:
+            raise CommandError(f"Aucun modèle chargé ({e})")
+        for nom in ('importance', 'saisonnalite'):
+            for format in FORMATS:
+                taille = len(graphique(nom, predicteur, meta, format))
+                self.stdout.write(f"{nom}.{format} : {taille} octets")
+        self.stdout.write(self.style.SUCCESS(f"Graphiques de la version {meta['version']} en cache"))
@@ -0,0 +1,62 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from core.ia.registre import FICHIER_MODELE, FICHIER_SCALER, publier_version
+
+
+class Command(BaseCommand):
+    help = (
+        "Publie un modèle de ventes ajusté (pickles joblib du modèle et du scaler) "
+        "comme nouvelle version du registre. Les régressions linéaires et les "
+        "modèles à arbres sont exportés en tableaux .npy (inférence NumPy pure)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modele', type=Path,
+            help=f"Pickle du modèle (défaut : ML_MODELS_DIR/{FICHIER_MODELE})"
+        )
+        parser.add_argument(
+            '--scaler', type=Path,
+            help=f"Pickle du scaler (défaut : ML_MODELS_DIR/{FICHIER_SCALER})"
+        )
+        parser.add_argument('--metriques', default='{}', help="Métriques d'évaluation en JSON, ex. '{\"r2\": 0.91}'")
+        parser.add_argument('--date-entrainement', help="Date d'entraînement (ISO 8601)")
+        parser.add_argument('--promouvoir', action='store_true', help="Sert immédiatement la nouvelle version")
+
+    def handle(self, *args, **options):
+        import joblib
+
+        racine = settings.ML_MODELS_DIR
+        chemin_modele = options['modele'] or racine / FICHIER_MODELE
+        chemin_scaler = options['scaler'] or racine / FICHIER_SCALER
+        try:
+            metriques = json.loads(options['metriques'])
+        except ValueError:
+            raise CommandError("--metriques doit être un objet JSON")
+
+        date_entrainement = None
+        if options['date_entrainement']:
+            date_entrainement = parse_datetime(options['date_entrainement'])
+            if date_entrainement is None:
+                raise CommandError("--date-entrainement invalide")
+
+        modele = joblib.load(chemin_modele)
+        scaler = joblib.load(chemin_scaler)
+        features = list(getattr(scaler, 'feature_names_in_', []))
+        if not features:
+            raise CommandError("Le scaler ne connaît pas le nom de ses colonnes (feature_names_in_)")
+
+        version = publier_version(
+            racine, modele, scaler, features,
+            metriques=metriques,
+            date_entrainement=date_entrainement,
+            promouvoir=options['promouvoir'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Version {version} publiée" + (" et promue" if options['promouvoir'] else "")
+        ))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Utilisateur
+from core.reequilibrage import HORIZON_REEQUILIBRAGE, executer_reequilibrage, planifier_reequilibrage
+from core.referentiel import referentiel
+
+
+class Command(BaseCommand):
+    help = (
+        "Propose des transferts de lots entre entrepôts (flot de coût minimal "
+        "des excédents vers les déficits) et, avec --executer, les enregistre."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horizon', type=int, default=HORIZON_REEQUILIBRAGE,
+            help=f"Jours de demande prévue à couvrir (défaut : {HORIZON_REEQUILIBRAGE})"
+        )
+        parser.add_argument(
+            '--executer', action='store_true',
+            help="Enregistre les transferts proposés en une transaction"
+        )
+        parser.add_argument('--utilisateur', help="Nom d'utilisateur à qui attribuer les transferts")
+
+    def handle(self, *args, **options):
+        utilisateur = None
+        if options['utilisateur']:
+            utilisateur = Utilisateur.objects.filter(username=options['utilisateur']).first()
+            if utilisateur is None:
+                raise CommandError("Utilisateur inconnu")
+
+        propositions = planifier_reequilibrage(options['horizon'])
+        if not propositions:
+            self.stdout.write("Aucun transfert à proposer")
+            return
+
+        entrepots = {e.id: e.nom for e in referentiel('entrepots')}
+        for p in propositions:
+            self.stdout.write(
+                f"{p.code_lot} : {p.quantite:g} de {entrepots.get(p.source_entrepot_id, p.source_entrepot_id)} "
+                f"vers {entrepots.get(p.destination_entrepot_id, p.destination_entrepot_id)} ({p.distance:.1f} km)"
+            )
+        total = sum(p.quantite * p.distance for p in propositions)
+        self.stdout.write(f"{len(propositions)} transfert(s) proposé(s), {total:.0f} unité·km")
+
+        if options['executer']:
+            mouvements = executer_reequilibrage(propositions, utilisateur)
+            self.stdout.write(self.style.SUCCESS(f"{len(mouvements)} transfert(s) enregistré(s)"))
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from core.stock_historique import creer_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Enregistre le snapshot de stock de fin de journée (par défaut : hier). "
+        "À lancer chaque nuit, par exemple via cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Jour à figer (AAAA-MM-JJ)")
+        parser.add_argument(
+            '--depuis',
+            help="Recalcule chaque jour depuis cette date (AAAA-MM-JJ) jusqu'à --date"
+        )
+
+    def handle(self, *args, **options):
+        fin = timezone.localdate() - timedelta(days=1)
+        if options['date']:
+            fin = parse_date(options['date'])
+            if fin is None:
+                raise CommandError("Date invalide")
+
+        debut = fin
+        if options['depuis']:
+            debut = parse_date(options['depuis'])
+            if debut is None or debut > fin:
+                raise CommandError("Date de début invalide")
+
+        # Jour par jour : chaque snapshot s'appuie sur celui de la veille
+        jour = debut
+        while jour <= fin:
+            lignes = creer_snapshot(jour)
+            self.stdout.write(f"{jour} : {lignes} solde(s) enregistré(s)")
+            jour += timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS("Snapshots de stock à jour"))
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.ia.registre import lister_versions, promouvoir_version
+
+
+class Command(BaseCommand):
+    help = "Liste les versions du modèle de ventes, ou en promeut une."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--promouvoir', metavar='VERSION', help="Version à servir")
+
+    def handle(self, *args, **options):
+        racine = settings.ML_MODELS_DIR
+        versions = lister_versions(racine)
+
+        if options['promouvoir']:
+            if options['promouvoir'] not in {v['version'] for v in versions}:
+                raise CommandError(f"Version inconnue : {options['promouvoir']}")
+            promouvoir_version(racine, options['promouvoir'])
+            self.stdout.write(self.style.SUCCESS(f"Version {options['promouvoir']} promue"))
+            return
+
+        if not versions:
+            self.stdout.write("Aucune version publiée (fichiers historiques utilisés)")
+        for v in versions:
+            metriques = ", ".join(f"{k}={val}" for k, val in v['metriques'].items()) or "-"
+            self.stdout.write(
+                f"{'*' if v['active'] else ' '} {v['version']}  {v['format']:<8} "
+                f"{v['type_modele']:<20} entraîné le {v['date_entrainement'][:10]}  {metriques}"
+            )
@@ -0,0 +1,95 @@
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY
+from django.db import connections
+
+
+logger = logging.getLogger(__name__)
+
+BUDGET_REQUETES_PAR_DEFAUT = 30
+
+# Backends retirés de AUTHENTICATION_BACKENDS dont des sessions peuvent encore exister
+ANCIENS_BACKENDS = ('django.contrib.auth.backends.ModelBackend',)
+
+
+class _CompteurSQL:
+    """Wrapper d'exécution qui compte et chronomètre les requêtes SQL."""
+
+    def __init__(self):
+        self.nombre = 0
+        self.duree = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        debut = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duree += time.perf_counter() - debut
+            self.nombre += 1
+
+
+class BudgetRequetesMiddleware:
+    """
+    Compte les requêtes SQL de chaque requête HTTP.
+
+    - en-têtes X-SQL-Requetes / X-SQL-Temps-ms si DEBUG ou SQL_ENTETES_DEBUG ;
+    - avertissement dans les logs quand une vue dépasse son budget
+      (BUDGET_REQUETES_SQL, surchargeable par nom de vue avec
+      BUDGETS_REQUETES_SQL_PAR_VUE).
+    Fonctionne sans DEBUG : aucune requête n'est conservée en mémoire.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def _budget(self, request):
+        match = getattr(request, 'resolver_match', None)
+        par_vue = getattr(settings, 'BUDGETS_REQUETES_SQL_PAR_VUE', {})
+        if match is not None and match.view_name in par_vue:
+            return par_vue[match.view_name]
+        return getattr(settings, 'BUDGET_REQUETES_SQL', BUDGET_REQUETES_PAR_DEFAUT)
+
+    def __call__(self, request):
+        compteur = _CompteurSQL()
+        debut = time.perf_counter()
+        with ExitStack() as pile:
+            for connexion in connections.all():
+                pile.enter_context(connexion.execute_wrapper(compteur))
+            response = self.get_response(request)
+        duree_totale = time.perf_counter() - debut
+
+        if settings.DEBUG or getattr(settings, 'SQL_ENTETES_DEBUG', False):
+            response['X-SQL-Requetes'] = str(compteur.nombre)
+            response['X-SQL-Temps-ms'] = f"{compteur.duree * 1000:.1f}"
+
+        budget = self._budget(request)
+        if budget is not None and compteur.nombre > budget:
+            match = getattr(request, 'resolver_match', None)
+            logger.warning(
+                "Budget SQL dépassé pour %s (%s) : %d requêtes > %d, %.1f ms SQL / %.1f ms total",
+                match.view_name if match else request.path, request.path,
+                compteur.nombre, budget, compteur.duree * 1000, duree_totale * 1000,
+            )
+
+        return response
+
+
+class BackendSessionMiddleware:
+    """
+    Reporte les sessions ouvertes avec un backend retiré sur le backend
+    courant, pour qu'elles ne soient pas déconnectées.
+
+    À placer après SessionMiddleware et avant AuthenticationMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        session = getattr(request, 'session', None)
+        if session is not None and session.get(BACKEND_SESSION_KEY) in ANCIENS_BACKENDS:
+            session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        return self.get_response(request)
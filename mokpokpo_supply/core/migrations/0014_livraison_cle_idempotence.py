@@ -0,0 +1,22 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_compteur'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='livraison',
+            name='cle_idempotence',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='livraison',
+            constraint=models.UniqueConstraint(fields=('grossiste', 'cle_idempotence'), name='uniq_livraison_grossiste_cle'),
+        ),
+    ]
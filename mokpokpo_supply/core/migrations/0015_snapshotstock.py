@@ -0,0 +1,27 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_livraison_cle_idempotence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SnapshotStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('quantite', models.FloatField()),
+                ('entrepot', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.entrepot')),
+                ('lot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='core.lot')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('date', 'lot', 'entrepot'), name='uniq_snapshot_date_lot_entrepot')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:11
+
+from datetime import datetime, time, timedelta
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def creer_entrees_manquantes(apps, schema_editor):
+    """
+    Les lots créés avant cette migration n'ont pas de mouvement ENTREE :
+    on en ajoute un pour que le journal des mouvements permette de
+    reconstituer le stock à n'importe quelle date.
+    """
+    Lot = apps.get_model('core', 'Lot')
+    MouvementStock = apps.get_model('core', 'MouvementStock')
+
+    lots = Lot.objects.exclude(mouvements__type_mouvement='ENTREE')
+    for lot in lots.iterator():
+        premier = MouvementStock.objects.filter(lot=lot).order_by('date', 'id').first()
+        premier_transfert = MouvementStock.objects.filter(
+            lot=lot, type_mouvement='TRANSFERT'
+        ).order_by('date', 'id').first()
+
+        emplacement_id = (
+            premier_transfert.source_emplacement_id if premier_transfert else lot.emplacement_id
+        )
+        date = timezone.make_aware(datetime.combine(lot.date_production, time.min))
+        if premier is not None and premier.date < date:
+            date = premier.date - timedelta(microseconds=1)
+
+        entree = MouvementStock.objects.create(
+            lot=lot,
+            type_mouvement='ENTREE',
+            quantite=lot.quantite_initiale,
+            destination_emplacement_id=emplacement_id,
+        )
+        # date est en auto_now_add : on la corrige après coup
+        MouvementStock.objects.filter(pk=entree.pk).update(date=date)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_snapshotstock'),
+    ]
+
+    operations = [
+        migrations.RunPython(creer_entrees_manquantes, migrations.RunPython.noop),
+    ]
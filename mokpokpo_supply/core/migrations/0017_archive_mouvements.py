@@ -0,0 +1,44 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_entrees_lots_existants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MouvementStockArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('type_mouvement', models.CharField(choices=[('ENTREE', 'Entrée'), ('SORTIE', 'Sortie'), ('TRANSFERT', 'Transfert')], max_length=20)),
+                ('quantite', models.FloatField()),
+                ('date', models.DateTimeField(db_index=True)),
+                ('destination_emplacement', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.emplacement')),
+                ('lot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mouvements_archives', to='core.lot')),
+                ('source_emplacement', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.emplacement')),
+                ('utilisateur', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ResumeMouvementMensuel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mois', models.DateField(help_text='Premier jour du mois')),
+                ('type_mouvement', models.CharField(choices=[('ENTREE', 'Entrée'), ('SORTIE', 'Sortie'), ('TRANSFERT', 'Transfert')], max_length=20)),
+                ('quantite_totale', models.FloatField()),
+                ('nombre_mouvements', models.PositiveIntegerField()),
+                ('entrepot_destination', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.entrepot')),
+                ('entrepot_source', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.entrepot')),
+                ('lot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.lot')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['mois', 'lot'], name='idx_resume_mois_lot')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0017_archive_mouvements'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='livraison',
+            index=models.Index(fields=['livreur', 'date_livraison', 'statut'], name='idx_livraison_livreur_date'),
+        ),
+        migrations.AddIndex(
+            model_name='livraison',
+            index=models.Index(fields=['statut', 'date_livraison'], name='idx_livraison_statut_date'),
+        ),
+        migrations.AddIndex(
+            model_name='lot',
+            index=models.Index(condition=models.Q(('quantite_restante__gt', 0)), fields=['produit', '-date_production'], name='idx_lot_disponible'),
+        ),
+        migrations.AddIndex(
+            model_name='mouvementstock',
+            index=models.Index(fields=['-date', '-id'], name='idx_mouvement_date_id'),
+        ),
+        migrations.AddIndex(
+            model_name='mouvementstock',
+            index=models.Index(fields=['lot', 'type_mouvement', 'date'], name='idx_mouvement_lot_type_date'),
+        ),
+        migrations.AddIndex(
+            model_name='utilisateur',
+            index=models.Index(fields=['role', 'actif'], name='idx_utilisateur_role_actif'),
+        ),
+    ]
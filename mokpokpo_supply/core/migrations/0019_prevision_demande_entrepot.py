@@ -0,0 +1,66 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def rattacher_previsions(apps, schema_editor):
+    """
+    Rattache les prévisions existantes au premier entrepôt créé (le seul, dans
+    une installation à un entrepôt) pour pouvoir rendre `entrepot` obligatoire.
+
+    Pour un même (produit, période), seule la plus récente est conservée : la
+    contrainte d'unicité porte désormais aussi sur l'entrepôt. Sans aucun
+    entrepôt, les prévisions ne peuvent être rattachées et sont supprimées ;
+    `manage.py calculer_previsions` les recalcule.
+    """
+    PrevisionDemande = apps.get_model('core', 'PrevisionDemande')
+    entrepot = apps.get_model('core', 'Entrepot').objects.order_by('id').first()
+    if entrepot is None:
+        PrevisionDemande.objects.all().delete()
+        return
+
+    vues = set()
+    doublons = []
+    for pk, produit_id, periode in PrevisionDemande.objects.order_by('-id').values_list('id', 'produit_id', 'periode'):
+        if (produit_id, periode) in vues:
+            doublons.append(pk)
+        vues.add((produit_id, periode))
+    PrevisionDemande.objects.filter(id__in=doublons).delete()
+    PrevisionDemande.objects.update(entrepot=entrepot)
+    if schema_editor.connection.vendor == 'postgresql':
+        # Contrôles de clé étrangère différés faits maintenant : sinon le passage
+        # à NOT NULL qui suit échoue (« pending trigger events »)
+        schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_index_requetes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='previsiondemande',
+            name='entrepot',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='core.entrepot'),
+        ),
+        migrations.RunPython(rattacher_previsions, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='previsiondemande',
+            name='entrepot',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.entrepot'),
+        ),
+        migrations.AddField(
+            model_name='previsiondemande',
+            name='version_modele',
+            field=models.CharField(default='', max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='previsiondemande',
+            constraint=models.UniqueConstraint(fields=('produit', 'entrepot', 'periode'), name='uniq_prevision_produit_entrepot_periode'),
+        ),
+        migrations.AddIndex(
+            model_name='previsiondemande',
+            index=models.Index(fields=['periode'], name='idx_prevision_periode'),
+        ),
+    ]
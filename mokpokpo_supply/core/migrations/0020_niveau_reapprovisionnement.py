@@ -0,0 +1,34 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_prevision_demande_entrepot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NiveauReapprovisionnement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stock', models.FloatField()),
+                ('demande_journaliere', models.FloatField()),
+                ('ecart_type_journalier', models.FloatField()),
+                ('stock_securite', models.FloatField()),
+                ('point_commande', models.FloatField()),
+                ('jours_couverture', models.FloatField(blank=True, help_text='Vide si aucune demande', null=True)),
+                ('sous_seuil', models.BooleanField(default=False)),
+                ('date_calcul', models.DateTimeField(auto_now_add=True)),
+                ('entrepot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.entrepot')),
+                ('produit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.produit')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sous_seuil', 'jours_couverture'], name='idx_reappro_sous_seuil')],
+                'constraints': [models.UniqueConstraint(fields=('produit', 'entrepot'), name='uniq_reappro_produit_entrepot')],
+            },
+        ),
+    ]
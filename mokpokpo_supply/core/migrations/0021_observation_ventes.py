@@ -0,0 +1,32 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_niveau_reapprovisionnement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ObservationVentes',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_observation', models.DateField()),
+                ('superficie_totale', models.FloatField(help_text='Hectares')),
+                ('precipitations_mm', models.FloatField()),
+                ('temperature_moyenne', models.FloatField(help_text='°C')),
+                ('age_plants_moyen', models.FloatField(help_text='Années')),
+                ('mois', models.PositiveSmallIntegerField()),
+                ('cout_intrants', models.FloatField(help_text='FCFA / hectare')),
+                ('ventes', models.FloatField()),
+                ('produit', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.produit')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date_observation'], name='idx_observation_date')],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.10 on 2026-10-19 13:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_observation_ventes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndicateurPrix',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('prix_moyen', models.FloatField()),
+                ('nb_releves', models.PositiveIntegerField()),
+                ('moyenne_7j', models.FloatField()),
+                ('moyenne_30j', models.FloatField()),
+                ('volatilite_30j', models.FloatField(blank=True, help_text='Écart type des variations journalières', null=True)),
+                ('ecart_reference', models.FloatField(blank=True, help_text='Prix moyen / prix de référence - 1', null=True)),
+                ('date_calcul', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='historiqueprix',
+            index=models.Index(fields=['produit', 'date'], name='idx_historique_prix_produit'),
+        ),
+        migrations.AddField(
+            model_name='indicateurprix',
+            name='produit',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.produit'),
+        ),
+        migrations.AddConstraint(
+            model_name='indicateurprix',
+            constraint=models.UniqueConstraint(fields=('produit', 'date'), name='uniq_indicateur_prix_produit_date'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-19 14:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_indicateur_prix'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JetonAPI',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nom', models.CharField(help_text='Outil ou usage du jeton', max_length=100)),
+                ('prefixe', models.CharField(help_text='Début de la clé, pour la reconnaître', max_length=8)),
+                ('cle_hachee', models.CharField(max_length=64, unique=True)),
+                ('actif', models.BooleanField(default=True)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('derniere_utilisation', models.DateTimeField(blank=True, null=True)),
+                ('utilisateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jetons_api', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
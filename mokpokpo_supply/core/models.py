@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
 
@@ -45,6 +46,9 @@ class Utilisateur(AbstractUser):
 
     class Meta:
         ordering = ['nom', 'prenom']
+        indexes = [
+            models.Index(fields=['role', 'actif'], name='idx_utilisateur_role_actif'),
+        ]
 
     def get_full_name(self):
         full_name = f"{self.prenom} {self.nom}".strip()
@@ -80,6 +84,72 @@ class HistoriquePrix(models.Model):
     prix = models.DecimalField(max_digits=10, decimal_places=2)
     date = models.DateField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['produit', 'date'], name='idx_historique_prix_produit'),
+        ]
+
+
+class IndicateurPrix(models.Model):
+    """
+    Agrégat journalier des prix d'un produit, tenu à jour par
+    `manage.py calculer_indicateurs_prix`. Les jours sans relevé reprennent
+    le dernier prix connu.
+    """
+    produit = models.ForeignKey(Produit, on_delete=models.CASCADE)
+    date = models.DateField()
+    prix_moyen = models.FloatField()
+    nb_releves = models.PositiveIntegerField()
+    moyenne_7j = models.FloatField()
+    moyenne_30j = models.FloatField()
+    volatilite_30j = models.FloatField(null=True, blank=True, help_text="Écart type des variations journalières")
+    ecart_reference = models.FloatField(null=True, blank=True, help_text="Prix moyen / prix de référence - 1")
+    date_calcul = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['produit', 'date'], name='uniq_indicateur_prix_produit_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.produit} ({self.date}) : {self.prix_moyen}"
+
+    @property
+    def volatilite_pct(self):
+        return None if self.volatilite_30j is None else 100 * self.volatilite_30j
+
+    @property
+    def ecart_reference_pct(self):
+        return None if self.ecart_reference is None else 100 * self.ecart_reference
+
+
+# ====================
+# OBSERVATIONS DE VENTES (IA)
+# ====================
+class ObservationVentes(models.Model):
+    """
+    Une ligne d'entraînement du modèle de ventes : conditions d'une
+    exploitation sur un mois et ventes constatées. Lue en flux par
+    `manage.py entrainer_modele`.
+    """
+    produit = models.ForeignKey(Produit, null=True, blank=True, on_delete=models.SET_NULL)
+    date_observation = models.DateField()
+    superficie_totale = models.FloatField(help_text="Hectares")
+    precipitations_mm = models.FloatField()
+    temperature_moyenne = models.FloatField(help_text="°C")
+    age_plants_moyen = models.FloatField(help_text="Années")
+    mois = models.PositiveSmallIntegerField()
+    cout_intrants = models.FloatField(help_text="FCFA / hectare")
+    ventes = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date_observation'], name='idx_observation_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.date_observation} : {self.ventes}"
+
 
 # ====================
 # ENTREPOT
@@ -115,6 +185,16 @@ class Lot(models.Model):
     date_production = models.DateField()
     emplacement = models.ForeignKey(Emplacement, on_delete=models.SET_NULL, null=True)
 
+    class Meta:
+        indexes = [
+            # Index partiel (ignoré si la base ne les gère pas) : lots encore disponibles
+            models.Index(
+                fields=['produit', '-date_production'],
+                condition=Q(quantite_restante__gt=0),
+                name='idx_lot_disponible',
+            ),
+        ]
+
     def __str__(self):
         return self.code_lot
 
@@ -145,6 +225,12 @@ class MouvementStock(models.Model):
     utilisateur = models.ForeignKey(Utilisateur, null=True, on_delete=models.SET_NULL)
     date = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-date', '-id'], name='idx_mouvement_date_id'),
+            models.Index(fields=['lot', 'type_mouvement', 'date'], name='idx_mouvement_lot_type_date'),
+        ]
+
     def save(self, *args, **kwargs):
         if self.type_mouvement == 'ENTREE' and self.source_emplacement:
             raise ValidationError("Entrée avec source interdite")
@@ -155,6 +241,71 @@ class MouvementStock(models.Model):
         super().save(*args, **kwargs)
 
 
+# ====================
+# ARCHIVE DES MOUVEMENTS
+# ====================
+class MouvementStockArchive(models.Model):
+    """Mouvement déplacé hors de la table principale, identifiant conservé."""
+    id = models.BigIntegerField(primary_key=True)
+    lot = models.ForeignKey(Lot, on_delete=models.CASCADE, related_name='mouvements_archives')
+    type_mouvement = models.CharField(max_length=20, choices=MouvementStock.TYPE_CHOICES)
+    quantite = models.FloatField()
+
+    source_emplacement = models.ForeignKey(
+        Emplacement, null=True, blank=True,
+        on_delete=models.SET_NULL, related_name='+'
+    )
+    destination_emplacement = models.ForeignKey(
+        Emplacement, null=True, blank=True,
+        on_delete=models.SET_NULL, related_name='+'
+    )
+
+    utilisateur = models.ForeignKey(Utilisateur, null=True, on_delete=models.SET_NULL, related_name='+')
+    date = models.DateTimeField(db_index=True)
+
+
+class ResumeMouvementMensuel(models.Model):
+    """Cumul mensuel des mouvements archivés, par lot, type et entrepôts."""
+    mois = models.DateField(help_text="Premier jour du mois")
+    lot = models.ForeignKey(Lot, on_delete=models.CASCADE)
+    type_mouvement = models.CharField(max_length=20, choices=MouvementStock.TYPE_CHOICES)
+    entrepot_source = models.ForeignKey(
+        Entrepot, null=True, blank=True, on_delete=models.SET_NULL, related_name='+'
+    )
+    entrepot_destination = models.ForeignKey(
+        Entrepot, null=True, blank=True, on_delete=models.SET_NULL, related_name='+'
+    )
+    quantite_totale = models.FloatField()
+    nombre_mouvements = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['mois', 'lot'], name='idx_resume_mois_lot'),
+        ]
+
+
+# ====================
+# SNAPSHOT DE STOCK (HISTORIQUE)
+# ====================
+class SnapshotStock(models.Model):
+    """Solde d'un lot dans un entrepôt à la fin d'une journée."""
+    date = models.DateField()
+    lot = models.ForeignKey(Lot, on_delete=models.CASCADE, related_name='snapshots')
+    entrepot = models.ForeignKey(Entrepot, null=True, blank=True, on_delete=models.CASCADE)
+    quantite = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'lot', 'entrepot'],
+                name='uniq_snapshot_date_lot_entrepot'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.lot} @ {self.entrepot} ({self.date}) : {self.quantite}"
+
+
 # ====================
 # LIVRAISON
 # ====================
@@ -197,6 +348,21 @@ class Livraison(models.Model):
     date_livraison = models.DateField()
     date_creation = models.DateTimeField(auto_now_add=True)
 
+    # Clé fournie par le client pour rejouer une commande sans la dupliquer
+    cle_idempotence = models.CharField(max_length=64, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['grossiste', 'cle_idempotence'],
+                name='uniq_livraison_grossiste_cle'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['livreur', 'date_livraison', 'statut'], name='idx_livraison_livreur_date'),
+            models.Index(fields=['statut', 'date_livraison'], name='idx_livraison_statut_date'),
+        ]
+
     def __str__(self):
         return self.numero
 
@@ -215,11 +381,67 @@ class LigneLivraison(models.Model):
 # PREVISION DEMANDE (IA)
 # ====================
 class PrevisionDemande(models.Model):
+    """
+    Demande prévue d'un produit dans un entrepôt pour une période
+    (jour au format AAAA-MM-JJ). Écrite par `manage.py calculer_previsions`.
+    """
     produit = models.ForeignKey(Produit, on_delete=models.CASCADE)
+    entrepot = models.ForeignKey(Entrepot, on_delete=models.CASCADE)
     periode = models.CharField(max_length=20)
     quantite_prevue = models.FloatField()
+    version_modele = models.CharField(max_length=64, default='')
     date_calcul = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['produit', 'entrepot', 'periode'],
+                name='uniq_prevision_produit_entrepot_periode'
+            ),
+        ]
+        indexes = [
+            # Lecture de la page prévisions : périodes à venir
+            models.Index(fields=['periode'], name='idx_prevision_periode'),
+        ]
+
+    def __str__(self):
+        return f"{self.produit} @ {self.entrepot} ({self.periode}) : {self.quantite_prevue}"
+
+
+# ====================
+# NIVEAU DE REAPPROVISIONNEMENT
+# ====================
+class NiveauReapprovisionnement(models.Model):
+    """
+    Stock de sécurité, point de commande et couverture d'un produit dans un
+    entrepôt. Table recalculée en entier par `manage.py calculer_reapprovisionnement`.
+    """
+    produit = models.ForeignKey(Produit, on_delete=models.CASCADE)
+    entrepot = models.ForeignKey(Entrepot, on_delete=models.CASCADE)
+    stock = models.FloatField()
+    demande_journaliere = models.FloatField()
+    ecart_type_journalier = models.FloatField()
+    stock_securite = models.FloatField()
+    point_commande = models.FloatField()
+    jours_couverture = models.FloatField(null=True, blank=True, help_text="Vide si aucune demande")
+    sous_seuil = models.BooleanField(default=False)
+    date_calcul = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['produit', 'entrepot'],
+                name='uniq_reappro_produit_entrepot'
+            ),
+        ]
+        indexes = [
+            # Tableau de bord du gérant : lignes sous le point de commande
+            models.Index(fields=['sous_seuil', 'jours_couverture'], name='idx_reappro_sous_seuil'),
+        ]
+
+    def __str__(self):
+        return f"{self.produit} @ {self.entrepot} : {self.stock} / {self.point_commande}"
+
 
 # ====================
 # TOURNEE (HISTORIQUE)
@@ -234,3 +456,37 @@ class Tournee(models.Model):
     def __str__(self):
         return f"Tournée {self.date} - {self.livreur}"
 
+
+
+# ====================
+# COMPTEUR (NUMEROTATION)
+# ====================
+class Compteur(models.Model):
+    """Compteur persistant servant à réserver des blocs de numéros."""
+    nom = models.CharField(max_length=50, unique=True)
+    valeur = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.nom} ({self.valeur})"
+
+
+# ====================
+# JETON D'API
+# ====================
+class JetonAPI(models.Model):
+    """
+    Clé d'accès aux vues d'API pour les outils (en-tête `Authorization: Bearer`).
+
+    Seule l'empreinte SHA-256 de la clé est conservée : la clé n'est affichée
+    qu'une fois, par `manage.py creer_jeton_api`.
+    """
+    utilisateur = models.ForeignKey(Utilisateur, on_delete=models.CASCADE, related_name="jetons_api")
+    nom = models.CharField(max_length=100, help_text="Outil ou usage du jeton")
+    prefixe = models.CharField(max_length=8, help_text="Début de la clé, pour la reconnaître")
+    cle_hachee = models.CharField(max_length=64, unique=True)
+    actif = models.BooleanField(default=True)
+    date_creation = models.DateTimeField(auto_now_add=True)
+    derniere_utilisation = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.nom} ({self.prefixe}…) - {self.utilisateur}"
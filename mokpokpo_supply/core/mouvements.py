@@ -0,0 +1,167 @@
+import base64
+from datetime import datetime, time, timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.functional import cached_property
+
+from .archivage import date_limite_archivage
+from .models import MouvementStock, MouvementStockArchive
+
+
+TAILLE_PAGE_MOUVEMENTS = 50
+TAILLE_PAGE_MAX = 200
+
+
+def _debut_journee(jour):
+    return timezone.make_aware(datetime.combine(jour, time.min))
+
+
+def mouvements_filtres(params, modele=MouvementStock):
+    """
+    Queryset des mouvements (ou de l'archive), relations utiles chargées en une seule requête.
+
+    Filtres acceptés (GET) : type, lot (id), entrepot (id), du / au (AAAA-MM-JJ, inclus).
+    """
+    qs = modele.objects.select_related(
+        'lot',
+        'source_emplacement__entrepot',
+        'destination_emplacement__entrepot',
+        'utilisateur',
+    )
+
+    type_mouvement = params.get('type')
+    if type_mouvement:
+        qs = qs.filter(type_mouvement=type_mouvement)
+
+    lot_id = params.get('lot')
+    if lot_id and lot_id.isdigit():
+        qs = qs.filter(lot_id=lot_id)
+
+    entrepot_id = params.get('entrepot')
+    if entrepot_id and entrepot_id.isdigit():
+        qs = qs.filter(
+            Q(source_emplacement__entrepot_id=entrepot_id)
+            | Q(destination_emplacement__entrepot_id=entrepot_id)
+        )
+
+    # Bornes exprimées sur la colonne brute pour rester indexables
+    du = parse_date(params.get('du') or '')
+    if du:
+        qs = qs.filter(date__gte=_debut_journee(du))
+    au = parse_date(params.get('au') or '')
+    if au:
+        qs = qs.filter(date__lt=_debut_journee(au + timedelta(days=1)))
+
+    return qs
+
+
+def sources_mouvements(params):
+    """
+    Querysets à parcourir pour ces filtres : la table principale, plus
+    l'archive quand la période demandée commence avant la date limite
+    d'archivage (ou n'a pas de début). page_mouvements les fusionne.
+    """
+    sources = [mouvements_filtres(params)]
+    du = parse_date(params.get('du') or '')
+    if du is None or du < date_limite_archivage():
+        sources.append(mouvements_filtres(params, MouvementStockArchive))
+    return sources
+
+
+def encoder_curseur(mouvement):
+    brut = f"{mouvement.date.isoformat()}|{mouvement.id}"
+    return base64.urlsafe_b64encode(brut.encode()).decode()
+
+
+def decoder_curseur(curseur):
+    """Renvoie (date, id) ; lève ValueError si le curseur est invalide."""
+    try:
+        brut = base64.urlsafe_b64decode(curseur.encode()).decode()
+        date_str, id_str = brut.split('|')
+        date = parse_datetime(date_str)
+        if date is None:
+            raise ValueError
+        return date, int(id_str)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError("Curseur invalide")
+
+
+def page_mouvements(sources, curseur=None, taille=TAILLE_PAGE_MOUVEMENTS):
+    """
+    Pagination par clé (date, id) décroissante sur un queryset, ou sur
+    plusieurs (table principale et archive, qui conserve les identifiants)
+    dont les pages sont fusionnées.
+
+    Le coût d'une page ne dépend pas de sa position dans l'historique,
+    contrairement à OFFSET. Renvoie (mouvements, curseur_suivant ou None).
+    """
+    if not isinstance(sources, (list, tuple)):
+        sources = [sources]
+    taille = max(1, min(taille, TAILLE_PAGE_MAX))
+    apres = Q()
+    if curseur:
+        date, mouvement_id = decoder_curseur(curseur)
+        apres = Q(date__lt=date) | Q(date=date, id__lt=mouvement_id)
+
+    mouvements = []
+    for qs in sources:
+        mouvements += qs.filter(apres).order_by('-date', '-id')[:taille + 1]
+    if len(sources) > 1:
+        mouvements.sort(key=lambda mv: (mv.date, mv.id), reverse=True)
+        mouvements = mouvements[:taille + 1]
+    suivant = None
+    if len(mouvements) > taille:
+        mouvements = mouvements[:taille]
+        suivant = encoder_curseur(mouvements[-1])
+    return mouvements, suivant
+
+
+class PageMouvementsDifferee:
+    """
+    Première page évaluée seulement à la première lecture : quand le fragment
+    de template est servi depuis le cache, aucune requête n'est faite.
+    """
+
+    def __init__(self, sources, curseur=None, taille=TAILLE_PAGE_MOUVEMENTS):
+        self._args = (sources, curseur, taille)
+
+    @cached_property
+    def _page(self):
+        return page_mouvements(*self._args)
+
+    def __iter__(self):
+        return iter(self._page[0])
+
+    def __len__(self):
+        return len(self._page[0])
+
+    @property
+    def suivant(self):
+        return self._page[1]
+
+
+def _emplacement_json(emplacement):
+    if emplacement is None:
+        return None
+    return {
+        'code': emplacement.code_emplacement,
+        'entrepot': emplacement.entrepot.nom,
+    }
+
+
+def mouvement_json(mv):
+    return {
+        'id': mv.id,
+        'lot': mv.lot.code_lot,
+        'type': mv.type_mouvement,
+        'type_libelle': mv.get_type_mouvement_display(),
+        'quantite': mv.quantite,
+        'source': _emplacement_json(mv.source_emplacement),
+        'destination': _emplacement_json(mv.destination_emplacement),
+        'utilisateur': mv.utilisateur.get_full_name() if mv.utilisateur else None,
+        'utilisateur_username': mv.utilisateur.username if mv.utilisateur else None,
+        'date': timezone.localtime(mv.date).strftime('%d/%m/%Y %H:%M'),
+        'archive': isinstance(mv, MouvementStockArchive),
+    }
@@ -0,0 +1,236 @@
+"""
+Rééquilibrage des stocks entre entrepôts.
+
+Pour chaque produit, le besoin d'un entrepôt est la demande prévue sur
+l'horizon (PrevisionDemande) plus les lignes de commande en préparation qui
+attendent encore un lot. Un entrepôt dont le stock dépasse son besoin a un
+excédent, sinon un déficit. Un flot de coût minimal (distance à vol d'oiseau
+entre entrepôts × quantité) répartit les excédents vers les déficits ; le
+plan est ensuite traduit en déplacements de lots entiers, exécutables en un
+seul lot de TRANSFERT.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Min, Sum
+from django.utils import timezone
+
+from .fragments import modeles_modifies
+from .lots import invalider_lots_disponibles
+from .models import Emplacement, Entrepot, LigneLivraison, Lot, MouvementStock, PrevisionDemande
+from .utils import haversine
+
+
+HORIZON_REEQUILIBRAGE = 7
+EPSILON = 1e-9
+
+
+@dataclass
+class Proposition:
+    lot_id: int
+    code_lot: str
+    produit_id: int
+    quantite: float
+    source_emplacement_id: int
+    source_entrepot_id: int
+    destination_emplacement_id: int
+    destination_entrepot_id: int
+    distance: float
+
+
+def flot_cout_minimal(offres, demandes, couts):
+    """
+    Transport de coût minimal des offres vers les demandes.
+
+    offres / demandes : {noeud: quantité} ; couts : {(origine, destination):
+    coût unitaire}, seuls les arcs présents sont utilisables. Achemine le plus
+    de quantité possible puis, à quantité égale, au moindre coût (plus courts
+    chemins successifs, Bellman-Ford sur le graphe résiduel).
+
+    Renvoie {(origine, destination): quantité}.
+    """
+    SOURCE, PUITS = ('source',), ('puits',)
+    # Arc : [destination, capacité résiduelle, coût, indice de l'arc inverse]
+    graphe = defaultdict(list)
+
+    def arc(u, v, capacite, cout):
+        graphe[u].append([v, capacite, cout, len(graphe[v])])
+        graphe[v].append([u, 0.0, -cout, len(graphe[u]) - 1])
+
+    for noeud, quantite in offres.items():
+        arc(SOURCE, ('o', noeud), quantite, 0.0)
+    for noeud, quantite in demandes.items():
+        arc(('d', noeud), PUITS, quantite, 0.0)
+    for (origine, destination), cout in couts.items():
+        if origine in offres and destination in demandes:
+            arc(('o', origine), ('d', destination), float('inf'), cout)
+
+    noeuds = list(graphe)
+    while True:
+        distance = dict.fromkeys(noeuds, float('inf'))
+        precedent = {}
+        distance[SOURCE] = 0.0
+        for _ in range(len(noeuds) - 1):
+            modifie = False
+            for u in noeuds:
+                if distance[u] == float('inf'):
+                    continue
+                for i, (v, capacite, cout, _) in enumerate(graphe[u]):
+                    if capacite > EPSILON and distance[u] + cout < distance[v] - EPSILON:
+                        distance[v] = distance[u] + cout
+                        precedent[v] = (u, i)
+                        modifie = True
+            if not modifie:
+                break
+        if distance[PUITS] == float('inf'):
+            break
+
+        chemin = []
+        v = PUITS
+        while v != SOURCE:
+            u, i = precedent[v]
+            chemin.append((u, i))
+            v = u
+        quantite = min(graphe[u][i][1] for u, i in chemin)
+        for u, i in chemin:
+            v, _, _, inverse = graphe[u][i]
+            graphe[u][i][1] -= quantite
+            graphe[v][inverse][1] += quantite
+
+    flots = {}
+    for (origine, destination), _ in couts.items():
+        for v, capacite, cout, inverse in graphe.get(('o', origine), []):
+            if v == ('d', destination) and cout >= 0:
+                transporte = graphe[v][inverse][1]
+                if transporte > EPSILON:
+                    flots[(origine, destination)] = transporte
+    return flots
+
+
+def besoins(horizon=HORIZON_REEQUILIBRAGE):
+    """Besoin par (produit, entrepôt) : prévisions de l'horizon + commandes en attente de lot."""
+    aujourd_hui = timezone.localdate()
+    periodes = [(aujourd_hui + timedelta(days=h)).isoformat() for h in range(1, horizon + 1)]
+    besoin = defaultdict(float)
+    for ligne in PrevisionDemande.objects.filter(periode__in=periodes).values(
+        'produit_id', 'entrepot_id'
+    ).annotate(total=Sum('quantite_prevue')).order_by():
+        besoin[(ligne['produit_id'], ligne['entrepot_id'])] += ligne['total']
+    for ligne in LigneLivraison.objects.filter(
+        livraison__statut='PREPARATION', lot__isnull=True, livraison__entrepot__isnull=False
+    ).values('produit_id', 'livraison__entrepot_id').annotate(total=Sum('quantite')).order_by():
+        besoin[(ligne['produit_id'], ligne['livraison__entrepot_id'])] += ligne['total']
+    return besoin
+
+
+def planifier_reequilibrage(horizon=HORIZON_REEQUILIBRAGE):
+    """
+    Propositions de déplacement de lots (liste de Proposition).
+
+    Les lots se déplacent entiers (comme dans move_lot) : dans chaque flot, on
+    retient les plus gros lots qui ne dépassent pas la quantité restant à
+    envoyer, pour ne jamais faire passer l'entrepôt source sous son besoin.
+    """
+    entrepots = {
+        e.id: e for e in Entrepot.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    }
+    # Emplacement de réception : le premier de chaque entrepôt
+    receptions = dict(
+        Emplacement.objects.filter(entrepot_id__in=entrepots).values('entrepot_id')
+        .annotate(premier=Min('id')).order_by().values_list('entrepot_id', 'premier')
+    )
+    lots = defaultdict(list)
+    stock = defaultdict(float)
+    for lot in Lot.objects.filter(
+        quantite_restante__gt=0, emplacement__entrepot_id__in=entrepots
+    ).values('id', 'code_lot', 'produit_id', 'quantite_restante', 'emplacement_id', 'emplacement__entrepot_id'):
+        cle = (lot['produit_id'], lot['emplacement__entrepot_id'])
+        lots[cle].append(lot)
+        stock[cle] += lot['quantite_restante']
+
+    besoin = besoins(horizon)
+    excedents, deficits = defaultdict(dict), defaultdict(dict)
+    for (produit_id, entrepot_id) in stock.keys() | besoin.keys():
+        if entrepot_id not in entrepots:
+            continue
+        ecart = stock[(produit_id, entrepot_id)] - besoin.get((produit_id, entrepot_id), 0.0)
+        if ecart > EPSILON:
+            excedents[produit_id][entrepot_id] = ecart
+        elif ecart < -EPSILON and entrepot_id in receptions:
+            deficits[produit_id][entrepot_id] = -ecart
+
+    distances = {
+        (a.id, b.id): haversine(a.latitude, a.longitude, b.latitude, b.longitude)
+        for a in entrepots.values() for b in entrepots.values() if a.id != b.id
+    }
+
+    propositions = []
+    for produit_id in excedents.keys() & deficits.keys():
+        flots = flot_cout_minimal(excedents[produit_id], deficits[produit_id], distances)
+        disponibles = {
+            entrepot_id: sorted(lots[(produit_id, entrepot_id)], key=lambda l: -l['quantite_restante'])
+            for entrepot_id in excedents[produit_id]
+        }
+        # Les trajets les plus courts servent en premier
+        for (source, destination), quantite in sorted(flots.items(), key=lambda f: distances[f[0]]):
+            reste = quantite
+            for lot in list(disponibles[source]):
+                if lot['quantite_restante'] > reste + EPSILON:
+                    continue
+                disponibles[source].remove(lot)
+                reste -= lot['quantite_restante']
+                propositions.append(Proposition(
+                    lot_id=lot['id'],
+                    code_lot=lot['code_lot'],
+                    produit_id=produit_id,
+                    quantite=lot['quantite_restante'],
+                    source_emplacement_id=lot['emplacement_id'],
+                    source_entrepot_id=source,
+                    destination_emplacement_id=receptions[destination],
+                    destination_entrepot_id=destination,
+                    distance=distances[(source, destination)],
+                ))
+                if reste <= EPSILON:
+                    break
+    return propositions
+
+
+@transaction.atomic
+def executer_reequilibrage(propositions, utilisateur=None):
+    """
+    Enregistre les propositions encore valables en un bulk_create de
+    TRANSFERT et un bulk_update des emplacements. Un lot déplacé ou consommé
+    depuis la planification est ignoré. Renvoie les mouvements créés.
+    """
+    lots = Lot.objects.select_for_update().in_bulk([p.lot_id for p in propositions])
+    maintenant = timezone.now()
+    mouvements, deplaces = [], []
+    for p in propositions:
+        lot = lots.get(p.lot_id)
+        if (lot is None or lot.emplacement_id != p.source_emplacement_id
+                or abs(lot.quantite_restante - p.quantite) > EPSILON):
+            continue
+        mouvements.append(MouvementStock(
+            lot=lot,
+            type_mouvement='TRANSFERT',
+            quantite=lot.quantite_restante,
+            source_emplacement_id=p.source_emplacement_id,
+            destination_emplacement_id=p.destination_emplacement_id,
+            utilisateur=utilisateur,
+            date=maintenant,
+        ))
+        lot.emplacement_id = p.destination_emplacement_id
+        deplaces.append(lot)
+
+    if not mouvements:
+        return []
+    MouvementStock.objects.bulk_create(mouvements)
+    Lot.objects.bulk_update(deplaces, ['emplacement'])
+
+    # bulk_create / bulk_update n'émettent pas post_save : invalidations explicites
+    modeles_modifies('MouvementStock', 'Lot')
+    for produit_id in {lot.produit_id for lot in deplaces}:
+        transaction.on_commit(lambda produit_id=produit_id: invalider_lots_disponibles(produit_id))
+    return mouvements
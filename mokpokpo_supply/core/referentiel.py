@@ -0,0 +1,83 @@
+"""
+Cache des données de référence (produits, emplacements, entrepôts, rôles, livreurs).
+
+Deux niveaux :
+- un cache mémoire par processus, lu sans aucune requête ;
+- le cache partagé (settings.CACHES, commun à tous les workers gunicorn)
+  qui porte un tampon de version par jeu de données, et une copie des données.
+
+Chaque lecture compare la version locale au tampon partagé ; les signaux
+post_save / post_delete changent le tampon après le commit, ce qui invalide
+la copie locale de tous les workers.
+"""
+from django.core.cache import cache
+
+from .models import Produit, Emplacement, Entrepot, Role, Utilisateur
+from .versions import version, changer_version, changer_version_apres_commit
+
+
+DUREE_DONNEES_PARTAGEES = 24 * 3600
+
+JEUX = {
+    'produits': lambda: list(Produit.objects.order_by('nom')),
+    'emplacements': lambda: list(Emplacement.objects.select_related('entrepot')),
+    'entrepots': lambda: list(Entrepot.objects.all()),
+    'roles': lambda: list(Role.objects.all()),
+    'livreurs': lambda: list(
+        Utilisateur.objects.filter(role__nom='LIVREUR', actif=True).select_related('role')
+    ),
+}
+
+# Modèle modifié -> jeux à invalider
+DEPENDANCES = {
+    Produit: ['produits'],
+    Emplacement: ['emplacements'],
+    Entrepot: ['entrepots', 'emplacements'],
+    Role: ['roles', 'livreurs'],
+    Utilisateur: ['livreurs'],
+}
+
+_local = {}  # nom -> (tampon, données)
+
+
+def _nom_version(nom):
+    return f"referentiel:{nom}"
+
+
+def _cle_donnees(nom, tampon):
+    return f"referentiel:{nom}:{tampon}"
+
+
+def invalider(*noms):
+    changer_version(*(_nom_version(nom) for nom in noms))
+
+
+def invalider_apres_commit(*noms):
+    # Invalider avant le commit laisserait un autre worker recharger
+    # les anciennes données sous la nouvelle version.
+    changer_version_apres_commit(*(_nom_version(nom) for nom in noms))
+
+
+def version_referentiel(*noms):
+    """Tampon combiné des jeux donnés, pour construire des clés de cache dépendantes."""
+    return version(*(_nom_version(nom) for nom in noms))
+
+
+def referentiel(nom):
+    """Liste en cache des objets du jeu `nom` (voir JEUX)."""
+    tampon = version_referentiel(nom)
+
+    locale = _local.get(nom)
+    if locale is not None and locale[0] == tampon:
+        return locale[1]
+
+    donnees = cache.get(_cle_donnees(nom, tampon))
+    if donnees is None:
+        donnees = JEUX[nom]()
+        cache.set(_cle_donnees(nom, tampon), donnees, DUREE_DONNEES_PARTAGEES)
+    _local[nom] = (tampon, donnees)
+    return donnees
+
+
+def ids_produits():
+    return {p.id for p in referentiel('produits')}
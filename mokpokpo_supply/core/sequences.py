@@ -0,0 +1,87 @@
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Compteur
+
+
+TAILLE_BLOC_PAR_DEFAUT = 100
+
+
+class AllocateurSequence:
+    """
+    Génère des identifiants lisibles (PREFIXE-AAAAMMJJ-000123) sans conflit.
+
+    Chaque processus réserve un bloc de numéros dans la table Compteur
+    (une seule écriture en base par bloc), puis les distribue en mémoire.
+    Les numéros non utilisés d'un bloc sont perdus au redémarrage :
+    la numérotation peut présenter des trous mais jamais de doublons.
+    """
+
+    def __init__(self, taille_bloc=None):
+        self.taille_bloc = taille_bloc or getattr(
+            settings, 'SEQUENCE_TAILLE_BLOC', TAILLE_BLOC_PAR_DEFAUT
+        )
+        self._verrou = threading.Lock()
+        self._blocs = {}  # nom -> [prochain, fin (inclus)]
+
+    def _reserver(self, nom, quantite):
+        """Incrémente le compteur de `quantite` et renvoie la première valeur réservée."""
+        # Incrément fait par la base (UPDATE ... valeur = valeur + n) : pas de
+        # lecture-modification-écriture en Python, même sans select_for_update (SQLite)
+        with transaction.atomic():
+            if not Compteur.objects.filter(nom=nom).update(valeur=F('valeur') + quantite):
+                try:
+                    with transaction.atomic():
+                        Compteur.objects.create(nom=nom, valeur=quantite)
+                    return 1
+                except IntegrityError:
+                    # Créé entre-temps par un autre worker
+                    Compteur.objects.filter(nom=nom).update(valeur=F('valeur') + quantite)
+            valeur = Compteur.objects.values_list('valeur', flat=True).get(nom=nom)
+        return valeur - quantite + 1
+
+    def prochaines_valeurs(self, nom, quantite=1):
+        """
+        Renvoie `quantite` valeurs consécutives du compteur `nom`.
+
+        Dans une transaction déjà ouverte, la réservation pourrait être
+        annulée avec elle : on réserve alors exactement le nécessaire sans
+        rien garder en cache. Appeler hors transaction pour profiter des blocs.
+        """
+        if transaction.get_connection().in_atomic_block:
+            debut = self._reserver(nom, quantite)
+            return range(debut, debut + quantite)
+
+        with self._verrou:
+            bloc = self._blocs.get(nom)
+            if bloc is None or bloc[1] - bloc[0] + 1 < quantite:
+                taille = max(self.taille_bloc, quantite)
+                debut = self._reserver(nom, taille)
+                bloc = [debut, debut + taille - 1]
+                self._blocs[nom] = bloc
+            valeurs = range(bloc[0], bloc[0] + quantite)
+            bloc[0] += quantite
+        return valeurs
+
+    def prochains_numeros(self, prefixe, quantite=1, date=None):
+        date = date or timezone.localdate()
+        return [
+            f"{prefixe}-{date:%Y%m%d}-{valeur:06d}"
+            for valeur in self.prochaines_valeurs(prefixe, quantite)
+        ]
+
+
+# Instance partagée par tous les threads du processus
+allocateur = AllocateurSequence()
+
+
+def prochain_numero(prefixe, date=None):
+    return allocateur.prochains_numeros(prefixe, 1, date)[0]
+
+
+def prochains_numeros(prefixe, quantite, date=None):
+    return allocateur.prochains_numeros(prefixe, quantite, date)
@@ -0,0 +1,56 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .fragments import MODELES_SUIVIS, modeles_modifies
+from .ia.prix import invalider_indicateurs
+from .lots import invalider_lots_disponibles
+from .models import HistoriquePrix, Lot
+from .referentiel import DEPENDANCES, invalider_apres_commit
+
+
+def _connexion_seule(kwargs):
+    # La connexion ne met à jour que last_login : rien d'affiché ne change
+    update_fields = kwargs.get('update_fields')
+    return update_fields is not None and set(update_fields) <= {'last_login'}
+
+
+@receiver([post_save, post_delete], sender=Lot)
+def lot_modifie(sender, instance, **kwargs):
+    produit_id = instance.produit_id
+    transaction.on_commit(lambda: invalider_lots_disponibles(produit_id))
+
+
+@receiver(pre_save, sender=HistoriquePrix)
+def prix_avant_modification(sender, instance, **kwargs):
+    # Relevé déplacé ou changé de produit : l'ancienne position est aussi à recalculer
+    if instance.pk:
+        ancien = sender.objects.filter(pk=instance.pk).values_list('produit_id', 'date').first()
+        if ancien:
+            invalider_indicateurs(*ancien)
+
+
+@receiver([post_save, post_delete], sender=HistoriquePrix)
+def prix_modifie(sender, instance, **kwargs):
+    invalider_indicateurs(instance.produit_id, instance.date)
+
+
+def referentiel_modifie(sender, instance, **kwargs):
+    if _connexion_seule(kwargs):
+        return
+    invalider_apres_commit(*DEPENDANCES[sender])
+
+
+def modele_suivi_modifie(sender, instance, **kwargs):
+    if _connexion_seule(kwargs):
+        return
+    modeles_modifies(*MODELES_SUIVIS[sender])
+
+
+for modele in DEPENDANCES:
+    post_save.connect(referentiel_modifie, sender=modele, dispatch_uid=f"referentiel_{modele.__name__}")
+    post_delete.connect(referentiel_modifie, sender=modele, dispatch_uid=f"referentiel_{modele.__name__}_suppr")
+
+for modele in MODELES_SUIVIS:
+    post_save.connect(modele_suivi_modifie, sender=modele, dispatch_uid=f"fragments_{modele.__name__}")
+    post_delete.connect(modele_suivi_modifie, sender=modele, dispatch_uid=f"fragments_{modele.__name__}_suppr")
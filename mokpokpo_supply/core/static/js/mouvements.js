@@ -0,0 +1,25 @@
+// Défilement infini de l'historique des mouvements (tableaux de bord stock et gérant).
+// Le curseur et l'URL de l'API sont portés par le bouton #btnPlusMouvements
+// (fragment mis en cache avec la page) ; chaque page définit ligneMouvement(mv).
+const btnPlusMouvements = document.getElementById('btnPlusMouvements');
+let curseurMouvements = btnPlusMouvements ? btnPlusMouvements.dataset.curseur : '';
+
+function echapper(texte) {
+    const div = document.createElement('div');
+    div.textContent = texte == null ? '' : texte;
+    return div.innerHTML;
+}
+
+function chargerMouvements() {
+    if (!curseurMouvements) return;
+    const params = new URLSearchParams(new FormData(document.getElementById('filtresMouvements')));
+    params.set('curseur', curseurMouvements);
+    fetch(btnPlusMouvements.dataset.url + '?' + params.toString())
+        .then(r => r.json())
+        .then(data => {
+            const tbody = document.getElementById('corpsMouvements');
+            data.mouvements.forEach(mv => tbody.insertAdjacentHTML('beforeend', ligneMouvement(mv)));
+            curseurMouvements = data.suivant;
+            if (!curseurMouvements) btnPlusMouvements.classList.add('d-none');
+        });
+}
@@ -0,0 +1,72 @@
+"""
+Outils de test : cache isolé et budget de requêtes SQL par vue.
+
+Exemple :
+
+    class BudgetVuesTest(BudgetRequetesMixin, TestCaseIsole):
+        @classmethod
+        def setUpTestData(cls):
+            generer_donnees(2000)
+
+        def test_dashboard_stock(self):
+            self.assertVueDansBudget('dashboard_stock', 'STOCK', max_requetes=15)
+"""
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Utilisateur
+
+
+CACHES_TEST = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests'},
+}
+
+
+@override_settings(CACHES=CACHES_TEST)
+class TestCaseIsole(TestCase):
+    """
+    TestCase sur un cache mémoire vidé avant chaque test : le cache fichier
+    du projet n'est ni lu ni modifié, et les tampons de version repartent
+    de zéro (les données de setUpTestData sont relues depuis la base).
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+
+class BudgetRequetesMixin:
+    """À combiner avec TestCaseIsole (ou django.test.TestCase)."""
+
+    def utilisateur_avec_role(self, role):
+        utilisateur = Utilisateur.objects.filter(role__nom=role, actif=True).first()
+        if utilisateur is None:
+            self.fail(f"Aucun utilisateur actif avec le rôle {role} dans le jeu de données")
+        return utilisateur
+
+    def assertVueDansBudget(self, nom_vue, role, max_requetes, args=None, data=None,
+                            methode='get', statut=200, **options):
+        """
+        Appelle la vue (GET par défaut) avec un utilisateur du rôle donné et
+        vérifie qu'elle répond `statut` en au plus `max_requetes` requêtes SQL.
+        `options` est transmis au client de test (content_type, headers...).
+        """
+        self.client.force_login(self.utilisateur_avec_role(role))
+        url = reverse(nom_vue, args=args)
+
+        with CaptureQueriesContext(connection) as requetes:
+            response = getattr(self.client, methode)(url, data or {}, **options)
+            if response.streaming:
+                # Réponse en flux : les requêtes sont faites pendant la lecture
+                response.streaming_content = [b"".join(response.streaming_content)]
+
+        self.assertEqual(response.status_code, statut, f"{nom_vue} a répondu {response.status_code}")
+        if len(requetes) > max_requetes:
+            detail = "\n".join(f"{i}. {q['sql']}" for i, q in enumerate(requetes.captured_queries, 1))
+            self.fail(
+                f"{nom_vue} : {len(requetes)} requêtes SQL pour un budget de {max_requetes}\n{detail}"
+            )
+        return response
@@ -0,0 +1,109 @@
+"""Fabriques d'objets pour les tests (hors jeu de données synthétique)."""
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from django.utils import timezone
+
+from core.ia.cache_predictions import CachePredictions
+from core.ia.registre import RegistreModele
+from core.models import Emplacement, Entrepot, Lot, MouvementStock, Produit, Role, Utilisateur
+
+
+FEATURES = [
+    'superficie_totale', 'precipitations_mm', 'temperature_moyenne',
+    'age_plants_moyen', 'mois', 'cout_intrants',
+]
+
+
+def utilisateur(role, nom=None, **champs):
+    role = Role.objects.get_or_create(nom=role)[0] if role else None
+    nom = nom or f"{role.nom.lower() if role else 'sans_role'}_{Utilisateur.objects.count()}"
+    return Utilisateur.objects.create_user(
+        username=nom, email=f"{nom}@test.local", password='mot-de-passe-test',
+        nom=nom, prenom='Test', role=role, **champs,
+    )
+
+
+def produit(nom='Café test', type_produit='CAFE', prix_reference=1000):
+    return Produit.objects.create(nom=nom, type_produit=type_produit, unite='kg', prix_reference=prix_reference)
+
+
+def entrepot(nom='Entrepôt test', emplacements=1, **champs):
+    """Entrepôt et ses emplacements ; renvoie (entrepot, [emplacements])."""
+    e = Entrepot.objects.create(nom=nom, **champs)
+    return e, [
+        Emplacement.objects.create(entrepot=e, code_emplacement=f"{nom[:3].upper()}-{i}")
+        for i in range(emplacements)
+    ]
+
+
+def lot(produit, emplacement, quantite=100, restante=None, code=None, jours=0):
+    return Lot.objects.create(
+        code_lot=code or f"LOT-{Lot.objects.count() + 1:05d}",
+        produit=produit,
+        quantite_initiale=quantite,
+        quantite_restante=quantite if restante is None else restante,
+        date_production=timezone.localdate() - timedelta(days=jours),
+        emplacement=emplacement,
+    )
+
+
+def mouvement(lot, type_mouvement, quantite, date=None, source=None, destination=None, utilisateur=None):
+    """Mouvement daté (la date, en auto_now_add, est réécrite après l'insertion)."""
+    mv = MouvementStock.objects.create(
+        lot=lot, type_mouvement=type_mouvement, quantite=quantite,
+        source_emplacement=source, destination_emplacement=destination, utilisateur=utilisateur,
+    )
+    if date is not None:
+        MouvementStock.objects.filter(pk=mv.pk).update(date=date)
+        mv.date = date
+    return mv
+
+
+def scenarios(n=200, graine=0):
+    """Matrice de scénarios plausibles (colonnes FEATURES) et ventes associées."""
+    rng = np.random.default_rng(graine)
+    X = np.column_stack([
+        rng.uniform(1, 50, n), rng.uniform(500, 2000, n), rng.uniform(20, 32, n),
+        rng.uniform(1, 30, n), rng.integers(1, 13, n), rng.uniform(10000, 90000, n),
+    ])
+    y = 40 * X[:, 0] + 0.5 * X[:, 1] - 8 * X[:, 2] + 3 * X[:, 3] + 0.001 * X[:, 5] + rng.normal(0, 5, n)
+    return X, y
+
+
+def modele_ajuste(modele=None, scaler=None, n=200):
+    """Couple (modèle, scaler) scikit-learn ajusté sur scenarios() ; Ridge + StandardScaler par défaut."""
+    from sklearn.linear_model import Ridge
+    from sklearn.preprocessing import StandardScaler
+
+    X, y = scenarios(n)
+    modele = Ridge() if modele is None else modele
+    scaler = StandardScaler() if scaler is None else scaler
+    modele.fit(scaler.fit_transform(X), y)
+    return modele, scaler
+
+
+class RegistreTemporaireMixin:
+    """
+    Remplace le registre et le cache de prédictions du processus par des
+    instances neuves, le registre pointant sur un dossier temporaire.
+    """
+    intervalle_verification = 0
+
+    def setUp(self):
+        super().setUp()
+        self.racine = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.racine, ignore_errors=True)
+        self.registre = RegistreModele(self.racine, self.intervalle_verification)
+        self.cache_predictions = CachePredictions()
+        for cible, valeur in (
+            ('core.ia.registre._registre', self.registre),
+            ('core.ia.cache_predictions._cache', self.cache_predictions),
+        ):
+            patch = mock.patch(cible, valeur)
+            patch.start()
+            self.addCleanup(patch.stop)
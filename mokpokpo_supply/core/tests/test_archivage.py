@@ -0,0 +1,112 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.archivage import alleger_snapshots, archiver_mouvements, date_limite_archivage
+from core.models import MouvementStock, MouvementStockArchive, ResumeMouvementMensuel, SnapshotStock
+from core.mouvements import page_mouvements, sources_mouvements
+from core.testing import TestCaseIsole
+
+from . import outils
+
+
+class ArchivageTest(TestCaseIsole):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerant = outils.utilisateur('GERANT')
+        produit = outils.produit()
+        cls.nord, (cls.empl_nord,) = outils.entrepot('Nord')
+        cls.lot = outils.lot(produit, cls.empl_nord)
+        maintenant = timezone.now()
+        cls.anciens = [
+            outils.mouvement(cls.lot, 'SORTIE', 10 + i, maintenant - timedelta(days=400 + i), source=cls.empl_nord)
+            for i in range(6)
+        ]
+        cls.recents = [
+            outils.mouvement(cls.lot, 'ENTREE', 1 + i, maintenant - timedelta(days=i), destination=cls.empl_nord)
+            for i in range(4)
+        ]
+
+    def test_archivage_des_mois_anciens(self):
+        with CaptureQueriesContext(connection) as requetes:
+            resultat = archiver_mouvements(retention_mois=12)
+        # Une seule suppression par mois, sans relire les lignes pour les signaux
+        suppressions = [q for q in requetes if q['sql'].startswith('DELETE') and 'mouvementstock"' in q['sql']]
+        self.assertEqual(len(suppressions), len(resultat))
+
+        self.assertEqual(sum(resultat.values()), 6)
+        self.assertEqual(
+            sorted(MouvementStock.objects.values_list('id', flat=True)),
+            sorted(mv.id for mv in self.recents),
+        )
+        # Identifiants et valeurs conservés dans l'archive
+        self.assertEqual(
+            sorted(MouvementStockArchive.objects.values_list('id', 'quantite')),
+            sorted((mv.id, mv.quantite) for mv in self.anciens),
+        )
+        self.assertEqual(ResumeMouvementMensuel.objects.aggregate(q=Sum('quantite_totale'))['q'], sum(range(10, 16)))
+        self.assertEqual(ResumeMouvementMensuel.objects.aggregate(n=Sum('nombre_mouvements'))['n'], 6)
+
+        # Deuxième passage : rien à faire
+        self.assertEqual(sum(archiver_mouvements(retention_mois=12).values()), 0)
+
+    def test_commande(self):
+        sortie = StringIO()
+        call_command('archiver_mouvements', '--retention', '12', stdout=sortie)
+        self.assertIn("6 mouvement(s) archivé(s) au total", sortie.getvalue())
+
+    def test_alleger_snapshots(self):
+        limite = date_limite_archivage(12)
+        debut = limite - timedelta(days=70)
+        for i in range(80):
+            SnapshotStock.objects.create(date=debut + timedelta(days=i), lot=self.lot, entrepot=self.nord, quantite=1)
+
+        alleger_snapshots(limite)
+
+        anciens = list(SnapshotStock.objects.filter(date__lt=limite).values_list('date', flat=True))
+        self.assertTrue(anciens)
+        for jour in anciens:
+            self.assertEqual((jour + timedelta(days=1)).day, 1, f"{jour} n'est pas une fin de mois")
+        self.assertEqual(SnapshotStock.objects.filter(date__gte=limite).count(), 10)
+
+    def test_historique_lit_aussi_l_archive(self):
+        archiver_mouvements(retention_mois=12)
+        tous = sorted(self.anciens + self.recents, key=lambda mv: (mv.date, mv.id), reverse=True)
+
+        ids, curseur = [], None
+        while True:
+            mouvements, curseur = page_mouvements(sources_mouvements({}), curseur, taille=3)
+            ids += [mv.id for mv in mouvements]
+            if curseur is None:
+                break
+        self.assertEqual(ids, [mv.id for mv in tous])
+
+        # Période entièrement récente : l'archive n'est pas interrogée
+        recente = (timezone.localdate() - timedelta(days=30)).isoformat()
+        self.assertEqual(len(sources_mouvements({'du': recente})), 1)
+
+    def test_api_mouvements_periode_archivee(self):
+        archiver_mouvements(retention_mois=12)
+        self.client.force_login(self.gerant)
+        du = timezone.localtime(self.anciens[-1].date).date().isoformat()
+        au = timezone.localtime(self.anciens[0].date).date().isoformat()
+
+        donnees = self.client.get(reverse('api_mouvements'), {'du': du, 'au': au}).json()
+
+        self.assertEqual([mv['id'] for mv in donnees['mouvements']], [mv.id for mv in self.anciens])
+        self.assertTrue(all(mv['archive'] for mv in donnees['mouvements']))
+        self.assertEqual(donnees['mouvements'][0]['source']['entrepot'], 'Nord')
+
+    def test_tableau_de_bord_periode_archivee(self):
+        archiver_mouvements(retention_mois=12)
+        self.client.force_login(self.gerant)
+        du = timezone.localtime(self.anciens[-1].date).date().isoformat()
+        reponse = self.client.get(reverse('dashboard_gerant'), {'du': du, 'type': 'SORTIE'})
+        self.assertEqual(len(reponse.context['mouvements']), 6)
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user
+from django.test import TestCase
+from django.urls import reverse
+
+from core.backends import UtilisateurRoleBackend
+from core.models import Utilisateur
+
+from . import outils
+
+
+class AuthentificationTest(TestCase):
+
+    def test_inscription_connecte_le_grossiste(self):
+        reponse = self.client.post(reverse('register'), {
+            'username': 'Nouveau', 'nom': 'Doe', 'prenom': 'Ama', 'email': 'ama@test.local',
+            'telephone': '+22890000000', 'password1': 'Un-mot-de-passe-solide-42',
+            'password2': 'Un-mot-de-passe-solide-42',
+        })
+        self.assertRedirects(reponse, reverse('dashboard_grossiste'))
+        utilisateur = get_user(self.client)
+        self.assertEqual(utilisateur.username, 'nouveau')
+        self.assertEqual(utilisateur.role.nom, 'GROSSISTE')
+
+    def test_connexion(self):
+        outils.utilisateur('STOCK', 'magasinier')
+        reponse = self.client.post(reverse('login'), {'username': 'magasinier', 'password': 'mot-de-passe-test'})
+        self.assertRedirects(reponse, reverse('dashboard_stock'))
+        self.assertEqual(self.client.session[BACKEND_SESSION_KEY], 'core.backends.UtilisateurRoleBackend')
+
+    def test_role_charge_avec_l_utilisateur(self):
+        cree = outils.utilisateur('LIVREUR')
+        with self.assertNumQueries(1):
+            utilisateur = UtilisateurRoleBackend().get_user(cree.pk)
+            self.assertEqual(utilisateur.role.nom, 'LIVREUR')
+
+    def test_session_ouverte_avec_model_backend(self):
+        utilisateur = outils.utilisateur('LIVREUR')
+        session = self.client.session
+        session[SESSION_KEY] = str(utilisateur.pk)
+        session[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+        session[HASH_SESSION_KEY] = utilisateur.get_session_auth_hash()
+        session.save()
+
+        reponse = self.client.get(reverse('dashboard_livreur'))
+
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual(reponse.wsgi_request.user, utilisateur)
+        self.assertEqual(self.client.session[BACKEND_SESSION_KEY], 'core.backends.UtilisateurRoleBackend')
+
+    def test_role_requis(self):
+        self.assertRedirects(
+            self.client.get(reverse('dashboard_livreur')), f"{settings.LOGIN_URL}?next={reverse('dashboard_livreur')}",
+            fetch_redirect_response=False,
+        )
+        self.client.force_login(outils.utilisateur('STOCK'))
+        self.assertRedirects(self.client.get(reverse('dashboard_livreur')), reverse('index'))
+
+    def test_changement_de_role_immediat(self):
+        utilisateur = outils.utilisateur('LIVREUR')
+        self.client.force_login(utilisateur)
+        self.assertEqual(self.client.get(reverse('dashboard_livreur')).status_code, 200)
+        Utilisateur.objects.filter(pk=utilisateur.pk).update(role=outils.utilisateur('STOCK').role)
+        self.assertRedirects(self.client.get(reverse('dashboard_livreur')), reverse('index'))
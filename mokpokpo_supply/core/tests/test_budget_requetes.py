@@ -0,0 +1,103 @@
+import json
+
+from django.test import override_settings
+from django.urls import reverse
+
+from core.donnees_synthetiques import generer_donnees
+from core.models import Lot, Produit
+from core.testing import BudgetRequetesMixin, TestCaseIsole
+
+
+class BudgetVuesTest(BudgetRequetesMixin, TestCaseIsole):
+    """
+    Nombre de requêtes SQL par vue sur le jeu synthétique : il ne doit pas
+    dépendre du volume (lots, mouvements, livraisons affichés).
+    Les budgets comptent la session et l'utilisateur (2 requêtes).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_donnees(2000)
+
+    def test_dashboard_stock(self):
+        self.assertVueDansBudget('dashboard_stock', 'STOCK', max_requetes=12)
+
+    def test_dashboard_stock_fragments_en_cache(self):
+        self.assertVueDansBudget('dashboard_stock', 'STOCK', max_requetes=12)
+        self.assertVueDansBudget('dashboard_stock', 'STOCK', max_requetes=4)
+
+    def test_dashboard_stock_filtre(self):
+        self.assertVueDansBudget('dashboard_stock', 'STOCK', max_requetes=12, data={'type': 'SORTIE', 'du': '2025-01-01'})
+
+    def test_dashboard_gerant(self):
+        self.assertVueDansBudget('dashboard_gerant', 'GERANT', max_requetes=12)
+
+    def test_dashboard_gerant_fragments_en_cache(self):
+        self.assertVueDansBudget('dashboard_gerant', 'GERANT', max_requetes=12)
+        self.assertVueDansBudget('dashboard_gerant', 'GERANT', max_requetes=4)
+
+    def test_dashboard_grossiste(self):
+        self.assertVueDansBudget('dashboard_grossiste', 'GROSSISTE', max_requetes=6)
+
+    def test_dashboard_livreur(self):
+        self.assertVueDansBudget('dashboard_livreur', 'LIVREUR', max_requetes=4)
+
+    def test_api_mouvements(self):
+        reponse = self.assertVueDansBudget('api_mouvements', 'STOCK', max_requetes=5, data={'taille': 200})
+        suivant = reponse.json()['suivant']
+        self.assertIsNotNone(suivant)
+        self.assertVueDansBudget(
+            'api_mouvements', 'GERANT', max_requetes=5, data={'taille': 200, 'curseur': suivant, 'type': 'SORTIE'},
+        )
+
+    def test_api_lots_disponibles(self):
+        produit = Lot.objects.filter(quantite_restante__gt=0).values_list('produit_id', flat=True).first()
+        reponse = self.assertVueDansBudget('api_lots_disponibles', 'STOCK', max_requetes=3, data={'produit': produit})
+        self.assertTrue(reponse.json()['lots'])
+        # Deuxième appel : liste lue dans le cache
+        self.assertVueDansBudget('api_lots_disponibles', 'STOCK', max_requetes=2, data={'produit': produit})
+
+    def test_api_commandes(self):
+        produits = list(Produit.objects.values_list('id', flat=True))
+        commandes = [
+            {
+                'date_livraison': '2026-12-01',
+                'cle_idempotence': f"budget-{i}",
+                'lignes': [{'produit': p, 'quantite': 10 + i} for p in produits],
+            }
+            for i in range(50)
+        ]
+        # 50 commandes de 4 lignes : nombre de requêtes indépendant du volume (SAVEPOINT compris)
+        self.assertVueDansBudget(
+            'api_commandes', 'GROSSISTE', max_requetes=15, methode='post', statut=201,
+            data=json.dumps({'commandes': commandes}), content_type='application/json',
+        )
+
+
+class BudgetRequetesMiddlewareTest(BudgetRequetesMixin, TestCaseIsole):
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_donnees(200)
+
+    @override_settings(SQL_ENTETES_DEBUG=True)
+    def test_entetes(self):
+        reponse = self.assertVueDansBudget('dashboard_livreur', 'LIVREUR', max_requetes=4)
+        self.assertGreater(int(reponse['X-SQL-Requetes']), 0)
+        self.assertIn('X-SQL-Temps-ms', reponse)
+
+    def test_pas_d_entetes_par_defaut(self):
+        reponse = self.assertVueDansBudget('dashboard_livreur', 'LIVREUR', max_requetes=4)
+        self.assertNotIn('X-SQL-Requetes', reponse)
+
+    @override_settings(BUDGETS_REQUETES_SQL_PAR_VUE={'dashboard_livreur': 1})
+    def test_depassement_journalise(self):
+        self.client.force_login(self.utilisateur_avec_role('LIVREUR'))
+        with self.assertLogs('core.middleware', 'WARNING') as journaux:
+            self.client.get(reverse('dashboard_livreur'))
+        self.assertIn("Budget SQL dépassé pour dashboard_livreur", journaux.output[0])
+
+    def test_budget_respecte_sans_avertissement(self):
+        self.client.force_login(self.utilisateur_avec_role('LIVREUR'))
+        with self.assertNoLogs('core.middleware', 'WARNING'):
+            self.client.get(reverse('dashboard_livreur'))
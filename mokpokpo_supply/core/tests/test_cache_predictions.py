@@ -0,0 +1,95 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from core.ia import cache_predictions as module_cache
+from core.ia.cache_predictions import CachePredictions, cache_predictions
+from core.ia.ml_service import MLPredictionService
+from core.ia.registre import promouvoir_version, publier_version
+
+from . import outils
+from .test_ml_service import scenario
+
+
+class CachePredictionsTest(SimpleTestCase):
+
+    def test_lecture_ecriture(self):
+        cache = CachePredictions()
+        self.assertIsNone(cache.lire('v1', [1, 2]))
+        cache.ecrire('v1', [1, 2], 42.0)
+        self.assertEqual(cache.lire('v1', [1.0, 2.0]), 42.0)
+        # Arrondi : même clé à la précision près
+        self.assertEqual(cache.lire('v1', [1.0000000001, 2]), 42.0)
+        # Autre version : entrée inaccessible
+        self.assertIsNone(cache.lire('v2', [1, 2]))
+
+    def test_eviction_de_la_moins_recente(self):
+        cache = CachePredictions(taille=2)
+        cache.ecrire('v', [1], 1.0)
+        cache.ecrire('v', [2], 2.0)
+        cache.lire('v', [1])
+        cache.ecrire('v', [3], 3.0)
+
+        self.assertIsNone(cache.lire('v', [2]))
+        self.assertEqual((cache.lire('v', [1]), cache.lire('v', [3])), (1.0, 3.0))
+        self.assertEqual(cache.statistiques()['evictions'], 1)
+
+    def test_expiration(self):
+        cache = CachePredictions(duree=10)
+        with mock.patch('core.ia.cache_predictions.time.monotonic', return_value=100.0):
+            cache.ecrire('v', [1], 1.0)
+        with mock.patch('core.ia.cache_predictions.time.monotonic', return_value=109.0):
+            self.assertEqual(cache.lire('v', [1]), 1.0)
+        with mock.patch('core.ia.cache_predictions.time.monotonic', return_value=110.0):
+            self.assertIsNone(cache.lire('v', [1]))
+        self.assertEqual(cache.statistiques()['expirations'], 1)
+        self.assertEqual(cache.statistiques()['entrees'], 0)
+
+    def test_statistiques(self):
+        cache = CachePredictions(taille=10, duree=60)
+        self.assertIsNone(cache.statistiques()['taux_succes'])
+        cache.ecrire('v', [1], 1.0)
+        cache.lire('v', [1])
+        cache.lire('v', [2])
+        stats = cache.statistiques()
+        self.assertEqual((stats['succes'], stats['echecs'], stats['taux_succes']), (1, 1, 0.5))
+        cache.vider()
+        self.assertEqual(cache.statistiques()['entrees'], 0)
+
+    @override_settings(ML_CACHE_PREDICTIONS_TAILLE=12, ML_CACHE_PREDICTIONS_DUREE=34)
+    def test_instance_du_processus(self):
+        with mock.patch.object(module_cache, '_cache', None):
+            cache = cache_predictions()
+            self.assertIs(cache_predictions(), cache)
+        self.assertEqual((cache.taille, cache.duree), (12, 34))
+
+
+class ServiceAvecCacheTest(outils.RegistreTemporaireMixin, SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        publier_version(self.racine, *outils.modele_ajuste(), outils.FEATURES, promouvoir=True)
+        self.service = MLPredictionService()
+
+    def test_scenario_deja_calcule(self):
+        premiere = self.service.predict(scenario())
+        predicteur, _ = self.registre.predicteur()
+        with mock.patch.object(predicteur, 'predict', side_effect=AssertionError("modèle appelé")):
+            # Valeurs saisies sous une autre forme : même scénario
+            seconde = self.service.predict(scenario(mois='5', superficie_totale=12.0))
+        self.assertEqual(seconde['prediction'], premiere['prediction'])
+        self.assertEqual(self.service.statistiques_cache()['succes'], 1)
+
+    def test_nouvelle_version_recalculee(self):
+        self.service.predict(scenario())
+        modele, scaler = outils.modele_ajuste(n=50)
+        promouvoir_version(self.racine, publier_version(self.racine, modele, scaler, outils.FEATURES))
+
+        resultat = self.service.predict(scenario())
+        attendu = modele.predict(scaler.transform([[scenario()[f] for f in outils.FEATURES]]))[0]
+        self.assertAlmostEqual(resultat['prediction'], attendu)
+        self.assertEqual(self.service.statistiques_cache()['succes'], 0)
+
+    def test_echec_non_mis_en_cache(self):
+        self.service.predict(scenario(mois=None))
+        self.assertEqual(self.service.statistiques_cache()['entrees'], 0)
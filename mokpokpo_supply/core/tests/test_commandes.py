@@ -0,0 +1,150 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.urls import reverse
+
+from core.commandes import creer_commandes
+from core.models import LigneLivraison, Livraison
+from core.testing import TestCaseIsole
+
+from . import outils
+
+
+class CreerCommandesTest(TestCaseIsole):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.grossiste = outils.utilisateur('GROSSISTE')
+        cls.cafe = outils.produit('Café')
+        cls.cacao = outils.produit('Cacao', 'CACAO')
+
+    def commande(self, cle=None, **champs):
+        return {
+            'date_livraison': '2026-11-02',
+            'cle_idempotence': cle,
+            'lignes': [
+                {'produit': self.cafe.id, 'quantite': 50},
+                {'produit': self.cacao.id, 'quantite': '12.5'},
+            ],
+            **champs,
+        }
+
+    def test_commandes_multi_produits(self):
+        resultats = creer_commandes(self.grossiste, [self.commande(), self.commande()])
+
+        self.assertEqual([creee for _, creee in resultats], [True, True])
+        livraison = resultats[0][0]
+        self.assertEqual(livraison.statut, 'PREPARATION')
+        self.assertRegex(livraison.numero, r'^LIV-\d{8}-\d{6}$')
+        self.assertEqual(
+            sorted(LigneLivraison.objects.filter(livraison=livraison).values_list('produit__nom', 'quantite')),
+            [('Cacao', 12.5), ('Café', 50.0)],
+        )
+        self.assertEqual(Livraison.objects.count(), 2)
+
+    def test_cle_idempotence_rejouee(self):
+        (premiere, creee), = creer_commandes(self.grossiste, [self.commande('abc')])
+        self.assertTrue(creee)
+
+        resultats = creer_commandes(self.grossiste, [self.commande('abc'), self.commande('def')])
+        self.assertEqual(resultats[0], (premiere, False))
+        self.assertTrue(resultats[1][1])
+        self.assertEqual(Livraison.objects.count(), 2)
+        self.assertEqual(LigneLivraison.objects.count(), 4)
+
+    def test_commande_invalide_rien_cree(self):
+        cas = [
+            [],
+            [self.commande(date_livraison='demain')],
+            [self.commande(lignes=[])],
+            [self.commande(lignes=[{'produit': self.cafe.id, 'quantite': -1}])],
+            [self.commande(lignes=[{'produit': self.cafe.id, 'quantite': 'nan'}])],
+            [self.commande(lignes=[{'produit': self.cafe.id, 'quantite': 'inf'}])],
+            [self.commande(lignes=[{'produit': 999999, 'quantite': 1}])],
+            [self.commande('x'), self.commande('x')],
+        ]
+        for commandes in cas:
+            with self.subTest(commandes=commandes), self.assertRaises(ValidationError):
+                creer_commandes(self.grossiste, commandes)
+        self.assertFalse(Livraison.objects.exists())
+
+
+class VuesCommandesTest(TestCaseIsole):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.grossiste = outils.utilisateur('GROSSISTE')
+        cls.cafe = outils.produit('Café')
+        cls.cacao = outils.produit('Cacao', 'CACAO')
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.grossiste)
+
+    def test_pass_order_plusieurs_lignes(self):
+        self.client.post(reverse('pass_order'), {
+            'date_livraison': '2026-11-02',
+            'cle_idempotence': 'formulaire-1',
+            'produit': [self.cafe.id, self.cacao.id, ''],
+            'quantite': ['10', '20', ''],
+        })
+        livraison = Livraison.objects.get()
+        self.assertEqual(livraison.lignelivraison_set.count(), 2)
+
+        # Double soumission du même formulaire
+        self.client.post(reverse('pass_order'), {
+            'date_livraison': '2026-11-02', 'cle_idempotence': 'formulaire-1',
+            'produit': [self.cafe.id], 'quantite': ['10'],
+        })
+        self.assertEqual(Livraison.objects.count(), 1)
+
+    def test_api_commandes_lot(self):
+        corps = {'commandes': [
+            {'date_livraison': '2026-11-02', 'cle_idempotence': 'a',
+             'lignes': [{'produit': self.cafe.id, 'quantite': 5}]},
+            {'date_livraison': '2026-11-03', 'cle_idempotence': 'b',
+             'lignes': [{'produit': self.cacao.id, 'quantite': 7}]},
+        ]}
+        reponse = self.client.post(reverse('api_commandes'), json.dumps(corps), content_type='application/json')
+        self.assertEqual(reponse.status_code, 201)
+        self.assertEqual([c['creee'] for c in reponse.json()['commandes']], [True, True])
+
+        reponse = self.client.post(reverse('api_commandes'), json.dumps(corps), content_type='application/json')
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual([c['creee'] for c in reponse.json()['commandes']], [False, False])
+
+    def test_api_commandes_cle_en_entete(self):
+        corps = json.dumps({'date_livraison': '2026-11-02', 'lignes': [{'produit': self.cafe.id, 'quantite': 5}]})
+        for statut in (201, 200):
+            reponse = self.client.post(
+                reverse('api_commandes'), corps, content_type='application/json',
+                headers={'Idempotency-Key': 'cle-entete'},
+            )
+            self.assertEqual(reponse.status_code, statut)
+        self.assertEqual(Livraison.objects.get().cle_idempotence, 'cle-entete')
+
+    def test_api_commandes_erreurs(self):
+        reponse = self.client.post(reverse('api_commandes'), 'pas du json', content_type='application/json')
+        self.assertEqual(reponse.status_code, 400)
+
+        reponse = self.client.post(
+            reverse('api_commandes'),
+            json.dumps({'date_livraison': '2026-11-02', 'lignes': [{'produit': 999999, 'quantite': 5}]}),
+            content_type='application/json',
+        )
+        self.assertEqual(reponse.status_code, 400)
+        self.assertIn('inconnu', reponse.json()['error'])
+
+        # NaN, accepté par le JSON de Python
+        reponse = self.client.post(
+            reverse('api_commandes'),
+            '{"date_livraison": "2026-11-02", "lignes": [{"produit": %d, "quantite": NaN}]}' % self.cafe.id,
+            content_type='application/json',
+        )
+        self.assertEqual(reponse.status_code, 400)
+        self.assertFalse(Livraison.objects.exists())
+
+    def test_api_commandes_reservee_aux_grossistes(self):
+        self.client.force_login(outils.utilisateur('STOCK'))
+        reponse = self.client.post(reverse('api_commandes'), '{}', content_type='application/json')
+        self.assertEqual(reponse.status_code, 403)
@@ -0,0 +1,104 @@
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from core.ia.entrainement import Evaluation, blocs, entrainer, evaluer_predicteur
+from core.ia.predicteurs import depuis_sklearn
+from core.ia.registre import lister_versions, version_active
+from core.models import ObservationVentes
+
+from . import outils
+
+
+class EvaluationTest(TestCase):
+
+    def test_metriques_par_blocs(self):
+        rng = np.random.default_rng(0)
+        y, prediction = rng.normal(100, 20, 250), rng.normal(100, 20, 250)
+        evaluation = Evaluation()
+        for debut in range(0, 250, 60):
+            evaluation.ajouter(y[debut:debut + 60], prediction[debut:debut + 60])
+
+        metriques = evaluation.metriques()
+        self.assertEqual(metriques['n_validation'], 250)
+        self.assertAlmostEqual(metriques['mae'], mean_absolute_error(y, prediction))
+        self.assertAlmostEqual(metriques['rmse'], mean_squared_error(y, prediction) ** 0.5)
+        self.assertAlmostEqual(metriques['r2'], r2_score(y, prediction))
+
+    def test_sans_observation(self):
+        self.assertEqual(Evaluation().metriques(), {})
+
+
+class EntrainementTest(outils.RegistreTemporaireMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        X, y = outils.scenarios(500)
+        ObservationVentes.objects.bulk_create([
+            ObservationVentes(date_observation=date(2025, 1, 1), ventes=ventes, **dict(zip(outils.FEATURES, ligne)))
+            for ligne, ventes in zip(X.tolist(), y.tolist())
+        ])
+        # Une observation sur cinq, selon son id, sert à la validation
+        cls.validation = sum(1 for i in ObservationVentes.objects.values_list('id', flat=True) if i % 5 == 0)
+
+    def test_blocs(self):
+        tailles = [len(X) for X, _ in blocs(False, outils.FEATURES, taille_bloc=150)]
+        self.assertEqual(sum(tailles), 500 - self.validation)
+        self.assertTrue(all(t == 150 for t in tailles[:-1]))
+        X, y = next(blocs(True, outils.FEATURES, taille_bloc=1000))
+        self.assertEqual((X.shape, y.shape), ((self.validation, 6), (self.validation,)))
+
+    def test_entrainer(self):
+        modele, scaler, metriques = entrainer(outils.FEATURES, epoques=5, taille_bloc=100)
+        self.assertEqual(metriques['n_entrainement'], 500 - self.validation)
+        self.assertEqual(metriques['n_validation'], self.validation)
+        self.assertGreater(metriques['r2'], 0.95)
+        # Indépendant du découpage en blocs pour le scaler
+        _, scaler_un_bloc, _ = entrainer(outils.FEATURES, epoques=1, taille_bloc=10000)
+        np.testing.assert_allclose(scaler.mean_, scaler_un_bloc.mean_)
+
+    def test_sans_observation(self):
+        ObservationVentes.objects.all().delete()
+        with self.assertRaisesMessage(ValueError, "Aucune observation d'entraînement"):
+            entrainer(outils.FEATURES)
+
+    def test_evaluer_predicteur_du_registre(self):
+        modele, scaler, metriques = entrainer(outils.FEATURES, epoques=2)
+        evaluation = evaluer_predicteur(depuis_sklearn(modele, scaler, outils.FEATURES), outils.FEATURES)
+        self.assertAlmostEqual(evaluation['rmse'], metriques['rmse'])
+
+    def commande(self, *arguments):
+        sortie = StringIO()
+        with override_settings(ML_MODELS_DIR=self.racine):
+            call_command('entrainer_modele', *arguments, stdout=sortie)
+        return sortie.getvalue()
+
+    def test_commande(self):
+        texte = self.commande('--epoques', '3', '--taille-bloc', '200')
+        self.assertIn(f"{500 - self.validation} observation(s) d'entraînement, {self.validation} de validation", texte)
+        self.assertIn("RMSE", texte)
+        self.assertEqual(len(lister_versions(self.racine)), 1)
+        self.assertIsNone(version_active(self.racine))
+
+        self.assertIn("Nouvelle version promue", self.commande('--promouvoir'))
+        self.assertEqual(version_active(self.racine), lister_versions(self.racine)[0]['version'])
+
+    def test_promotion_si_meilleur(self):
+        self.commande('--epoques', '10', '--promouvoir')
+        active = version_active(self.racine)
+
+        # Une seule passe, fortement régularisée : moins bonne, la version active est conservée
+        moins_bon = lambda features, **kwargs: entrainer(features, epoques=1, alpha=1e3)
+        with mock.patch('core.management.commands.entrainer_modele.entrainer', moins_bon):
+            texte = self.commande('--promouvoir-si-meilleur')
+        self.assertIn(f"Version active {active} conservée", texte)
+        self.assertEqual(version_active(self.racine), active)
+
+    def test_arguments_invalides(self):
+        with self.assertRaises(CommandError):
+            self.commande('--epoques', '0')
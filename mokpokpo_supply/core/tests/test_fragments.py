@@ -0,0 +1,75 @@
+from django.test import RequestFactory
+from django.urls import reverse
+
+from core.fragments import cle_fragment, cle_mouvements
+from core.models import MouvementStock
+from core.testing import TestCaseIsole
+
+from . import outils
+
+
+class FragmentsTest(TestCaseIsole):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerant = outils.utilisateur('GERANT', 'gerant')
+        cls.produit = outils.produit()
+        cls.nord, (cls.empl_nord,) = outils.entrepot('Nord')
+        cls.lot = outils.lot(cls.produit, cls.empl_nord, code='LOT-AFFICHE')
+        outils.mouvement(cls.lot, 'ENTREE', 100, destination=cls.empl_nord)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.gerant)
+
+    def dashboard(self, **params):
+        return self.client.get(reverse('dashboard_gerant'), params)
+
+    def test_cle_stable_sans_modification(self):
+        self.assertEqual(cle_fragment('employes'), cle_fragment('employes'))
+        self.assertNotEqual(cle_fragment('mouvements', 'SORTIE'), cle_fragment('mouvements', 'ENTREE'))
+
+    def test_parametres_parasites_ignores(self):
+        requete = RequestFactory().get('/', {'type': 'SORTIE', 'utm_source': 'mail'})
+        self.assertEqual(cle_mouvements(requete.GET), cle_mouvements({'type': 'SORTIE'}))
+
+    def test_fragment_servi_depuis_le_cache(self):
+        self.assertContains(self.dashboard(), 'LOT-AFFICHE')
+        # Session et utilisateur seulement
+        with self.assertNumQueries(2):
+            self.assertContains(self.dashboard(), 'LOT-AFFICHE')
+
+    def test_nouveau_mouvement_affiche_apres_commit(self):
+        self.dashboard()
+        with self.captureOnCommitCallbacks() as rappels:
+            autre = outils.lot(self.produit, self.empl_nord, code='LOT-NOUVEAU')
+            outils.mouvement(autre, 'ENTREE', 5, destination=self.empl_nord)
+        # Transaction non validée : la version en cache reste servie
+        self.assertNotContains(self.dashboard(), 'LOT-NOUVEAU')
+        for rappel in rappels:
+            rappel()
+        self.assertContains(self.dashboard(), 'LOT-NOUVEAU')
+
+    def test_mouvement_supprime(self):
+        self.assertContains(self.dashboard(), 'LOT-AFFICHE')
+        with self.captureOnCommitCallbacks(execute=True):
+            MouvementStock.objects.get(lot=self.lot).delete()
+        self.assertNotContains(self.dashboard(), 'LOT-AFFICHE')
+
+    def test_reference_modifiee(self):
+        self.dashboard()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.nord.nom = 'Entrepôt renommé'
+            self.nord.save()
+        self.assertContains(self.dashboard(), 'Entrepôt renommé')
+
+    def test_connexion_n_invalide_pas_les_employes(self):
+        cle = cle_fragment('employes')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.login(username='gerant', password='mot-de-passe-test')
+        self.assertEqual(cle_fragment('employes'), cle)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            outils.utilisateur('LIVREUR', 'nouveau_livreur')
+        self.assertNotEqual(cle_fragment('employes'), cle)
+        self.assertContains(self.dashboard(), 'nouveau_livreur@test.local')
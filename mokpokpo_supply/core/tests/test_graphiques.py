@@ -0,0 +1,93 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+
+from core.ia.charts import GRAPHIQUES, ChartGenerator
+from core.ia.registre import RegistreModele, promouvoir_version, publier_version
+from core.testing import TestCaseIsole
+
+from . import outils
+
+
+SAISIE = {
+    'superficie_totale': 12, 'precipitations_mm': 120, 'temperature_moyenne': 26,
+    'age_plants_moyen': 8, 'mois': 5, 'cout_intrants': 45000,
+}
+
+
+class GraphiquesTest(outils.RegistreTemporaireMixin, TestCaseIsole):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.gerant = outils.utilisateur('GERANT')
+
+    def setUp(self):
+        super().setUp()
+        self.version = self.publier()
+        self.client.force_login(self.gerant)
+
+    def publier(self, promouvoir=True):
+        return publier_version(self.racine, *outils.modele_ajuste(), outils.FEATURES, promouvoir=promouvoir)
+
+    def graphique(self, nom='importance', format='png', **kwargs):
+        return self.client.get(reverse('gerant_graphique', args=[nom, format]), **kwargs)
+
+    def test_formats(self):
+        png = self.graphique()
+        self.assertEqual(png['Content-Type'], 'image/png')
+        self.assertTrue(png.content.startswith(b'\x89PNG'))
+        svg = self.graphique('saisonnalite', 'svg')
+        self.assertEqual(svg['Content-Type'], 'image/svg+xml')
+        self.assertIn(b'<svg', svg.content)
+        self.assertEqual(self.graphique('inconnu').status_code, 404)
+
+    def test_etag_et_cache(self):
+        premiere = self.graphique()
+        etag = premiere['ETag']
+
+        rendu = mock.Mock(side_effect=AssertionError("rendu inattendu"))
+        with mock.patch.dict(GRAPHIQUES, {'importance': rendu}):
+            self.assertEqual(self.graphique(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            # Sans ETag : image lue dans le cache
+            self.assertEqual(self.graphique().content, premiere.content)
+
+        promouvoir_version(self.racine, self.publier(promouvoir=False))
+        self.assertNotEqual(self.graphique()['ETag'], etag)
+
+    def test_rendu_avec_la_version_de_l_etag(self):
+        # Le registre n'est lu qu'une fois : une promotion après cette lecture
+        # ne peut pas mettre une image d'une autre version sous l'ETag calculé
+        predicteur, meta = self.registre.predicteur()
+        rendu = mock.Mock(return_value=b'image')
+        with mock.patch.object(self.registre, 'predicteur', return_value=(predicteur, meta)) as lecture, \
+                mock.patch.dict(GRAPHIQUES, {'saisonnalite': rendu}):
+            self.graphique('saisonnalite')
+        lecture.assert_called_once()
+        rendu.assert_called_once_with(predicteur, meta, format='png')
+
+    def test_graphique_de_prediction(self):
+        reponse = self.graphique('prediction', data=SAISIE)
+        self.assertEqual(reponse.status_code, 200)
+        self.assertNotEqual(reponse['ETag'], self.graphique('prediction', data={**SAISIE, 'mois': 6})['ETag'])
+        self.assertEqual(self.graphique('prediction', data={'mois': 5}).status_code, 400)
+
+        with self.assertRaisesMessage(ValueError, "Données de prédiction invalides"):
+            ChartGenerator.create_prediction_chart(*self.registre.predicteur(), {'mois': 5})
+
+    def test_sans_modele(self):
+        with mock.patch('core.ia.registre._registre', RegistreModele(self.racine / 'vide', 0)):
+            self.assertEqual(self.graphique().status_code, 503)
+            with self.assertRaises(CommandError):
+                call_command('generer_graphiques', stdout=StringIO())
+
+    def test_commande_prechauffe_le_cache(self):
+        sortie = StringIO()
+        call_command('generer_graphiques', stdout=sortie)
+        self.assertIn(f"Graphiques de la version {self.version} en cache", sortie.getvalue())
+
+        rendu = mock.Mock(side_effect=AssertionError("rendu inattendu"))
+        with mock.patch.dict(GRAPHIQUES, {'importance': rendu, 'saisonnalite': rendu}):
+            self.assertEqual(self.graphique('importance', 'svg').status_code, 200)
+            self.assertEqual(self.graphique('saisonnalite').status_code, 200)
@@ -0,0 +1,56 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+
+from core.donnees_synthetiques import generer_donnees
+from core.management.commands.benchmark_requetes import INDEX_MESURES, Command as Benchmark
+
+
+class IndexRequetesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_donnees(500)
+
+    def test_index_crees(self):
+        with connection.cursor() as curseur:
+            for modele, nom in INDEX_MESURES:
+                with self.subTest(nom):
+                    contraintes = connection.introspection.get_constraints(curseur, modele._meta.db_table)
+                    self.assertIn(nom, contraintes)
+                    self.assertTrue(contraintes[nom]['index'])
+
+    @skipUnlessDBFeature('supports_partial_indexes')
+    def test_plans_utilisent_les_index(self):
+        attendus = {
+            "dashboard_livreur : livraisons du livreur": 'idx_livraison_livreur_date',
+            "dashboard_stock : livraisons en préparation": 'idx_livraison_statut_date',
+            "dashboard_stock : lots disponibles d'un produit": 'idx_lot_disponible',
+            "historique : première page": 'idx_mouvement_date_id',
+            "historique : sorties d'un lot": 'idx_mouvement_lot_type_date',
+        }
+        requetes = Benchmark().requetes()
+        for nom, index in attendus.items():
+            with self.subTest(nom):
+                self.assertIn(index, requetes[nom][0].explain())
+
+
+class BenchmarkRequetesTest(TransactionTestCase):
+    # --comparer modifie le schéma : impossible dans la transaction d'un TestCase sous SQLite
+
+    def test_commande_avec_comparaison(self):
+        sortie = StringIO()
+        call_command('benchmark_requetes', '--generer', '200', '--comparer', '--repetitions', '1', stdout=sortie)
+        texte = sortie.getvalue()
+        self.assertIn("SANS index composites", texte)
+        self.assertIn("AVEC index composites", texte)
+        self.assertIn("historique : page suivante (curseur)", texte)
+
+        # Les index supprimés pour la comparaison sont recréés
+        with connection.cursor() as curseur:
+            for modele, nom in INDEX_MESURES:
+                self.assertIn(nom, connection.introspection.get_constraints(curseur, modele._meta.db_table))
+
+        call_command('benchmark_requetes', '--nettoyer', stdout=StringIO())
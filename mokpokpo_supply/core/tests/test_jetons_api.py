@@ -0,0 +1,126 @@
+import json
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import CommandError, call_command
+from django.test import Client
+from django.urls import reverse
+
+from core.jetons import creer_jeton, empreinte
+from core.ia.registre import publier_version
+from core.models import JetonAPI, Livraison
+from core.testing import TestCaseIsole
+
+from . import outils
+
+
+JETON_CSRF = 'a' * 32
+
+
+class JetonsAPITest(outils.RegistreTemporaireMixin, TestCaseIsole):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.grossiste = outils.utilisateur('GROSSISTE')
+        cls.gerant = outils.utilisateur('GERANT')
+        cls.cafe = outils.produit('Café')
+
+    def setUp(self):
+        super().setUp()
+        # Les outils n'ont ni cookie ni jeton CSRF : vérification réelle
+        self.client = Client(enforce_csrf_checks=True)
+        self.jeton, self.cle = creer_jeton(self.grossiste, "ERP")
+
+    def commande(self, **kwargs):
+        corps = json.dumps({'date_livraison': '2026-11-02', 'lignes': [{'produit': self.cafe.id, 'quantite': 5}]})
+        return self.client.post(reverse('api_commandes'), corps, content_type='application/json', **kwargs)
+
+    def bearer(self, cle):
+        return {'headers': {'Authorization': f"Bearer {cle}"}}
+
+    def test_creation(self):
+        self.assertEqual(self.jeton.cle_hachee, empreinte(self.cle))
+        self.assertEqual(self.jeton.prefixe, self.cle[:8])
+        self.assertNotIn(self.cle, {self.jeton.cle_hachee, str(self.jeton)})
+
+    def test_appel_avec_jeton(self):
+        reponse = self.commande(**self.bearer(self.cle))
+        self.assertEqual(reponse.status_code, 201)
+        self.assertEqual(Livraison.objects.get().grossiste, self.grossiste)
+        self.jeton.refresh_from_db()
+        self.assertIsNotNone(self.jeton.derniere_utilisation)
+
+    def test_jeton_invalide_ou_revoque(self):
+        reponse = self.commande(**self.bearer('inconnu'))
+        self.assertEqual(reponse.status_code, 401)
+        self.assertEqual(reponse['WWW-Authenticate'], 'Bearer')
+        self.assertEqual(reponse.json()['error'], "Jeton d'API invalide")
+
+        JetonAPI.objects.filter(pk=self.jeton.pk).update(actif=False)
+        self.assertEqual(self.commande(**self.bearer(self.cle)).status_code, 401)
+        self.assertFalse(Livraison.objects.exists())
+
+    def test_utilisateur_desactive(self):
+        self.grossiste.is_active = False
+        self.grossiste.save()
+        self.assertEqual(self.commande(**self.bearer(self.cle)).status_code, 401)
+
+    def test_non_authentifie(self):
+        for nom in ('api_commandes', 'api_predictions'):
+            with self.subTest(nom):
+                reponse = self.client.post(reverse(nom), '{}', content_type='application/json')
+                self.assertEqual(reponse.status_code, 401)
+                self.assertEqual(reponse.json()['error'], "Authentification requise")
+        self.assertEqual(self.client.get(reverse('api_lots_disponibles')).status_code, 401)
+
+    def test_mauvais_role(self):
+        _, cle = creer_jeton(outils.utilisateur('STOCK'), "Scanner")
+        reponse = self.commande(**self.bearer(cle))
+        self.assertEqual(reponse.status_code, 403)
+        self.assertEqual(reponse.json()['error'], "Accès réservé aux grossistes")
+
+    def test_session_soumise_au_csrf(self):
+        self.client.force_login(self.grossiste)
+        reponse = self.commande()
+        self.assertEqual(reponse.status_code, 403)
+        self.assertEqual(reponse.json()['error'], "Jeton CSRF manquant ou invalide")
+
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = JETON_CSRF
+        self.assertEqual(self.commande(headers={'X-CSRFToken': JETON_CSRF}).status_code, 201)
+
+    def test_lecture_en_session_sans_csrf(self):
+        self.client.force_login(outils.utilisateur('STOCK'))
+        reponse = self.client.get(reverse('api_lots_disponibles'), {'produit': self.cafe.id})
+        self.assertEqual(reponse.status_code, 200)
+
+    def test_predictions_avec_jeton(self):
+        publier_version(self.racine, *outils.modele_ajuste(), outils.FEATURES, promouvoir=True)
+        _, cle = creer_jeton(self.gerant, "Tableur")
+        ligne = {
+            'superficie_totale': 12, 'precipitations_mm': 120, 'temperature_moyenne': 26,
+            'age_plants_moyen': 8, 'mois': 5, 'cout_intrants': 45000,
+        }
+        reponse = self.client.post(
+            reverse('api_predictions'), json.dumps([ligne]), content_type='application/json', **self.bearer(cle),
+        )
+        self.assertEqual(reponse.status_code, 200)
+        resultats = [json.loads(l) for l in b''.join(reponse.streaming_content).splitlines()]
+        self.assertEqual([r['success'] for r in resultats], [True])
+
+        reponse = self.client.post(reverse('api_predictions'), '[]', content_type='application/json', **self.bearer(self.cle))
+        self.assertEqual(reponse.status_code, 403)
+
+
+class CommandeCreerJetonTest(TestCaseIsole):
+
+    def test_commande(self):
+        gerant = outils.utilisateur('GERANT', 'gerant-outil')
+        sortie = StringIO()
+        call_command('creer_jeton_api', 'gerant-outil', '--nom', 'Tableur', stdout=sortie)
+
+        cle = sortie.getvalue().splitlines()[-1]
+        jeton = JetonAPI.objects.get()
+        self.assertEqual((jeton.utilisateur, jeton.nom, jeton.cle_hachee), (gerant, 'Tableur', empreinte(cle)))
+
+        with self.assertRaisesMessage(CommandError, "Utilisateur inconnu"):
+            call_command('creer_jeton_api', 'personne', stdout=StringIO())
@@ -0,0 +1,102 @@
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from core.ia.lissage import backtest, composante_annuelle, debuts_series, prevoir
+
+from . import outils
+
+
+MOTIF = np.array([10, 12, 14, 12, 10, 4, 2], dtype=float)
+PREMIER = date(2024, 1, 1).toordinal()
+
+
+def hebdomadaire(jours, niveau=0.0):
+    return niveau + np.resize(MOTIF, jours)
+
+
+class LissageTest(SimpleTestCase):
+
+    def test_debuts_series(self):
+        presents = np.array([[False, True, True], [True, False, False], [False, False, False]])
+        np.testing.assert_array_equal(debuts_series(presents), [1, 0, 3])
+
+    def test_motif_hebdomadaire_prolonge(self):
+        Y = hebdomadaire(84)[None, :]
+        prevision = prevoir(Y, np.array([0]), PREMIER, 14)
+        np.testing.assert_allclose(prevision[0], np.resize(MOTIF, 14), atol=0.5)
+
+    def test_series_traitees_ensemble_comme_separement(self):
+        rng = np.random.default_rng(0)
+        Y = np.vstack([
+            hebdomadaire(120) + rng.normal(0, 1, 120),
+            np.r_[np.zeros(50), hebdomadaire(70, niveau=20)],
+            np.linspace(5, 30, 120),
+        ]).clip(0)
+        debut = debuts_series(Y > 0)
+        ensemble = prevoir(Y, debut, PREMIER, 7)
+        for s in range(3):
+            with self.subTest(serie=s):
+                np.testing.assert_allclose(ensemble[s], prevoir(Y[s:s + 1], debut[s:s + 1], PREMIER, 7)[0])
+
+    def test_serie_courte_moyenne_journaliere(self):
+        Y = np.r_[np.zeros(30), [3, 5, 1, 7]][None, :]
+        np.testing.assert_allclose(prevoir(Y, np.array([30]), PREMIER, 3), [[4, 4, 4]])
+
+    def test_previsions_positives(self):
+        Y = np.linspace(50, 0, 60)[None, :]
+        self.assertTrue((prevoir(Y, np.array([0]), PREMIER, 30) >= 0).all())
+
+    def test_composante_annuelle(self):
+        T = 3 * 365
+        jours = PREMIER + np.arange(T + 7)
+        annuel = 20 * np.sin(2 * np.pi * jours / 365.25)
+        Y = np.vstack([50 + annuel[:T], np.r_[np.zeros(T - 400), 50 + annuel[T - 400:T]]])
+        debut = np.array([0, T - 400])
+        historique, futur = composante_annuelle(Y, debut, PREMIER, 7)
+        np.testing.assert_allclose(futur[0], annuel[T:], atol=0.5)
+        # Moins de deux ans d'historique : pas de composante annuelle
+        self.assertFalse(historique[1].any() or futur[1].any())
+
+    def test_backtest(self):
+        rng = np.random.default_rng(1)
+        Y = np.vstack([hebdomadaire(140) + rng.normal(0, 0.5, 140) for _ in range(3)])
+        resultats = backtest(Y, Y > 0, PREMIER, horizon=7, origines=3)
+
+        self.assertEqual(set(resultats), {'holt_winters', 'moyenne', 'saisonniere_naive'})
+        self.assertLess(resultats['holt_winters']['mae'], resultats['moyenne']['mae'])
+        for metriques in resultats.values():
+            self.assertEqual(set(metriques), {'mae', 'rmse', 'wape', 'secondes'})
+
+    def test_backtest_historique_trop_court(self):
+        Y = hebdomadaire(20)[None, :]
+        self.assertEqual(backtest(Y, Y > 0, PREMIER, horizon=7, origines=2), {})
+
+
+class BacktestCommandeTest(TestCase):
+
+    def test_sans_sortie(self):
+        sortie = StringIO()
+        call_command('backtest_previsions', stdout=sortie)
+        self.assertIn("Aucune sortie de stock", sortie.getvalue())
+
+    def test_rapport(self):
+        produit = outils.produit()
+        _, (emplacement,) = outils.entrepot('Nord')
+        lot = outils.lot(produit, emplacement, 100000)
+        aujourd_hui = timezone.localdate()
+        for i in range(1, 71):
+            jour = aujourd_hui - timedelta(days=i)
+            instant = datetime.combine(jour, time(12), tzinfo=dt_timezone.utc)
+            outils.mouvement(lot, 'SORTIE', MOTIF[jour.toordinal() % 7], instant, source=emplacement)
+
+        sortie = StringIO()
+        call_command('backtest_previsions', '--horizon', '7', '--origines', '2', stdout=sortie)
+        texte = sortie.getvalue()
+        self.assertIn("1 série(s) produit × entrepôt, 70 jour(s) d'historique", texte)
+        for methode in ('holt_winters', 'moyenne', 'saisonniere_naive'):
+            self.assertIn(methode, texte)
@@ -0,0 +1,83 @@
+import re
+from datetime import date
+
+from django.urls import reverse
+
+from core.lots import lots_disponibles
+from core.models import LigneLivraison, Livraison
+from core.testing import TestCaseIsole
+
+from . import outils
+
+
+class LotsDisponiblesTest(TestCaseIsole):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.magasinier = outils.utilisateur('STOCK')
+        cls.cafe = outils.produit('Café')
+        cls.cacao = outils.produit('Cacao', 'CACAO')
+        cls.nord, (cls.empl_nord,) = outils.entrepot('Nord')
+        cls.sud, (cls.empl_sud,) = outils.entrepot('Sud')
+        cls.recent = outils.lot(cls.cafe, cls.empl_nord, 100, jours=1, code='CAF-RECENT')
+        cls.ancien = outils.lot(cls.cafe, cls.empl_sud, 80, jours=30, code='CAF-ANCIEN')
+        outils.lot(cls.cafe, cls.empl_nord, 50, restante=0, code='CAF-VIDE')
+        outils.lot(cls.cacao, cls.empl_nord, 10, code='CAC-1')
+
+    def test_lots_du_produit_plus_recents_d_abord(self):
+        self.assertEqual(
+            [(l['code_lot'], l['entrepot']) for l in lots_disponibles(self.cafe.id)],
+            [('CAF-RECENT', 'Nord'), ('CAF-ANCIEN', 'Sud')],
+        )
+        self.assertEqual([l['code_lot'] for l in lots_disponibles(self.cafe.id, self.sud.id)], ['CAF-ANCIEN'])
+
+    def test_cache_invalide_a_la_modification_d_un_lot(self):
+        lots_disponibles(self.cafe.id)
+        with self.assertNumQueries(0):
+            lots_disponibles(self.cafe.id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ancien.quantite_restante = 0
+            self.ancien.save()
+        self.assertEqual([l['code_lot'] for l in lots_disponibles(self.cafe.id)], ['CAF-RECENT'])
+
+    def test_api(self):
+        self.client.force_login(self.magasinier)
+        reponse = self.client.get(reverse('api_lots_disponibles'), {'produit': self.cafe.id, 'entrepot': self.nord.id})
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual([l['id'] for l in reponse.json()['lots']], [self.recent.id])
+
+        for params in ({}, {'produit': 'abc'}, {'produit': self.cafe.id, 'entrepot': 'x'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(reverse('api_lots_disponibles'), params).status_code, 400)
+
+    def test_dashboard_sans_options_de_lot(self):
+        grossiste = outils.utilisateur('GROSSISTE')
+        livraison = Livraison.objects.create(
+            numero='LIV-TEST-1', grossiste=grossiste, statut='PREPARATION', date_livraison=date(2026, 11, 2),
+        )
+        LigneLivraison.objects.create(livraison=livraison, produit=self.cafe, quantite=20)
+
+        self.client.force_login(self.magasinier)
+        reponse = self.client.get(reverse('dashboard_stock'))
+        # Les options sont chargées à la demande par l'API, pas rendues dans chaque ligne
+        self.assertRegex(
+            reponse.content.decode(),
+            rf'data-produit="{self.cafe.id}"[^>]*>\s*<option value="">[^<]*</option>\s*</select>',
+        )
+
+    def test_dashboard_lots_limites_a_l_entrepot(self):
+        grossiste = outils.utilisateur('GROSSISTE')
+        for numero, entrepot in (('LIV-SUD', self.sud), ('LIV-SANS', None)):
+            livraison = Livraison.objects.create(
+                numero=numero, grossiste=grossiste, statut='PREPARATION',
+                date_livraison=date(2026, 11, 2), entrepot=entrepot,
+            )
+            LigneLivraison.objects.create(livraison=livraison, produit=self.cafe, quantite=20)
+
+        # Livraison sans entrepôt : celui du magasinier
+        magasinier = outils.utilisateur('STOCK', entrepot=self.nord)
+        self.client.force_login(magasinier)
+        contenu = self.client.get(reverse('dashboard_stock')).content.decode()
+        entrepots = re.findall(rf'data-produit="{self.cafe.id}" data-entrepot="(\d*)"', contenu)
+        self.assertEqual(sorted(entrepots), sorted([str(self.sud.id), str(self.nord.id)]))
@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.ia.ml_service import MLPredictionService
+from core.ia.registre import RegistreModele, publier_version
+
+from . import outils
+
+
+def scenario(**champs):
+    return {
+        'superficie_totale': 12, 'precipitations_mm': 1200, 'temperature_moyenne': 26,
+        'age_plants_moyen': 8, 'mois': 5, 'cout_intrants': 45000, **champs,
+    }
+
+
+class PredictionsMultiplesTest(outils.RegistreTemporaireMixin, SimpleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.modele, self.scaler = outils.modele_ajuste()
+        publier_version(self.racine, self.modele, self.scaler, outils.FEATURES, promouvoir=True)
+        self.service = MLPredictionService()
+
+    def attendu(self, data):
+        ligne = [[float(data[f]) for f in outils.FEATURES]]
+        return float(self.modele.predict(self.scaler.transform(ligne))[0])
+
+    def test_identique_aux_predictions_unitaires(self):
+        lot = [scenario(superficie_totale=s) for s in (5, 12, 40)]
+        resultats = self.service.predict_multiple(lot)
+        for data, resultat in zip(lot, resultats):
+            self.assertTrue(resultat['success'])
+            self.assertAlmostEqual(resultat['prediction'], self.attendu(data))
+            self.assertAlmostEqual(resultat['prediction'], self.service.predict(data)['prediction'])
+            self.assertIs(resultat['input_data'], data)
+
+    def test_un_seul_appel_au_modele(self):
+        predicteur, _ = self.registre.predicteur()
+        with mock.patch.object(predicteur, 'predict', wraps=predicteur.predict) as predict:
+            self.service.predict_multiple([scenario(mois=m) for m in range(1, 13)])
+        predict.assert_called_once()
+        self.assertEqual(predict.call_args.args[0].shape, (12, 6))
+
+    def test_lignes_invalides_isolees(self):
+        resultats = self.service.predict_multiple([
+            scenario(),
+            scenario(mois=None),
+            scenario(cout_intrants='beaucoup'),
+            'pas un objet',
+            scenario(temperature_moyenne='nan'),
+            scenario(mois='7'),
+        ])
+        self.assertEqual([r['success'] for r in resultats], [True, False, False, False, False, True])
+        self.assertIn('mois', resultats[1]['error'])
+        self.assertIn('cout_intrants', resultats[2]['error'])
+        self.assertIn('temperature_moyenne', resultats[4]['error'])
+        self.assertAlmostEqual(resultats[5]['prediction'], self.attendu(scenario(mois=7)))
+
+    def test_echec_du_modele(self):
+        predicteur, _ = self.registre.predicteur()
+        with mock.patch.object(predicteur, 'predict', side_effect=ValueError("matrice invalide")):
+            resultats = self.service.predict_multiple([scenario(), scenario(mois=None)])
+        self.assertEqual(resultats[0]['error'], "matrice invalide")
+        self.assertIn('mois', resultats[1]['error'])
+
+    def test_lot_vide(self):
+        self.assertEqual(self.service.predict_multiple([]), [])
+
+    def test_sans_modele(self):
+        service = MLPredictionService(registre=RegistreModele(self.racine / 'vide', 0))
+        resultats = service.predict_multiple([scenario(), scenario()])
+        self.assertEqual(len(resultats), 2)
+        self.assertTrue(all(not r['success'] and 'Modèles non chargés' in r['error'] for r in resultats))
+
+    def test_flux_par_lots(self):
+        lot = [scenario(superficie_totale=s) for s in range(1, 8)]
+        with mock.patch.object(self.service, 'predict_multiple', wraps=self.service.predict_multiple) as multiple:
+            resultats = list(self.service.predict_stream(iter(lot), taille_lot=3))
+        self.assertEqual([len(c.args[0]) for c in multiple.call_args_list], [3, 3, 1])
+        self.assertEqual([r['input_data'] for r in resultats], lot)
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+from html.parser import HTMLParser
+
+from django.urls import reverse
+from django.utils import timezone
+
+from core.mouvements import decoder_curseur, mouvements_filtres, page_mouvements
+from core.testing import TestCaseIsole
+
+from . import outils
+
+
+class _Balises(HTMLParser):
+    """Compte les <div> ouverts et non refermés d'une page."""
+
+    def __init__(self):
+        super().__init__()
+        self.ouverts = 0
+        self.orphelins = 0
+
+    def handle_starttag(self, balise, attributs):
+        if balise == 'div':
+            self.ouverts += 1
+
+    def handle_endtag(self, balise):
+        if balise == 'div':
+            if self.ouverts:
+                self.ouverts -= 1
+            else:
+                self.orphelins += 1
+
+
+class MouvementsTest(TestCaseIsole):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.magasinier = outils.utilisateur('STOCK')
+        cls.gerant = outils.utilisateur('GERANT')
+        produit = outils.produit()
+        cls.entrepot_a, (cls.empl_a,) = outils.entrepot('Nord')
+        cls.entrepot_b, (cls.empl_b,) = outils.entrepot('Sud')
+        cls.lot_a = outils.lot(produit, cls.empl_a)
+        cls.lot_b = outils.lot(produit, cls.empl_b)
+
+        cls.debut = timezone.make_aware(datetime(2026, 3, 1, 8))
+        cls.mouvements = []
+        for i in range(25):
+            # Dates en double : l'ordre se départage par id
+            date = cls.debut + timedelta(hours=i // 2)
+            if i % 3 == 0:
+                mv = outils.mouvement(cls.lot_a, 'ENTREE', i + 1, date, destination=cls.empl_a)
+            elif i % 3 == 1:
+                mv = outils.mouvement(cls.lot_b, 'SORTIE', i + 1, date, source=cls.empl_b)
+            else:
+                mv = outils.mouvement(cls.lot_a, 'TRANSFERT', i + 1, date, source=cls.empl_a, destination=cls.empl_b)
+            cls.mouvements.append(mv)
+
+    def ordre_attendu(self, mouvements):
+        return [mv.id for mv in sorted(mouvements, key=lambda mv: (mv.date, mv.id), reverse=True)]
+
+    def parcourir(self, params, taille):
+        ids, curseur, pages = [], None, 0
+        while True:
+            mouvements, curseur = page_mouvements(mouvements_filtres(params), curseur, taille)
+            ids += [mv.id for mv in mouvements]
+            pages += 1
+            if curseur is None:
+                return ids, pages
+
+    def test_pagination_par_cle_complete_et_ordonnee(self):
+        ids, pages = self.parcourir({}, taille=7)
+        self.assertEqual(ids, self.ordre_attendu(self.mouvements))
+        self.assertEqual(pages, 4)
+
+    def test_filtres(self):
+        cas = {
+            'type': ({'type': 'SORTIE'}, lambda mv: mv.type_mouvement == 'SORTIE'),
+            'lot': ({'lot': str(self.lot_b.id)}, lambda mv: mv.lot_id == self.lot_b.id),
+            'entrepot': (
+                {'entrepot': str(self.entrepot_b.id)},
+                lambda mv: self.empl_b.id in (mv.source_emplacement_id, mv.destination_emplacement_id),
+            ),
+            'periode': ({'du': '2026-03-01', 'au': '2026-03-01'}, lambda mv: True),
+        }
+        for nom, (params, garder) in cas.items():
+            with self.subTest(nom):
+                ids, _ = self.parcourir(params, taille=4)
+                self.assertEqual(ids, self.ordre_attendu(filter(garder, self.mouvements)))
+
+        self.assertEqual(self.parcourir({'du': '2026-03-02'}, taille=4)[0], [])
+
+    def test_curseur_invalide(self):
+        for curseur in ('pas-un-curseur', 'Zm9v'):
+            with self.subTest(curseur), self.assertRaises(ValueError):
+                decoder_curseur(curseur)
+
+    def test_api_mouvements(self):
+        self.client.force_login(self.magasinier)
+        reponse = self.client.get(reverse('api_mouvements'), {'taille': 10, 'type': 'ENTREE'})
+        self.assertEqual(reponse.status_code, 200)
+        donnees = reponse.json()
+        self.assertEqual(len(donnees['mouvements']), 9)
+        self.assertIsNone(donnees['suivant'])
+        premier = donnees['mouvements'][0]
+        self.assertEqual(premier['lot'], self.lot_a.code_lot)
+        self.assertEqual(premier['destination'], {'code': self.empl_a.code_emplacement, 'entrepot': 'Nord'})
+
+        suite = self.client.get(reverse('api_mouvements'), {'taille': 10}).json()
+        reste = self.client.get(reverse('api_mouvements'), {'taille': 10, 'curseur': suite['suivant']}).json()
+        self.assertEqual(
+            [mv['id'] for mv in suite['mouvements'] + reste['mouvements']],
+            self.ordre_attendu(self.mouvements)[:20],
+        )
+
+        reponse = self.client.get(reverse('api_mouvements'), {'curseur': 'pas-un-curseur'})
+        self.assertEqual(reponse.status_code, 400)
+
+    def test_api_mouvements_reservee(self):
+        self.client.force_login(outils.utilisateur('GROSSISTE'))
+        self.assertEqual(self.client.get(reverse('api_mouvements')).status_code, 403)
+
+    def test_tableaux_de_bord_bien_formes(self):
+        for vue, utilisateur in (('dashboard_stock', self.magasinier), ('dashboard_gerant', self.gerant)):
+            with self.subTest(vue):
+                self.client.force_login(utilisateur)
+                reponse = self.client.get(reverse(vue))
+                self.assertContains(reponse, 'js/mouvements.js')
+                balises = _Balises()
+                balises.feed(reponse.content.decode())
+                self.assertEqual((balises.ouverts, balises.orphelins), (0, 0))
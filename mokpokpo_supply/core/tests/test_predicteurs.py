@@ -0,0 +1,147 @@
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+from django.conf import settings
+from django.test import SimpleTestCase
+from sklearn.ensemble import (
+    AdaBoostRegressor, BaggingRegressor, ExtraTreesRegressor, GradientBoostingRegressor, RandomForestRegressor,
+)
+from sklearn.linear_model import GammaRegressor, LinearRegression, PoissonRegressor, Ridge, TweedieRegressor
+from sklearn.preprocessing import MinMaxScaler, RobustScaler, StandardScaler
+from sklearn.tree import DecisionTreeRegressor
+
+from core.ia.predicteurs import FORMATS, PredicteurLineaire, depuis_sklearn
+
+from . import outils
+
+
+def modeles():
+    return {
+        'ridge': Ridge(),
+        'lineaire': LinearRegression(),
+        'arbre': DecisionTreeRegressor(max_depth=6, random_state=0),
+        'foret': RandomForestRegressor(n_estimators=15, max_depth=5, random_state=0),
+        'extra_trees': ExtraTreesRegressor(n_estimators=15, max_depth=5, random_state=0),
+        'boosting': GradientBoostingRegressor(n_estimators=20, max_depth=3, random_state=0),
+    }
+
+
+class ScalerPersonnalise(StandardScaler):
+    def transform(self, X, copy=None):
+        return super().transform(X, copy) * 2
+
+
+class ExportPredicteursTest(SimpleTestCase):
+    """Le prédicteur exporté, puis relu depuis le disque, reproduit scikit-learn."""
+
+    def setUp(self):
+        self.X, _ = outils.scenarios(300, graine=3)
+
+    def verifier(self, modele, scaler, format_attendu):
+        predicteur = depuis_sklearn(modele, scaler, outils.FEATURES)
+        self.assertEqual(predicteur.FORMAT, format_attendu)
+        with tempfile.TemporaryDirectory() as dossier:
+            dossier = Path(dossier)
+            predicteur.sauvegarder(dossier)
+            (dossier / 'metadata.json').write_text(json.dumps({'features': outils.FEATURES}))
+            relu = FORMATS[format_attendu].charger(dossier)
+            attendu = modele.predict(scaler.transform(self.X))
+            np.testing.assert_allclose(predicteur.predict(self.X), attendu, rtol=1e-9, atol=1e-6)
+            np.testing.assert_allclose(relu.predict(self.X), attendu, rtol=1e-9, atol=1e-6)
+
+    def test_standard_scaler_exporte_en_numpy(self):
+        for nom, modele in modeles().items():
+            with self.subTest(nom):
+                modele, scaler = outils.modele_ajuste(modele, StandardScaler())
+                self.verifier(modele, scaler, 'lineaire' if nom in ('ridge', 'lineaire') else 'arbres')
+
+    def test_autres_scalers_exportes_en_joblib(self):
+        scalers = {
+            'minmax': MinMaxScaler,
+            'robust': RobustScaler,
+            'sans_centrage': lambda: StandardScaler(with_mean=False),
+            'sans_reduction': lambda: StandardScaler(with_std=False),
+        }
+        for nom_scaler, scaler in scalers.items():
+            for nom, modele in modeles().items():
+                with self.subTest(scaler=nom_scaler, modele=nom):
+                    self.verifier(*outils.modele_ajuste(modele, scaler()), 'joblib')
+
+    def test_sous_classe_de_standard_scaler(self):
+        self.verifier(*outils.modele_ajuste(Ridge(), ScalerPersonnalise()), 'joblib')
+
+    def test_glm_a_lien_log_exporte_en_joblib(self):
+        # coef_ à une dimension, mais predict = exp(X · coef + intercept)
+        for modele in (PoissonRegressor(), GammaRegressor(), TweedieRegressor(power=1.5)):
+            with self.subTest(type(modele).__name__):
+                self.verifier(*outils.modele_ajuste(modele), 'joblib')
+
+    def test_export_different_du_modele_ecarte(self):
+        modele, scaler = outils.modele_ajuste(Ridge())
+        faux = lambda self, X: np.zeros(len(X))
+        with mock.patch.object(PredicteurLineaire, 'predict', faux), \
+                self.assertLogs('core.ia.predicteurs', 'WARNING'):
+            predicteur = depuis_sklearn(modele, scaler, outils.FEATURES, echantillon=self.X)
+        self.assertEqual(predicteur.FORMAT, 'joblib')
+        np.testing.assert_allclose(predicteur.predict(self.X), modele.predict(scaler.transform(self.X)))
+
+
+class PredicteurArbresTest(SimpleTestCase):
+
+    def setUp(self):
+        self.X, self.y = outils.scenarios(300, graine=4)
+
+    def test_arbre_profond(self):
+        modele = DecisionTreeRegressor(random_state=0).fit(self.X, self.y)
+        predicteur = depuis_sklearn(modele, None, outils.FEATURES)
+        self.assertEqual(predicteur.FORMAT, 'arbres')
+        np.testing.assert_array_equal(predicteur.predict(self.X), modele.predict(self.X))
+
+    def test_arbre_reduit_a_une_feuille(self):
+        modele = DecisionTreeRegressor().fit(self.X, np.full(len(self.X), 7.5))
+        np.testing.assert_allclose(depuis_sklearn(modele, None, outils.FEATURES).predict(self.X[:5]), 7.5)
+
+    def test_boosting_sans_initialisation(self):
+        modele = GradientBoostingRegressor(n_estimators=10, init='zero', random_state=0).fit(self.X, self.y)
+        predicteur = depuis_sklearn(modele, None, outils.FEATURES)
+        self.assertEqual(predicteur.FORMAT, 'arbres')
+        np.testing.assert_allclose(predicteur.predict(self.X), modele.predict(self.X), rtol=1e-9)
+
+    def test_autres_ensembles_exportes_en_joblib(self):
+        # Médiane pondérée (AdaBoost), arbres sur des sous-ensembles de colonnes (bagging)
+        ensembles = {
+            'adaboost': AdaBoostRegressor(DecisionTreeRegressor(max_depth=3), n_estimators=10, random_state=0),
+            'bagging': BaggingRegressor(DecisionTreeRegressor(), n_estimators=10, max_features=3, random_state=0),
+        }
+        for nom, modele in ensembles.items():
+            with self.subTest(nom):
+                modele.fit(self.X, self.y)
+                predicteur = depuis_sklearn(modele, None, outils.FEATURES)
+                self.assertEqual(predicteur.FORMAT, 'joblib')
+                np.testing.assert_array_equal(predicteur.predict(self.X), modele.predict(self.X))
+
+    def test_plusieurs_sorties_non_exportees(self):
+        modele = DecisionTreeRegressor(max_depth=3).fit(self.X, np.column_stack([self.y, -self.y]))
+        self.assertEqual(depuis_sklearn(modele, None, outils.FEATURES).FORMAT, 'joblib')
+
+    def test_prediction_sans_pandas_ni_sklearn(self):
+        modele, scaler = outils.modele_ajuste(RandomForestRegressor(n_estimators=5, max_depth=4, random_state=0))
+        with tempfile.TemporaryDirectory() as dossier:
+            depuis_sklearn(modele, scaler, outils.FEATURES).sauvegarder(Path(dossier))
+            script = (
+                "import sys, numpy as np\n"
+                "from pathlib import Path\n"
+                "from core.ia.predicteurs import PredicteurArbres\n"
+                f"p = PredicteurArbres.charger(Path({dossier!r}))\n"
+                "p.predict(np.ones((3, 6)))\n"
+                "print(sorted(m for m in ('pandas', 'sklearn') if m in sys.modules))\n"
+            )
+            sortie = subprocess.run(
+                [sys.executable, '-c', script], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+            )
+        self.assertEqual(sortie.stdout.strip(), '[]')
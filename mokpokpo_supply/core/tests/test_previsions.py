@@ -0,0 +1,123 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.ia.previsions import (
+    VERSION_HOLT_WINTERS, calculer_previsions, enregistrer_previsions, previsions_a_venir,
+    sorties_depuis_dernier_calcul,
+)
+from core.models import PrevisionDemande
+
+from . import outils
+
+
+def il_y_a(jours):
+    return datetime.combine(timezone.localdate() - timedelta(days=jours), time(12), tzinfo=dt_timezone.utc)
+
+
+class PrevisionsTest(outils.RegistreTemporaireMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cafe = outils.produit('Café')
+        cls.nord, (cls.empl_nord,) = outils.entrepot('Nord')
+        cls.sud, (cls.empl_sud,) = outils.entrepot('Sud')
+        cls.lot = outils.lot(cls.cafe, cls.empl_nord, 10000)
+        # Demande stable : 10 par jour au Nord pendant huit semaines, jusqu'à hier
+        for jour in range(1, 57):
+            outils.mouvement(cls.lot, 'SORTIE', 10, il_y_a(jour), source=cls.empl_nord)
+        outils.mouvement(cls.lot, 'SORTIE', 4, il_y_a(3), source=cls.empl_sud)
+
+    def test_calcul(self):
+        previsions, version = calculer_previsions(horizon=5)
+
+        self.assertEqual(version, VERSION_HOLT_WINTERS)
+        demain = timezone.localdate() + timedelta(days=1)
+        nord = [p for p in previsions if p.entrepot_id == self.nord.id]
+        self.assertEqual([p.periode for p in nord], [(demain + timedelta(days=h)).isoformat() for h in range(5)])
+        for p in nord:
+            self.assertAlmostEqual(p.quantite_prevue, 10, delta=0.5)
+        self.assertEqual(len([p for p in previsions if p.entrepot_id == self.sud.id]), 5)
+
+    def test_journee_en_cours_ignoree(self):
+        # Une grosse sortie aujourd'hui (journée incomplète) ne change pas la prévision
+        avant = {(p.entrepot_id, p.periode): p.quantite_prevue for p in calculer_previsions()[0]}
+        outils.mouvement(self.lot, 'SORTIE', 5000, timezone.now(), source=self.empl_nord)
+        apres = {(p.entrepot_id, p.periode): p.quantite_prevue for p in calculer_previsions()[0]}
+        self.assertEqual(avant, apres)
+
+    def test_enregistrement_idempotent(self):
+        demain = (timezone.localdate() + timedelta(days=1)).isoformat()
+        # Série disparue pour une période recalculée : supprimée ; période passée : conservée
+        perimee = PrevisionDemande.objects.create(
+            produit=self.cafe, entrepot=outils.entrepot('Est')[0], periode=demain, quantite_prevue=1,
+        )
+        passee = PrevisionDemande.objects.create(
+            produit=self.cafe, entrepot=self.nord, periode='2020-01-01', quantite_prevue=1,
+        )
+
+        self.assertEqual(enregistrer_previsions(calculer_previsions()[0]), 14)
+        enregistrer_previsions(calculer_previsions()[0])
+
+        self.assertEqual(PrevisionDemande.objects.filter(periode__gte=demain).count(), 14)
+        self.assertFalse(PrevisionDemande.objects.filter(pk=perimee.pk).exists())
+        self.assertTrue(PrevisionDemande.objects.filter(pk=passee.pk).exists())
+        self.assertEqual(list(previsions_a_venir())[0].periode, demain)
+
+    def test_commande_et_seuil_de_sorties(self):
+        sortie = StringIO()
+        call_command('calculer_previsions', '--horizon', '3', stdout=sortie)
+        self.assertIn("6 prévision(s) enregistrée(s)", sortie.getvalue())
+        self.assertEqual(sorties_depuis_dernier_calcul(), 0)
+
+        outils.mouvement(self.lot, 'SORTIE', 1, timezone.now() + timedelta(seconds=1), source=self.empl_nord)
+        sortie = StringIO()
+        call_command('calculer_previsions', '--seuil-sorties', '5', stdout=sortie)
+        self.assertIn("1 sortie(s) depuis le dernier calcul (seuil 5) : rien à faire", sortie.getvalue())
+
+    def test_page_previsions(self):
+        enregistrer_previsions(calculer_previsions(horizon=2)[0])
+        self.client.force_login(outils.utilisateur('GERANT'))
+        reponse = self.client.get(reverse('gerant_predictions'))
+        self.assertEqual(len(reponse.context['old_predictions']), 4)
+        self.assertContains(reponse, 'Nord')
+
+
+class MigrationPrevisionsTest(TransactionTestCase):
+    """0019 rattache les prévisions existantes à un entrepôt au lieu de les supprimer."""
+
+    avant = [('core', '0018_index_requetes')]
+    apres = [('core', '0019_prevision_demande_entrepot')]
+
+    def migrer(self, cible):
+        executeur = MigrationExecutor(connection)
+        executeur.loader.build_graph()
+        executeur.migrate(cible)
+        return executeur.loader.project_state(cible).apps
+
+    def tearDown(self):
+        self.migrer(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_previsions_rattachees(self):
+        apps = self.migrer(self.avant)
+        produit = apps.get_model('core', 'Produit').objects.create(
+            nom='Café', type_produit='CAFE', unite='kg', prix_reference=1000,
+        )
+        entrepot = apps.get_model('core', 'Entrepot').objects.create(nom='Lomé')
+        apps.get_model('core', 'Entrepot').objects.create(nom='Kara')
+        PrevisionDemande = apps.get_model('core', 'PrevisionDemande')
+        PrevisionDemande.objects.create(produit=produit, periode='2026-11-02', quantite_prevue=5)
+        PrevisionDemande.objects.create(produit=produit, periode='2026-11-02', quantite_prevue=8)
+        PrevisionDemande.objects.create(produit=produit, periode='2026-11-03', quantite_prevue=6)
+
+        apps = self.migrer(self.apres)
+        self.assertEqual(
+            sorted(apps.get_model('core', 'PrevisionDemande').objects.values_list('entrepot_id', 'periode', 'quantite_prevue')),
+            [(entrepot.id, '2026-11-02', 8), (entrepot.id, '2026-11-03', 6)],
+        )
@@ -0,0 +1,154 @@
+import math
+from datetime import date, timedelta
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from core.ia.prix import indicateurs, mettre_a_jour_indicateurs, somme_glissante, tendances_prix
+from core.models import HistoriquePrix, IndicateurPrix
+from core.testing import TestCaseIsole
+
+from . import outils
+
+
+DEBUT = date(2026, 1, 1)
+CHAMPS = ('prix_moyen', 'nb_releves', 'moyenne_7j', 'moyenne_30j', 'volatilite_30j', 'ecart_reference')
+
+
+class CalculsTest(SimpleTestCase):
+
+    def test_somme_glissante(self):
+        X = np.arange(1, 7, dtype=float)[None, :]
+        np.testing.assert_allclose(somme_glissante(X, 3), [[1, 3, 6, 9, 12, 15]])
+        np.testing.assert_allclose(somme_glissante(X, 10), np.cumsum(X, axis=1))
+
+    def test_indicateurs(self):
+        rng = np.random.default_rng(0)
+        prix = np.concatenate([[np.nan] * 5, 1000 * np.exp(np.cumsum(rng.normal(0, 0.02, 55)))])[None, :]
+        courte, longue, volatilite = indicateurs(prix)
+
+        # Référence : boucle directe, jours inconnus exclus des fenêtres
+        for j in range(5, 60):
+            fenetre_7 = prix[0, max(j - 6, 0):j + 1]
+            fenetre_30 = prix[0, max(j - 29, 0):j + 1]
+            self.assertAlmostEqual(courte[0, j], np.nanmean(fenetre_7))
+            self.assertAlmostEqual(longue[0, j], np.nanmean(fenetre_30))
+            rendements = np.diff(np.log(prix[0, max(j - 30, 0):j + 1]))
+            rendements = rendements[~np.isnan(rendements)]
+            if len(rendements) >= 2:
+                self.assertAlmostEqual(volatilite[0, j], np.std(rendements, ddof=1))
+            else:
+                self.assertTrue(math.isnan(volatilite[0, j]))
+        self.assertTrue(np.isnan(volatilite[0, :7]).all())
+
+    def test_prix_constant(self):
+        _, _, volatilite = indicateurs(np.full((1, 40), 500.0))
+        np.testing.assert_allclose(volatilite[0, 2:], 0, atol=1e-12)
+
+
+class IndicateursPrixTest(TestCaseIsole):
+    """
+    Café : relevés un jour sur deux du jour 0 au jour 58 ; cacao : tous les
+    trois jours du jour 20 au jour 59. Le dernier prix est reporté jusqu'au
+    dernier jour relevé, tous produits confondus.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cafe = outils.produit('Café', prix_reference=1000)
+        cls.cacao = outils.produit('Cacao', 'CACAO', prix_reference=0)
+        releves = [
+            HistoriquePrix(produit=cls.cafe, date=DEBUT + timedelta(days=j), prix=1000 + 10 * (j % 7))
+            for j in range(0, 60, 2)
+        ]
+        releves.append(HistoriquePrix(produit=cls.cafe, date=DEBUT, prix=1100))
+        releves += [
+            HistoriquePrix(produit=cls.cacao, date=DEBUT + timedelta(days=j), prix=2000 - j)
+            for j in range(20, 60, 3)
+        ]
+        HistoriquePrix.objects.bulk_create(releves)
+
+    def valeurs(self):
+        return {
+            (i.produit_id, i.date): tuple(getattr(i, c) for c in CHAMPS)
+            for i in IndicateurPrix.objects.all()
+        }
+
+    def ajouter(self, produit, jour, prix):
+        HistoriquePrix.objects.create(produit=produit, date=DEBUT + timedelta(days=jour), prix=prix)
+
+    def test_calcul_complet(self):
+        self.assertEqual(mettre_a_jour_indicateurs(), 60 + 40)
+
+        premier = IndicateurPrix.objects.get(produit=self.cafe, date=DEBUT)
+        self.assertEqual((premier.prix_moyen, premier.nb_releves), (1050, 2))
+        self.assertAlmostEqual(premier.ecart_reference, 0.05)
+        # Jour sans relevé : prix de la veille reporté
+        reporte = IndicateurPrix.objects.get(produit=self.cafe, date=DEBUT + timedelta(days=3))
+        self.assertEqual((reporte.prix_moyen, reporte.nb_releves), (1020, 0))
+        # Pas de prix de référence : pas d'écart
+        self.assertIsNone(IndicateurPrix.objects.filter(produit=self.cacao).first().ecart_reference)
+        self.assertFalse(IndicateurPrix.objects.filter(produit=self.cacao, date__lt=DEBUT + timedelta(days=20)).exists())
+
+        # Rien de nouveau : rien à écrire
+        self.assertEqual(mettre_a_jour_indicateurs(), 0)
+
+    def test_incremental_identique_au_complet(self):
+        mettre_a_jour_indicateurs()
+        self.ajouter(self.cafe, 61, 1200)
+        self.ajouter(self.cacao, 65, 1900)
+
+        # Jours 60 à 65 pour les deux produits
+        self.assertEqual(mettre_a_jour_indicateurs(), 6 + 6)
+        incremental = self.valeurs()
+        mettre_a_jour_indicateurs(complet=True)
+        self.assertEqual(incremental, self.valeurs())
+
+    def test_releve_passe_modifie(self):
+        mettre_a_jour_indicateurs()
+        releve = HistoriquePrix.objects.get(produit=self.cafe, date=DEBUT + timedelta(days=40))
+
+        # Déplacé plus tôt : invalidation depuis la nouvelle date
+        releve.date = DEBUT + timedelta(days=30)
+        releve.prix = 1500
+        releve.save()
+        self.assertFalse(IndicateurPrix.objects.filter(produit=self.cafe, date__gte=releve.date).exists())
+        self.assertTrue(IndicateurPrix.objects.filter(produit=self.cacao, date__gte=releve.date).exists())
+
+        mettre_a_jour_indicateurs()
+        incremental = self.valeurs()
+        mettre_a_jour_indicateurs(complet=True)
+        self.assertEqual(incremental, self.valeurs())
+
+        # Suppression : invalidation depuis la date du relevé
+        releve.delete()
+        self.assertFalse(IndicateurPrix.objects.filter(produit=self.cafe, date__gte=DEBUT + timedelta(days=30)).exists())
+
+    def test_tendances_et_tableau_de_bord(self):
+        mettre_a_jour_indicateurs()
+        with self.assertNumQueries(1):
+            tendances = list(tendances_prix())
+        self.assertEqual([(t.produit, t.date) for t in tendances], [
+            (self.cacao, DEBUT + timedelta(days=59)), (self.cafe, DEBUT + timedelta(days=59)),
+        ])
+
+        self.client.force_login(outils.utilisateur('GERANT'))
+        self.assertContains(self.client.get(reverse('dashboard_gerant')), 'Cacao')
+        # Fragment invalidé par un nouveau calcul
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ajouter(self.cafe, 62, 1234)
+            mettre_a_jour_indicateurs()
+        self.assertContains(self.client.get(reverse('dashboard_gerant')), '1234,00')
+
+    def test_commande(self):
+        sortie = StringIO()
+        call_command('calculer_indicateurs_prix', stdout=sortie)
+        self.assertIn("100 indicateur(s) de prix enregistré(s)", sortie.getvalue())
+
+        sortie = StringIO()
+        call_command('calculer_indicateurs_prix', '--complet', stdout=sortie)
+        self.assertIn("100 indicateur(s)", sortie.getvalue())
+        self.assertEqual(IndicateurPrix.objects.count(), 100)
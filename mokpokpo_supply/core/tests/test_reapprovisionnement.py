@@ -0,0 +1,118 @@
+import math
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from io import StringIO
+from statistics import NormalDist
+
+import numpy as np
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.ia.reapprovisionnement import (
+    calculer_niveaux, enregistrer_niveaux, niveaux_sous_seuil, statistiques_demande,
+)
+from core.models import NiveauReapprovisionnement, PrevisionDemande
+from core.testing import TestCaseIsole
+
+from . import outils
+
+
+class StatistiquesDemandeTest(SimpleTestCase):
+
+    def test_depuis_la_premiere_sortie(self):
+        quantites = np.array([[0, 0, 4, 0, 8, 6], [1, 2, 3, 4, 5, 6]], dtype=float)
+        moyenne, ecart = statistiques_demande(quantites, quantites > 0)
+        np.testing.assert_allclose(moyenne, [4.5, 3.5])
+        np.testing.assert_allclose(ecart, [np.std([4, 0, 8, 6], ddof=1), np.std(range(1, 7), ddof=1)])
+
+    def test_fenetre(self):
+        quantites = np.array([[100, 100, 1, 3]], dtype=float)
+        moyenne, ecart = statistiques_demande(quantites, quantites > 0, fenetre=2)
+        np.testing.assert_allclose([moyenne[0], ecart[0]], [2, math.sqrt(2)])
+
+    def test_serie_sans_sortie(self):
+        moyenne, ecart = statistiques_demande(np.zeros((1, 5)), np.zeros((1, 5), dtype=bool))
+        self.assertEqual((moyenne[0], ecart[0]), (0, 0))
+
+
+class NiveauxReapprovisionnementTest(TestCaseIsole):
+    """
+    Nord : 8 et 12 en alternance pendant 30 jours, 50 en stock -> sous le seuil.
+    Sud : aucune sortie, prévision de 2 par jour, 1000 en stock.
+    Est : du stock sans aucune demande.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cafe = outils.produit('Café')
+        cls.nord, (empl_nord,) = outils.entrepot('Nord')
+        cls.sud, (empl_sud,) = outils.entrepot('Sud')
+        cls.est, (empl_est,) = outils.entrepot('Est')
+        lot_nord = outils.lot(cls.cafe, empl_nord, 1000, restante=50)
+        outils.lot(cls.cafe, empl_sud, 1000)
+        outils.lot(cls.cafe, empl_est, 10)
+        aujourd_hui = timezone.localdate()
+        for i in range(1, 31):
+            instant = datetime.combine(aujourd_hui - timedelta(days=i), time(12), tzinfo=dt_timezone.utc)
+            outils.mouvement(lot_nord, 'SORTIE', 8 if i % 2 else 12, instant, source=empl_nord)
+        for h in range(1, 4):
+            PrevisionDemande.objects.create(
+                produit=cls.cafe, entrepot=cls.sud, quantite_prevue=2,
+                periode=(aujourd_hui + timedelta(days=h)).isoformat(),
+            )
+
+    def niveaux(self, **kwargs):
+        return {n.entrepot_id: n for n in calculer_niveaux(**kwargs)}
+
+    def test_calcul(self):
+        niveaux = self.niveaux(delai=7, niveau_service=0.95)
+
+        nord = niveaux[self.nord.id]
+        ecart = np.std([8, 12] * 15, ddof=1)
+        securite = NormalDist().inv_cdf(0.95) * ecart * math.sqrt(7)
+        self.assertAlmostEqual(nord.demande_journaliere, 10)
+        self.assertAlmostEqual(nord.ecart_type_journalier, ecart, places=3)
+        self.assertAlmostEqual(nord.stock_securite, securite, places=2)
+        self.assertAlmostEqual(nord.point_commande, 70 + securite, places=2)
+        self.assertEqual(nord.jours_couverture, 5.0)
+        self.assertTrue(nord.sous_seuil)
+
+        sud = niveaux[self.sud.id]
+        self.assertEqual((sud.demande_journaliere, sud.jours_couverture, sud.sous_seuil), (2, 500.0, False))
+
+        est = niveaux[self.est.id]
+        self.assertEqual((est.stock, est.jours_couverture, est.sous_seuil), (10, None, False))
+
+    def test_niveau_de_service(self):
+        prudent = self.niveaux(niveau_service=0.99)[self.nord.id].stock_securite
+        self.assertGreater(prudent, self.niveaux(niveau_service=0.9)[self.nord.id].stock_securite)
+        self.assertEqual(self.niveaux(delai=0)[self.nord.id].point_commande, 0)
+
+    def test_requetes_agregees(self):
+        with self.assertNumQueries(3):
+            calculer_niveaux()
+
+    def test_enregistrement_et_tableau_de_bord(self):
+        NiveauReapprovisionnement.objects.create(
+            produit=self.cafe, entrepot=self.nord, stock=0, demande_journaliere=0, ecart_type_journalier=0,
+            stock_securite=0, point_commande=0, sous_seuil=True,
+        )
+        self.client.force_login(outils.utilisateur('GERANT'))
+        self.client.get(reverse('dashboard_gerant'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(enregistrer_niveaux(calculer_niveaux()), 1)
+        self.assertEqual(NiveauReapprovisionnement.objects.count(), 3)
+        self.assertEqual([n.entrepot for n in niveaux_sous_seuil()], [self.nord])
+        # Fragment du tableau de bord invalidé par l'enregistrement
+        self.assertContains(self.client.get(reverse('dashboard_gerant')), '5,0 j')
+
+    def test_commande(self):
+        sortie = StringIO()
+        call_command('calculer_reapprovisionnement', '--delai', '7', stdout=sortie)
+        self.assertIn("3 couple(s) produit × entrepôt calculé(s), 1 sous le point de commande", sortie.getvalue())
+
+        for arguments in (['--niveau-service', '1'], ['--delai', '-1']):
+            with self.subTest(arguments), self.assertRaises(CommandError):
+                call_command('calculer_reapprovisionnement', *arguments, stdout=StringIO())
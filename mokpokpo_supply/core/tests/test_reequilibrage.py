@@ -0,0 +1,123 @@
+from datetime import date, timedelta
+from io import StringIO
+
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.utils import timezone
+from scipy.optimize import linprog
+
+from core.lots import lots_disponibles
+from core.models import LigneLivraison, Livraison, Lot, MouvementStock, PrevisionDemande
+from core.reequilibrage import executer_reequilibrage, flot_cout_minimal, planifier_reequilibrage
+from core.testing import TestCaseIsole
+
+from . import outils
+
+
+class FlotCoutMinimalTest(SimpleTestCase):
+
+    def test_petit_reseau(self):
+        flots = flot_cout_minimal({'A': 5, 'B': 5}, {'C': 6}, {('A', 'C'): 1, ('B', 'C'): 3})
+        self.assertEqual(flots, {('A', 'C'): 5, ('B', 'C'): 1})
+
+    def test_arcs_absents_inutilisables(self):
+        flots = flot_cout_minimal({'A': 5}, {'C': 5, 'D': 5}, {('A', 'D'): 2})
+        self.assertEqual(flots, {('A', 'D'): 5})
+
+    def test_cout_optimal(self):
+        # Comparé à la programmation linéaire sur des instances aléatoires
+        rng = np.random.default_rng(0)
+        for essai in range(10):
+            offres = {f"o{i}": float(rng.integers(1, 30)) for i in range(3)}
+            demandes = {f"d{j}": float(rng.integers(1, 30)) for j in range(4)}
+            couts = {(o, d): float(rng.uniform(1, 100)) for o in offres for d in demandes}
+            arcs = list(couts)
+
+            flots = flot_cout_minimal(offres, demandes, couts)
+            quantite = min(sum(offres.values()), sum(demandes.values()))
+            self.assertAlmostEqual(sum(flots.values()), quantite)
+
+            contraintes = [[1.0 if a[0] == o else 0.0 for a in arcs] for o in offres]
+            contraintes += [[1.0 if a[1] == d else 0.0 for a in arcs] for d in demandes]
+            optimum = linprog(
+                [couts[a] for a in arcs],
+                A_ub=contraintes, b_ub=list(offres.values()) + list(demandes.values()),
+                A_eq=[[1.0] * len(arcs)], b_eq=[quantite],
+            )
+            with self.subTest(essai=essai):
+                self.assertAlmostEqual(sum(q * couts[a] for a, q in flots.items()), optimum.fun, places=4)
+
+
+class ReequilibrageTest(TestCaseIsole):
+    """
+    Lomé a des lots de 30, 20 et 10 sans demande ; Kara, loin au nord, 40 sans demande.
+    Tsévié (proche de Lomé) a besoin de 25 : 15 prévus et 10 en commande.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cafe = outils.produit('Café')
+        cls.lome, (empl_lome,) = outils.entrepot('Lomé', latitude=6.13, longitude=1.22)
+        cls.kara, (empl_kara,) = outils.entrepot('Kara', latitude=9.55, longitude=1.19)
+        cls.tsevie, (cls.reception,) = outils.entrepot('Tsévié', latitude=6.43, longitude=1.21)
+        cls.lots = {q: outils.lot(cls.cafe, empl_lome, q) for q in (30, 20, 10)}
+        cls.lot_kara = outils.lot(cls.cafe, empl_kara, 40)
+        demain = timezone.localdate() + timedelta(days=1)
+        for h in range(3):
+            PrevisionDemande.objects.create(
+                produit=cls.cafe, entrepot=cls.tsevie, quantite_prevue=5,
+                periode=(demain + timedelta(days=h)).isoformat(),
+            )
+        livraison = Livraison.objects.create(
+            numero='LIV-REEQ-1', grossiste=outils.utilisateur('GROSSISTE'), statut='PREPARATION',
+            date_livraison=date(2026, 11, 2), entrepot=cls.tsevie,
+        )
+        LigneLivraison.objects.create(livraison=livraison, produit=cls.cafe, quantite=10)
+
+    def test_plan(self):
+        propositions = planifier_reequilibrage()
+
+        # Plus gros lot tenant dans les 25 demandés, depuis l'entrepôt le plus proche
+        self.assertEqual([(p.lot_id, p.quantite) for p in propositions], [(self.lots[20].id, 20)])
+        p = propositions[0]
+        self.assertEqual((p.source_entrepot_id, p.destination_entrepot_id), (self.lome.id, self.tsevie.id))
+        self.assertEqual(p.destination_emplacement_id, self.reception.id)
+        self.assertAlmostEqual(p.distance, 33.4, delta=1)
+
+    def test_horizon(self):
+        # Un seul jour de prévision : besoin de 15, couvert par le lot de 10
+        self.assertEqual([p.lot_id for p in planifier_reequilibrage(horizon=1)], [self.lots[10].id])
+
+    def test_execution(self):
+        propositions = planifier_reequilibrage()
+        lots_disponibles(self.cafe.id, self.tsevie.id)
+        utilisateur = outils.utilisateur('STOCK')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            mouvements = executer_reequilibrage(propositions, utilisateur)
+
+        self.assertEqual(len(mouvements), 1)
+        transfert = MouvementStock.objects.get(type_mouvement='TRANSFERT')
+        self.assertEqual((transfert.lot_id, transfert.quantite, transfert.utilisateur), (self.lots[20].id, 20, utilisateur))
+        self.assertEqual(Lot.objects.get(pk=self.lots[20].pk).emplacement_id, self.reception.id)
+        self.assertEqual([l['id'] for l in lots_disponibles(self.cafe.id, self.tsevie.id)], [self.lots[20].id])
+        # Plan déjà appliqué : plus rien à faire
+        self.assertEqual(planifier_reequilibrage(), [])
+
+    def test_proposition_perimee_ignoree(self):
+        propositions = planifier_reequilibrage()
+        Lot.objects.filter(pk=self.lots[20].pk).update(quantite_restante=5)
+        self.assertEqual(executer_reequilibrage(propositions), [])
+        self.assertFalse(MouvementStock.objects.exists())
+
+    def test_commande(self):
+        sortie = StringIO()
+        call_command('reequilibrer_stocks', stdout=sortie)
+        self.assertIn(f"{self.lots[20].code_lot} : 20 de Lomé vers Tsévié", sortie.getvalue())
+        self.assertFalse(MouvementStock.objects.exists())
+
+        sortie = StringIO()
+        call_command('reequilibrer_stocks', '--executer', stdout=sortie)
+        self.assertIn("1 transfert(s) enregistré(s)", sortie.getvalue())
+        self.assertEqual(MouvementStock.objects.filter(type_mouvement='TRANSFERT').count(), 1)
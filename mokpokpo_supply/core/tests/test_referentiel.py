@@ -0,0 +1,84 @@
+from django.core.cache import cache
+
+from core import referentiel as module_referentiel
+from core.models import Produit
+from core.referentiel import ids_produits, invalider, referentiel, version_referentiel
+from core.testing import TestCaseIsole
+
+from . import outils
+
+
+class ReferentielTest(TestCaseIsole):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cafe = outils.produit('Café')
+        cls.nord, _ = outils.entrepot('Nord', emplacements=2)
+        cls.livreur = outils.utilisateur('LIVREUR')
+
+    def test_lecture_sans_requete_une_fois_chargee(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(referentiel('produits'), [self.cafe])
+        with self.assertNumQueries(0):
+            referentiel('produits')
+            self.assertEqual(ids_produits(), {self.cafe.id})
+
+    def test_copie_partagee_entre_processus(self):
+        referentiel('emplacements')
+        # Autre worker : cache mémoire vide, données lues dans le cache partagé
+        module_referentiel._local.clear()
+        with self.assertNumQueries(0):
+            emplacements = referentiel('emplacements')
+        self.assertEqual(len(emplacements), 2)
+        self.assertEqual(emplacements[0].entrepot.nom, 'Nord')
+
+    def test_invalidation_apres_commit(self):
+        referentiel('produits')
+        tampon = version_referentiel('produits')
+
+        with self.captureOnCommitCallbacks() as rappels:
+            cacao = outils.produit('Cacao', 'CACAO')
+            # Pas avant le commit : un autre worker rechargerait l'ancienne liste sous le nouveau tampon
+            self.assertEqual(version_referentiel('produits'), tampon)
+        for rappel in rappels:
+            rappel()
+
+        self.assertNotEqual(version_referentiel('produits'), tampon)
+        self.assertEqual(referentiel('produits'), [cacao, self.cafe])
+
+    def test_dependances(self):
+        referentiel('emplacements')
+        referentiel('livreurs')
+        tampons = version_referentiel('emplacements'), version_referentiel('livreurs')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.nord.nom = 'Nord-Est'
+            self.nord.save()
+        self.assertNotEqual(version_referentiel('emplacements'), tampons[0])
+        self.assertEqual(referentiel('emplacements')[0].entrepot.nom, 'Nord-Est')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.livreur.actif = False
+            self.livreur.save()
+        self.assertNotEqual(version_referentiel('livreurs'), tampons[1])
+        self.assertEqual(referentiel('livreurs'), [])
+
+    def test_connexion_n_invalide_pas(self):
+        referentiel('livreurs')
+        tampon = version_referentiel('livreurs')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.login(username=self.livreur.username, password='mot-de-passe-test')
+        self.assertEqual(version_referentiel('livreurs'), tampon)
+
+    def test_invalider(self):
+        referentiel('produits')
+        Produit.objects.filter(pk=self.cafe.pk).update(nom='Café vert')
+        self.assertEqual(referentiel('produits')[0].nom, 'Café')
+        invalider('produits')
+        self.assertEqual(referentiel('produits')[0].nom, 'Café vert')
+
+    def test_cache_partage_vide(self):
+        referentiel('produits')
+        cache.clear()
+        with self.assertNumQueries(1):
+            referentiel('produits')
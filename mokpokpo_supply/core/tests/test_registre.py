@@ -0,0 +1,113 @@
+import threading
+import time
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase
+from sklearn.ensemble import GradientBoostingRegressor
+
+from core.ia.predicteurs import PredicteurArbres, PredicteurLineaire
+from core.ia.registre import (
+    FICHIER_VERSION_ACTIVE, ModeleIndisponible, lister_versions, promouvoir_version, publier_version,
+)
+
+from . import outils
+
+
+class RegistreModeleTest(outils.RegistreTemporaireMixin, SimpleTestCase):
+
+    def publier(self, promouvoir=True, **kwargs):
+        modele, scaler = outils.modele_ajuste(**kwargs)
+        return publier_version(self.racine, modele, scaler, outils.FEATURES, {'mae': 1.0}, promouvoir=promouvoir)
+
+    def test_sans_modele(self):
+        with self.assertRaises(ModeleIndisponible):
+            self.registre.predicteur()
+        self.assertFalse(self.registre.etat()['pret'])
+
+    def test_version_publiee_et_servie(self):
+        version = self.publier()
+        predicteur, meta = self.registre.predicteur()
+
+        self.assertEqual(meta['version'], version)
+        self.assertEqual(meta['format'], 'lineaire')
+        self.assertEqual(meta['features'], outils.FEATURES)
+        self.assertIsInstance(predicteur, PredicteurLineaire)
+        modele, scaler = outils.modele_ajuste()
+        X, _ = outils.scenarios(20, graine=1)
+        np.testing.assert_allclose(predicteur.predict(X), modele.predict(scaler.transform(X)))
+
+    def test_export_controle_a_la_publication(self):
+        modele, scaler = outils.modele_ajuste(GradientBoostingRegressor(n_estimators=10, random_state=0))
+        X, _ = outils.scenarios(50, graine=2)
+        decale = lambda self, X: np.zeros(len(X)) + 1.0
+        with mock.patch.object(PredicteurArbres, 'predict', decale), self.assertLogs('core.ia.predicteurs', 'WARNING'):
+            promouvoir_version(self.racine, publier_version(self.racine, modele, scaler, outils.FEATURES, echantillon=X))
+
+        predicteur, meta = self.registre.predicteur()
+        self.assertEqual((meta['format'], meta['type_modele']), ('joblib', 'GradientBoostingRegressor'))
+        np.testing.assert_allclose(predicteur.predict(X), modele.predict(scaler.transform(X)))
+
+    def test_bascule_sur_la_version_promue(self):
+        premiere = self.publier()
+        self.registre.predicteur()
+        seconde = self.publier(promouvoir=False)
+        self.assertEqual(self.registre.predicteur()[1]['version'], premiere)
+
+        promouvoir_version(self.racine, seconde)
+        self.assertEqual(self.registre.predicteur()[1]['version'], seconde)
+        self.assertEqual([v['active'] for v in lister_versions(self.racine)], [True, False])
+
+    def test_intervalle_de_verification(self):
+        self.registre.intervalle = 3600
+        premiere = self.publier()
+        self.registre.predicteur()
+        promouvoir_version(self.racine, self.publier(promouvoir=False))
+        # Pas de stat() avant l'échéance
+        self.assertEqual(self.registre.predicteur()[1]['version'], premiere)
+
+    def test_version_illisible_garde_la_precedente(self):
+        premiere = self.publier()
+        self.registre.predicteur()
+        seconde = self.publier(promouvoir=False)
+        (self.racine / 'versions' / seconde / 'coef.npy').unlink()
+        promouvoir_version(self.racine, seconde)
+
+        with self.assertLogs('core.ia.registre', 'ERROR'):
+            self.assertEqual(self.registre.predicteur()[1]['version'], premiere)
+        self.assertIn('coef.npy', self.registre.etat()['erreur'])
+
+    def test_chargement_concurrent(self):
+        # Les threads arrivés pendant le premier chargement doivent l'attendre, pas repartir sans modèle
+        self.registre.intervalle = 3600
+        self.publier()
+        charger = PredicteurLineaire.charger
+
+        def charger_lentement(dossier):
+            time.sleep(0.2)
+            return charger(dossier)
+
+        depart = threading.Barrier(5)
+        resultats = []
+
+        def appeler():
+            depart.wait()
+            try:
+                resultats.append(self.registre.predicteur()[1]['format'])
+            except ModeleIndisponible as e:
+                resultats.append(e)
+
+        with mock.patch.object(PredicteurLineaire, 'charger', side_effect=charger_lentement) as simule:
+            threads = [threading.Thread(target=appeler) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(resultats, ['lineaire'] * 5)
+        self.assertEqual(simule.call_count, 1)
+
+    def test_pointeur_sur_version_absente(self):
+        (self.racine / FICHIER_VERSION_ACTIVE).write_text("inexistante\n")
+        with self.assertLogs('core.ia.registre', 'ERROR'), self.assertRaises(ModeleIndisponible):
+            self.registre.predicteur()
@@ -0,0 +1,73 @@
+import re
+from datetime import date
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from core.models import Compteur
+from core.sequences import AllocateurSequence
+
+
+class AllocateurSequenceTest(TransactionTestCase):
+    """Hors transaction : numéros distribués depuis un bloc réservé en mémoire."""
+
+    def test_format_des_numeros(self):
+        numeros = AllocateurSequence(taille_bloc=10).prochains_numeros('LIV', 2, date(2026, 3, 9))
+        self.assertEqual(numeros, ['LIV-20260309-000001', 'LIV-20260309-000002'])
+
+    def test_une_ecriture_par_bloc(self):
+        allocateur = AllocateurSequence(taille_bloc=10)
+        valeurs = [v for _ in range(7) for v in allocateur.prochaines_valeurs('LOT', 1)]
+        self.assertEqual(valeurs, list(range(1, 8)))
+        self.assertEqual(Compteur.objects.get(nom='LOT').valeur, 10)
+
+        # Reste du bloc insuffisant : abandonné (trou), un nouveau bloc est réservé
+        self.assertEqual(list(allocateur.prochaines_valeurs('LOT', 5)), [11, 12, 13, 14, 15])
+        self.assertEqual(Compteur.objects.get(nom='LOT').valeur, 20)
+
+    def test_demande_plus_grande_que_le_bloc(self):
+        allocateur = AllocateurSequence(taille_bloc=10)
+        self.assertEqual(len(set(allocateur.prochaines_valeurs('LOT', 25))), 25)
+        self.assertEqual(Compteur.objects.get(nom='LOT').valeur, 25)
+
+    def test_processus_concurrents_sans_doublon(self):
+        # Deux allocateurs simulent deux workers : blocs disjoints, trous possibles
+        a, b = AllocateurSequence(taille_bloc=5), AllocateurSequence(taille_bloc=5)
+        valeurs = []
+        for _ in range(12):
+            valeurs += a.prochaines_valeurs('LIV', 1)
+            valeurs += b.prochaines_valeurs('LIV', 2)
+        self.assertEqual(len(valeurs), len(set(valeurs)))
+
+    def test_increment_fait_par_la_base(self):
+        allocateur = AllocateurSequence(taille_bloc=10)
+        allocateur.prochaines_valeurs('LIV', 1)
+        # Un autre worker avance le compteur entre-temps : sa réservation est préservée
+        Compteur.objects.filter(nom='LIV').update(valeur=50)
+        with CaptureQueriesContext(connection) as requetes:
+            self.assertEqual(list(allocateur.prochaines_valeurs('LIV', 15)), list(range(51, 66)))
+        mises_a_jour = [q['sql'] for q in requetes if q['sql'].startswith('UPDATE')]
+        self.assertEqual(len(mises_a_jour), 1)
+        self.assertIn('"valeur" = ("core_compteur"."valeur" + ', mises_a_jour[0])
+
+    def test_compteurs_independants_par_prefixe(self):
+        allocateur = AllocateurSequence(taille_bloc=10)
+        self.assertEqual(list(allocateur.prochaines_valeurs('CAF', 1)), [1])
+        self.assertEqual(list(allocateur.prochaines_valeurs('CAC', 1)), [1])
+
+
+class AllocateurDansTransactionTest(TestCase):
+
+    def test_reservation_exacte_sans_bloc(self):
+        allocateur = AllocateurSequence(taille_bloc=100)
+        with transaction.atomic():
+            self.assertEqual(list(allocateur.prochaines_valeurs('LIV', 3)), [1, 2, 3])
+        self.assertEqual(Compteur.objects.get(nom='LIV').valeur, 3)
+        self.assertEqual(allocateur._blocs, {})
+
+    def test_numeros_uniques_et_lisibles(self):
+        numeros = AllocateurSequence().prochains_numeros('CAF', 50)
+        self.assertEqual(len(set(numeros)), 50)
+        for numero in numeros:
+            self.assertRegex(numero, re.compile(r'^CAF-\d{8}-\d{6}$'))
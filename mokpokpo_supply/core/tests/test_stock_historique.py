@@ -0,0 +1,100 @@
+from datetime import date, datetime, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import MouvementStock, MouvementStockArchive, SnapshotStock
+from core.stock_historique import creer_snapshot, soldes_au, stock_entrepot_au, stock_lot_au
+
+from . import outils
+
+
+def instant(jour, heure=12):
+    return timezone.make_aware(datetime.combine(jour, datetime.min.time()) + timedelta(hours=heure))
+
+
+class StockHistoriqueTest(TestCase):
+    """
+    Lot A : +100 le 1er mars dans le Nord, 30 transférés au Sud le 3, 20 sortis du Sud le 5.
+    Lot B : +50 le 2 mars au Sud, 10 sortis le 4.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        produit = outils.produit()
+        cls.nord, (cls.empl_nord,) = outils.entrepot('Nord')
+        cls.sud, (cls.empl_sud,) = outils.entrepot('Sud')
+        cls.lot_a = outils.lot(produit, cls.empl_nord)
+        cls.lot_b = outils.lot(produit, cls.empl_sud)
+        outils.mouvement(cls.lot_a, 'ENTREE', 100, instant(date(2026, 3, 1)), destination=cls.empl_nord)
+        outils.mouvement(cls.lot_b, 'ENTREE', 50, instant(date(2026, 3, 2)), destination=cls.empl_sud)
+        outils.mouvement(cls.lot_a, 'TRANSFERT', 30, instant(date(2026, 3, 3)), source=cls.empl_nord, destination=cls.empl_sud)
+        outils.mouvement(cls.lot_b, 'SORTIE', 10, instant(date(2026, 3, 4)), source=cls.empl_sud)
+        outils.mouvement(cls.lot_a, 'SORTIE', 20, instant(date(2026, 3, 5), 23), source=cls.empl_sud)
+
+    def attendus(self):
+        return {
+            date(2026, 2, 28): {},
+            date(2026, 3, 1): {(self.lot_a.id, self.nord.id): 100},
+            date(2026, 3, 3): {
+                (self.lot_a.id, self.nord.id): 70, (self.lot_a.id, self.sud.id): 30,
+                (self.lot_b.id, self.sud.id): 50,
+            },
+            date(2026, 3, 5): {
+                (self.lot_a.id, self.nord.id): 70, (self.lot_a.id, self.sud.id): 10,
+                (self.lot_b.id, self.sud.id): 40,
+            },
+        }
+
+    def test_soldes_depuis_les_mouvements(self):
+        for jour, soldes in self.attendus().items():
+            with self.subTest(jour=jour):
+                self.assertEqual(soldes_au(jour), soldes)
+
+    def test_instant_dans_la_journee(self):
+        # La sortie du 5 a lieu à 23 h
+        self.assertEqual(stock_lot_au(self.lot_a, instant(date(2026, 3, 5), 22)), 100)
+        self.assertEqual(stock_lot_au(self.lot_a, date(2026, 3, 5)), 80)
+        self.assertEqual(stock_entrepot_au(self.sud, date(2026, 3, 4)), {self.lot_a.id: 30, self.lot_b.id: 40})
+
+    def test_snapshots_identiques_aux_mouvements(self):
+        sans_snapshot = {jour: soldes_au(jour) for jour in self.attendus()}
+        jour = date(2026, 2, 28)
+        while jour <= date(2026, 3, 5):
+            creer_snapshot(jour)
+            jour += timedelta(days=1)
+        for jour, soldes in sans_snapshot.items():
+            with self.subTest(jour=jour):
+                self.assertEqual(soldes_au(jour), soldes)
+
+    def test_requete_partant_du_snapshot(self):
+        creer_snapshot(date(2026, 3, 3))
+        # Snapshot volontairement faussé : il est bien utilisé, sans relire les mouvements antérieurs
+        SnapshotStock.objects.filter(lot=self.lot_b).update(quantite=1000)
+        self.assertEqual(stock_lot_au(self.lot_b, date(2026, 3, 4)), 990)
+        self.assertEqual(stock_lot_au(self.lot_b, date(2026, 3, 3)), 1000)
+        # Avant le snapshot : recalcul depuis le début du journal
+        self.assertEqual(stock_lot_au(self.lot_b, date(2026, 3, 2)), 50)
+
+    def test_mouvements_archives_pris_en_compte(self):
+        mv = MouvementStock.objects.get(lot=self.lot_b, type_mouvement='ENTREE')
+        MouvementStockArchive.objects.create(
+            id=mv.id, lot=mv.lot, type_mouvement=mv.type_mouvement, quantite=mv.quantite,
+            destination_emplacement=mv.destination_emplacement, date=mv.date,
+        )
+        mv.delete()
+        self.assertEqual(stock_lot_au(self.lot_b, date(2026, 3, 5)), 40)
+
+    def test_commande_snapshot_stock(self):
+        sortie = StringIO()
+        call_command('snapshot_stock', '--depuis', '2026-03-01', '--date', '2026-03-05', stdout=sortie)
+        self.assertEqual(
+            sorted(SnapshotStock.objects.values_list('date', flat=True).distinct()),
+            [date(2026, 3, d) for d in range(1, 6)],
+        )
+        self.assertEqual(
+            sorted(SnapshotStock.objects.filter(date=date(2026, 3, 5)).values_list('lot_id', 'entrepot_id', 'quantite')),
+            sorted((lot, entrepot, q) for (lot, entrepot), q in self.attendus()[date(2026, 3, 5)].items()),
+        )
@@ -0,0 +1,64 @@
+from datetime import date, datetime, timezone as dt_timezone
+
+import numpy as np
+from django.test import TestCase
+
+from core.ia.model import ventes_journalieres
+from core.models import MouvementStock
+
+from . import outils
+
+
+def utc(jour, heure=12):
+    return datetime(2026, 3, jour, heure, tzinfo=dt_timezone.utc)
+
+
+class VentesJournalieresTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cafe = outils.produit('Café')
+        cls.cacao = outils.produit('Cacao', 'CACAO')
+        cls.nord, (cls.empl_nord,) = outils.entrepot('Nord')
+        cls.sud, (cls.empl_sud,) = outils.entrepot('Sud')
+        lot_cafe = outils.lot(cls.cafe, cls.empl_nord, 1000)
+        lot_cacao = outils.lot(cls.cacao, cls.empl_sud, 1000)
+        outils.mouvement(lot_cafe, 'SORTIE', 10, utc(1), source=cls.empl_nord)
+        outils.mouvement(lot_cafe, 'SORTIE', 5, utc(1, 23), source=cls.empl_nord)
+        outils.mouvement(lot_cafe, 'SORTIE', 7, utc(4), source=cls.empl_sud)
+        # Sans emplacement source : entrepôt de l'emplacement du lot
+        outils.mouvement(lot_cacao, 'SORTIE', 3, utc(2))
+        # Hors sorties : ignorés
+        outils.mouvement(lot_cafe, 'ENTREE', 500, utc(3), destination=cls.empl_nord)
+        outils.mouvement(lot_cafe, 'TRANSFERT', 50, utc(3), source=cls.empl_nord, destination=cls.empl_sud)
+
+    def test_par_produit(self):
+        series, premier_jour, quantites, presents = ventes_journalieres()
+
+        self.assertEqual(series, sorted([self.cafe.id, self.cacao.id]))
+        self.assertEqual(premier_jour, date(2026, 3, 1))
+        ligne = {p: i for i, p in enumerate(series)}
+        np.testing.assert_array_equal(quantites[ligne[self.cafe.id]], [15, 0, 0, 7])
+        np.testing.assert_array_equal(quantites[ligne[self.cacao.id]], [0, 3, 0, 0])
+        np.testing.assert_array_equal(presents[ligne[self.cafe.id]], [True, False, False, True])
+
+    def test_par_entrepot(self):
+        series, _, quantites, presents = ventes_journalieres(par_entrepot=True)
+
+        self.assertEqual(sorted(series), sorted([
+            (self.cafe.id, self.nord.id), (self.cafe.id, self.sud.id), (self.cacao.id, self.sud.id),
+        ]))
+        totaux = dict(zip(series, quantites.sum(axis=1).tolist()))
+        self.assertEqual(totaux[(self.cafe.id, self.nord.id)], 15)
+        self.assertEqual(totaux[(self.cafe.id, self.sud.id)], 7)
+        self.assertEqual(totaux[(self.cacao.id, self.sud.id)], 3)
+        self.assertEqual(presents.sum(), 3)
+
+    def test_une_seule_requete(self):
+        with self.assertNumQueries(1):
+            ventes_journalieres(par_entrepot=True)
+
+    def test_sans_sortie(self):
+        MouvementStock.objects.filter(type_mouvement='SORTIE').delete()
+        series, premier_jour, quantites, presents = ventes_journalieres()
+        self.assertEqual((series, premier_jour, quantites.shape, presents.shape), ([], None, (0, 0), (0, 0)))
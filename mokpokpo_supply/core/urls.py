@@ -17,12 +17,17 @@ urlpatterns = [
     path('dashboard/stock/', views.dashboard_stock, name='dashboard_stock'),
     path('dashboard/stock/add_lot/', views.add_lot, name='add_lot'),
     path('dashboard/stock/move_lot/', views.move_lot, name='move_lot'),
+    path('api/lots/disponibles/', views.api_lots_disponibles, name='api_lots_disponibles'),
     path('dashboard/stock/assign_lot/<int:livraison_id>/<int:ligne_id>/', views.assign_lot_and_livreur, name='assign_lot_to_livraison'),
 
     path('dashboard/grossiste/', views.grossiste_dashboard, name='dashboard_grossiste'),
     path('dashboard/grossiste/commander/', views.pass_order, name='pass_order'),
+    path('api/commandes/', views.api_commandes, name='api_commandes'),
 
     path('dashboard/gerant/', views.dashboard_gerant, name='dashboard_gerant'),
     path('dashboard/gerant/predictions/', views.gerant_predictions, name='gerant_predictions'),
+    path('dashboard/gerant/graphiques/<str:nom>.<str:format>', views.gerant_graphique, name='gerant_graphique'),
+    path('api/mouvements/', views.api_mouvements, name='api_mouvements'),
+    path('api/predictions/', views.api_predictions, name='api_predictions'),
 ]
 
@@ -11,11 +11,13 @@ def haversine(lat1, lon1, lat2, lon2):
 
 from .models import Entrepot
 
-def entrepot_le_plus_proche(utilisateur):
+def entrepot_le_plus_proche(utilisateur, entrepots=None):
+    # `entrepots` permet de réutiliser une liste déjà chargée pour plusieurs appels
     if utilisateur.latitude is None or utilisateur.longitude is None:
         return None
 
-    entrepots = Entrepot.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    if entrepots is None:
+        entrepots = Entrepot.objects.filter(latitude__isnull=False, longitude__isnull=False)
 
     meilleur = None
     distance_min = float('inf')
@@ -0,0 +1,45 @@
+"""
+Tampons de version dans le cache partagé.
+
+Chaque nom (un modèle, un jeu de référence...) a un tampon aléatoire qui
+change à chaque modification. Une clé de cache construite à partir des
+tampons devient caduque dès qu'une des données dont elle dépend change,
+sans avoir à connaître ni supprimer les anciennes clés.
+"""
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _cle(nom):
+    return f"version:{nom}"
+
+
+def version(*noms):
+    """Tampon combiné des noms donnés (créé au premier accès)."""
+    cles = [_cle(nom) for nom in noms]
+    trouves = cache.get_many(cles)
+    tampons = []
+    for cle in cles:
+        tampon = trouves.get(cle)
+        if tampon is None:
+            tampon = uuid.uuid4().hex
+            if not cache.add(cle, tampon, None):
+                tampon = cache.get(cle, tampon)
+        tampons.append(tampon)
+    return "-".join(tampons)
+
+
+def changer_version(*noms):
+    # Valeur unique : ne revient jamais à un tampon déjà utilisé
+    cache.set_many({_cle(nom): uuid.uuid4().hex for nom in noms}, None)
+
+
+def changer_version_apres_commit(*noms):
+    """
+    Change les tampons une fois la transaction validée : plus tôt, un autre
+    worker pourrait remettre en cache les anciennes données sous le nouveau tampon.
+    """
+    transaction.on_commit(lambda: changer_version(*noms))
+
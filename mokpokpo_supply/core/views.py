@@ -1,22 +1,45 @@
+import csv
+import hashlib
+import io
 import json
+import uuid
 from django.shortcuts import render, redirect
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
+from django.core.exceptions import RequestDataTooBig, ValidationError
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth import login
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 from django.contrib import messages
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.utils.functional import SimpleLazyObject
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag, urlencode
+from django.urls import reverse
 
 from .models import (
     Utilisateur, Role, Lot, Emplacement, MouvementStock,
     Produit, Livraison, LigneLivraison, Entrepot
 )
 from .forms import UtilisateurCreationForm
+from .decorators import role_requis
 
 from openrouteservice import Client
 from .tsp import solve_tsp
 from .utils import haversine
 from django.conf import settings
 from .utils import entrepot_le_plus_proche
+from .sequences import prochain_numero
+from .commandes import creer_commandes
+from .lots import lots_disponibles
+from .referentiel import referentiel
+from .mouvements import (
+    sources_mouvements, page_mouvements, mouvement_json, PageMouvementsDifferee,
+    TAILLE_PAGE_MOUVEMENTS
+)
+from .fragments import cle_fragment, cle_mouvements, duree_cache_fragments
 
 
 
@@ -73,26 +96,60 @@ def register_grossiste(request):
 
 @login_required
 def dashboard_stock(request):
-    lots = Lot.objects.filter(quantite_restante__gt=0).order_by('-date_production')
-    mouvements = MouvementStock.objects.all().order_by('-date')
-    emplacements = Emplacement.objects.all()
-    produits = Produit.objects.all()
-    livraisons = Livraison.objects.filter(statut='PREPARATION').order_by('date_livraison')
-    livreurs = Utilisateur.objects.filter(role__nom='LIVREUR', actif=True)
-    for livraison in livraisons:
-        livraison.entrepot_suggere = entrepot_le_plus_proche(livraison.grossiste)
-
+    lots = Lot.objects.filter(
+        quantite_restante__gt=0
+    ).select_related('produit', 'emplacement').order_by('-date_production')
+    # Évalués seulement si les fragments ne sont pas en cache
+    mouvements = PageMouvementsDifferee(sources_mouvements(request.GET))
+    emplacements = referentiel('emplacements')
+    produits = referentiel('produits')
+    livreurs = referentiel('livreurs')
+    entrepots = referentiel('entrepots')
+
+    def livraisons_en_preparation():
+        livraisons = list(Livraison.objects.filter(
+            statut='PREPARATION'
+        ).select_related('grossiste').prefetch_related(
+            'lignelivraison_set__produit'
+        ).order_by('date_livraison'))
+        entrepots_geo = [e for e in entrepots if e.latitude is not None and e.longitude is not None]
+        for livraison in livraisons:
+            livraison.entrepot_suggere = entrepot_le_plus_proche(livraison.grossiste, entrepots_geo)
+            # Lots proposés : ceux de l'entrepôt de la livraison, à défaut celui du magasinier
+            livraison.entrepot_lots = livraison.entrepot_id or request.user.entrepot_id
+        return livraisons
+
+    # Le fragment des livraisons contient des jetons CSRF : le secret doit
+    # exister avant de servir à construire la clé.
+    get_token(request)
 
     return render(request, 'dashboard_stock.html', {
         'lots': lots,
         'mouvements': mouvements,
+        'cle_mouvements': cle_mouvements(request.GET),
+        'cle_livraisons': cle_fragment('livraisons', request.META['CSRF_COOKIE']),
+        'duree_cache': duree_cache_fragments(),
+        'filtres': request.GET,
+        'types_mouvement': MouvementStock.TYPE_CHOICES,
+        'entrepots': entrepots,
         'emplacements': emplacements,
         'produits': produits,
-        'livraisons': livraisons,
+        'livraisons': SimpleLazyObject(livraisons_en_preparation),
         'livreurs': livreurs,
     })
 
 
+@role_requis("STOCK", "GERANT", api=True)
+def api_lots_disponibles(request):
+    """Options de lot pour une ligne de livraison : ?produit=ID[&entrepot=ID]."""
+    produit_id = request.GET.get('produit', '')
+    entrepot_id = request.GET.get('entrepot', '')
+    if not produit_id.isdigit() or (entrepot_id and not entrepot_id.isdigit()):
+        return JsonResponse({'error': "Paramètres invalides"}, status=400)
+
+    return JsonResponse({'lots': lots_disponibles(int(produit_id), int(entrepot_id) if entrepot_id else None)})
+
+
 @login_required
 def add_lot(request):
     if request.method == 'POST':
@@ -101,14 +158,24 @@ def add_lot(request):
         quantite = float(request.POST.get('quantite'))
         date_prod = request.POST.get('date_production')
 
-        Lot.objects.create(
-            code_lot=f"{produit.nom[:3].upper()}-{timezone.now().strftime('%Y%m%d%H%M%S')}",
+        lot = Lot.objects.create(
+            code_lot=prochain_numero(produit.nom[:3].upper()),
             produit=produit,
             quantite_initiale=quantite,
             quantite_restante=quantite,
             date_production=date_prod,
             emplacement=emplacement
         )
+
+        # Trace l'entrée en stock : le journal des mouvements doit suffire
+        # à reconstituer le stock à une date donnée
+        MouvementStock.objects.create(
+            lot=lot,
+            type_mouvement='ENTREE',
+            quantite=quantite,
+            destination_emplacement=emplacement,
+            utilisateur=request.user
+        )
     return redirect('dashboard_stock')
 
 
@@ -171,7 +238,7 @@ def assign_lot_and_livreur(request, livraison_id, ligne_id):
                 quantite=quantite,
                 source_emplacement=lot.emplacement,
                 destination_emplacement=None,
-                utilisateur=request.user if request.user.role.nom == "STOCK" else None,
+                utilisateur=request.user if request.user.role and request.user.role.nom == "STOCK" else None,
                 date=timezone.now()
             )
 
@@ -195,11 +262,8 @@ def assign_lot_and_livreur(request, livraison_id, ligne_id):
 from collections import defaultdict
 from django.utils.timezone import localdate
 
-@login_required
+@role_requis("LIVREUR")
 def dashboard_livreur(request):
-    if request.user.role.nom != "LIVREUR":
-        return redirect("index")
-
     livraisons = Livraison.objects.filter(
         livreur=request.user
     ).select_related("grossiste").order_by("date_livraison")
@@ -238,77 +302,151 @@ def livreur_marquer_livree(request, livraison_id):
     return redirect('dashboard_livreur')
 
 
-@login_required
+@role_requis("GROSSISTE")
 def grossiste_dashboard(request):
-    if not request.user.role or request.user.role.nom != "GROSSISTE":
-        return redirect('index')
-
-    produits = Produit.objects.all()
-    livraisons = Livraison.objects.filter(grossiste=request.user)
+    produits = referentiel('produits')
+    livraisons = Livraison.objects.filter(
+        grossiste=request.user
+    ).prefetch_related('lignelivraison_set__produit')
 
     return render(request, 'dashboard_grossiste.html', {
         'produits': produits,
         'livraisons': livraisons,
+        'cle_idempotence': uuid.uuid4().hex,
     })
 
 
-@login_required
+@role_requis("GROSSISTE")
 def pass_order(request):
-    if not request.user.role or request.user.role.nom != "GROSSISTE":
-        return redirect('index')
-
     if request.method == 'POST':
-        produit_id = request.POST.get('produit')
-        quantite = float(request.POST.get('quantite'))
-        date_livraison = request.POST.get('date_livraison')
-        notes = request.POST.get('notes', '')
+        produits = request.POST.getlist('produit')
+        quantites = request.POST.getlist('quantite')
+
+        commande = {
+            'date_livraison': request.POST.get('date_livraison'),
+            'cle_idempotence': request.POST.get('cle_idempotence'),
+            'lignes': [
+                {'produit': produit_id, 'quantite': quantite}
+                for produit_id, quantite in zip(produits, quantites)
+                if produit_id and quantite
+            ],
+        }
 
-        produit = Produit.objects.get(id=produit_id)
+        try:
+            creer_commandes(request.user, [commande])
+            messages.success(request, "Commande enregistrée")
+        except ValidationError as e:
+            messages.error(request, " ".join(e.messages))
 
-        numero = f"LIV-{timezone.now().strftime('%Y%m%d%H%M%S')}"
+        return redirect('dashboard_grossiste')
 
-        livraison = Livraison.objects.create(
-            numero=numero,
-            grossiste=request.user,
-            statut='PREPARATION',
-            date_livraison=date_livraison
-        )
+    return redirect('dashboard_grossiste')
 
-        LigneLivraison.objects.create(
-            livraison=livraison,
-            produit=produit,
-            quantite=quantite
-        )
 
-        return redirect('dashboard_grossiste')
+@role_requis("GROSSISTE", message="Accès réservé aux grossistes", api=True)
+@require_POST
+def api_commandes(request):
+    """
+    Création de commandes en lot (JSON).
 
-    return redirect('dashboard_grossiste')
+    Corps : {"commandes": [{"date_livraison": "AAAA-MM-JJ",
+                            "cle_idempotence": "...",
+                            "lignes": [{"produit": 1, "quantite": 50}, ...]}, ...]}
+    ou une seule commande ; l'en-tête Idempotency-Key sert alors de clé.
 
+    Authentification : session (avec jeton CSRF) ou `Authorization: Bearer <clé>`.
+    """
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'error': "JSON invalide"}, status=400)
 
-@login_required
-def dashboard_gerant(request):
-    if not request.user.role or request.user.role.nom != "GERANT":
-        return redirect('index')
+    if isinstance(payload, dict) and 'commandes' in payload:
+        commandes = payload['commandes']
+    else:
+        commandes = [payload]
+        cle = request.headers.get('Idempotency-Key')
+        if cle and isinstance(payload, dict):
+            payload.setdefault('cle_idempotence', cle)
+
+    try:
+        resultats = creer_commandes(request.user, commandes)
+    except ValidationError as e:
+        return JsonResponse({'error': " ".join(e.messages)}, status=400)
+
+    return JsonResponse({
+        'commandes': [
+            {
+                'id': livraison.id,
+                'numero': livraison.numero,
+                'cle_idempotence': livraison.cle_idempotence,
+                'creee': creee,
+            }
+            for livraison, creee in resultats
+        ]
+    }, status=201 if any(creee for _, creee in resultats) else 200)
 
-    mouvements = MouvementStock.objects.all().order_by('-date')
-    employes = Utilisateur.objects.filter(role__nom__in=['STOCK', 'LIVREUR']).order_by('role', 'nom')
+
+@role_requis("GERANT")
+def dashboard_gerant(request):
+    # Évalués seulement si les fragments ne sont pas en cache
+    mouvements = PageMouvementsDifferee(sources_mouvements(request.GET))
+    employes = Utilisateur.objects.filter(
+        role__nom__in=['STOCK', 'LIVREUR']
+    ).select_related('role').order_by('role', 'nom')
 
     return render(request, 'dashboard_gerant.html', {
+        'reapprovisionnement': niveaux_sous_seuil(),
+        'cle_reapprovisionnement': cle_fragment('reapprovisionnement'),
+        'tendances_prix': tendances_prix(),
+        'cle_prix': cle_fragment('prix'),
         'mouvements': mouvements,
+        'cle_mouvements': cle_mouvements(request.GET),
+        'cle_employes': cle_fragment('employes'),
+        'duree_cache': duree_cache_fragments(),
+        'filtres': request.GET,
+        'types_mouvement': MouvementStock.TYPE_CHOICES,
+        'entrepots': referentiel('entrepots'),
         'employes': employes
     })
 
 
-from core.ia.model import StockPredictor
+@role_requis("STOCK", "GERANT", api=True)
+def api_mouvements(request):
+    """Page suivante de l'historique des mouvements (défilement infini)."""
+    curseur = request.GET.get('curseur') or ''
+    taille = request.GET.get('taille', str(TAILLE_PAGE_MOUVEMENTS))
+    variantes = f"{cle_mouvements(request.GET)}:{curseur}:{taille}"
+    cle = "api_mouvements:" + hashlib.md5(variantes.encode(), usedforsecurity=False).hexdigest()
+    donnees = cache.get(cle)
+    if donnees is None:
+        try:
+            mouvements, suivant = page_mouvements(
+                sources_mouvements(request.GET),
+                curseur=curseur,
+                taille=int(taille),
+            )
+        except ValueError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        donnees = {
+            'mouvements': [mouvement_json(mv) for mv in mouvements],
+            'suivant': suivant,
+        }
+        cache.set(cle, donnees, duree_cache_fragments())
+
+    return JsonResponse(donnees)
+
+
+from core.ia.previsions import previsions_a_venir
+from core.ia.reapprovisionnement import niveaux_sous_seuil
+from core.ia.prix import tendances_prix
 from core.ia.ml_service import MLPredictionService
-from core.ia.charts import ChartGenerator
+from core.ia.registre import ModeleIndisponible
+from core.ia.charts import FORMATS as FORMATS_GRAPHIQUES, GRAPHIQUES, cle_graphique, graphique
 from .forms import MLPredictionForm
 
-@login_required
+@role_requis("GERANT")
 def gerant_predictions(request):
-    if not request.user.role or request.user.role.nom != "GERANT":
-        return redirect('index')
-
     # Initialiser le service ML
     ml_service = MLPredictionService()
     prediction_result = None
@@ -317,12 +455,10 @@ def gerant_predictions(request):
     feature_importance_chart = None
     seasonal_chart = None
 
-    # Générer les graphiques d'information
-    try:
-        feature_importance_chart = ChartGenerator.create_feature_importance_chart()
-        seasonal_chart = ChartGenerator.create_seasonal_trend_chart()
-    except Exception as e:
-        print(f"Erreur lors de la génération des graphiques: {e}")
+    # Les graphiques ne sont que des URL : rendus (ou lus en cache) par gerant_graphique
+    if ml_service.est_pret():
+        feature_importance_chart = reverse('gerant_graphique', args=['importance', 'png'])
+        seasonal_chart = reverse('gerant_graphique', args=['saisonnalite', 'png'])
 
     if request.method == 'POST':
         form = MLPredictionForm(request.POST)
@@ -342,30 +478,125 @@ def gerant_predictions(request):
             
             if prediction_result['success']:
                 messages.success(request, f"Prédiction réussie : {prediction_result['prediction_rounded']} tonnes")
-                
-                # Générer le graphique de prédiction
-                try:
-                    chart_image = ChartGenerator.create_prediction_chart(prediction_result, data)
-                except Exception as e:
-                    print(f"Erreur lors de la génération du graphique: {e}")
+                chart_image = (
+                    reverse('gerant_graphique', args=['prediction', 'png'])
+                    + '?' + urlencode(data)
+                )
             else:
                 messages.error(request, f"Erreur de prédiction : {prediction_result['error']}")
 
-    # Récupérer les anciennes prédictions pour compatibilité
-    predictor = StockPredictor()
-    old_predictions = predictor.predict_from_db()
+    # Prévisions précalculées par `manage.py calculer_previsions`
+    old_predictions = previsions_a_venir()
 
     return render(request, 'gerant_predictions_new.html', {
         'form': form,
         'prediction_result': prediction_result,
         'old_predictions': old_predictions,  # Garder pour compatibilité
         'feature_info': ml_service.get_feature_info(),
+        'cache_predictions': ml_service.statistiques_cache(),
         'chart_image': chart_image,
         'feature_importance_chart': feature_importance_chart,
         'seasonal_chart': seasonal_chart
     })
 
 
+@role_requis("GERANT", api=True)
+@require_POST
+def api_predictions(request):
+    """
+    Prédictions en lot, renvoyées en NDJSON au fur et à mesure du calcul.
+
+    Entrée, au choix :
+    - JSON : {"lignes": [{"superficie_totale": 10.5, ...}, ...]} ou la liste seule ;
+    - CSV : fichier `fichier` (multipart) ou corps text/csv, une colonne par feature.
+
+    Sortie : une ligne JSON par ligne d'entrée, dans l'ordre :
+    {"ligne": 0, "success": true, "prediction": 123.4} ou
+    {"ligne": 1, "success": false, "error": "..."}.
+
+    Authentification : session (avec jeton CSRF) ou `Authorization: Bearer <clé>`.
+    """
+    service = MLPredictionService()
+    meta = service.version_modele()
+    if meta is None:
+        return JsonResponse({'error': "Modèle non chargé"}, status=503)
+    colonnes = service.get_feature_info()['colonnes_attendues']
+
+    type_contenu = request.content_type or ''
+    try:
+        if 'fichier' in request.FILES or type_contenu == 'text/csv':
+            if 'fichier' in request.FILES:
+                texte = io.TextIOWrapper(request.FILES['fichier'].file, encoding='utf-8-sig')
+            else:
+                texte = io.StringIO(request.body.decode('utf-8-sig'))
+            lecteur = csv.DictReader(texte)
+            manquantes = [c for c in colonnes if c not in (lecteur.fieldnames or [])]
+            if manquantes:
+                return JsonResponse({'error': f"Colonne(s) manquante(s) : {', '.join(manquantes)}"}, status=400)
+            lignes = lecteur
+        else:
+            payload = json.loads(request.body)
+            lignes = payload.get('lignes') if isinstance(payload, dict) else payload
+            if not isinstance(lignes, list):
+                return JsonResponse({'error': "Liste de lignes attendue"}, status=400)
+    except RequestDataTooBig:
+        return JsonResponse({'error': "Requête trop volumineuse : envoyer un fichier CSV"}, status=413)
+    except (ValueError, UnicodeDecodeError):
+        return JsonResponse({'error': "JSON ou CSV invalide"}, status=400)
+
+    def resultats():
+        try:
+            for i, resultat in enumerate(service.predict_stream(lignes)):
+                if resultat['success']:
+                    ligne = {'ligne': i, 'success': True, 'prediction': resultat['prediction']}
+                else:
+                    ligne = {'ligne': i, 'success': False, 'error': resultat['error']}
+                yield json.dumps(ligne) + "\n"
+        except (csv.Error, UnicodeDecodeError) as e:
+            # Fichier corrompu en cours de lecture : dernière ligne en erreur
+            yield json.dumps({'success': False, 'error': f"CSV invalide : {e}"}) + "\n"
+
+    reponse = StreamingHttpResponse(resultats(), content_type='application/x-ndjson')
+    reponse['X-Modele-Version'] = meta['version']
+    return reponse
+
+
+@role_requis("GERANT")
+def gerant_graphique(request, nom, format):
+    """
+    Image d'un graphique de la page prévisions (PNG ou SVG). L'ETag dépend
+    de la version du modèle et des données : un navigateur qui a déjà
+    l'image reçoit un 304 sans rendu ni lecture du cache.
+    """
+    if nom not in GRAPHIQUES or format not in FORMATS_GRAPHIQUES:
+        raise Http404("Graphique inconnu")
+
+    donnees = None
+    if nom == 'prediction':
+        form = MLPredictionForm(request.GET)
+        if not form.is_valid():
+            return HttpResponseBadRequest("Paramètres de prédiction invalides")
+        donnees = form.cleaned_data
+
+    # Un seul accès au registre : l'ETag et l'image correspondent à la même version
+    try:
+        predicteur, meta = MLPredictionService().registre.predicteur()
+    except ModeleIndisponible:
+        return HttpResponse("Modèle non chargé", status=503)
+
+    etag = quote_etag(cle_graphique(nom, meta['version'], format, donnees))
+    reponse = get_conditional_response(request, etag=etag)
+    if reponse is None:
+        try:
+            contenu = graphique(nom, predicteur, meta, format, donnees)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        reponse = HttpResponse(contenu, content_type=FORMATS_GRAPHIQUES[format])
+    reponse['ETag'] = etag
+    patch_cache_control(reponse, private=True, max_age=duree_cache_fragments())
+    return reponse
+
+
 from django.contrib import messages
 from django.shortcuts import redirect, render
 from django.utils import timezone
@@ -373,13 +604,8 @@ from django.contrib.auth.decorators import login_required
 from openrouteservice import Client
 from collections import defaultdict
 
-@login_required
+@role_requis("LIVREUR", message="Accès réservé aux livreurs.")
 def optimiser_tournee_livreur(request):
-    # Vérifier que l'utilisateur a un rôle et qu'il est bien un LIVREUR
-    if not hasattr(request.user, 'role') or not request.user.role or request.user.role.nom != "LIVREUR":
-        messages.error(request, "Accès réservé aux livreurs.")
-        return redirect("index")
-
     date_cible = request.GET.get("date", timezone.now().date())
 
     # 1️⃣ Livraisons du jour
@@ -503,13 +729,8 @@ def optimiser_tournee_livreur(request):
     return redirect("detail_tournee")
 
 
-@login_required
+@role_requis("LIVREUR", message="Accès réservé aux livreurs.")
 def detail_tournee(request):
-    # Vérifier que l'utilisateur a un rôle et qu'il est bien un LIVREUR
-    if not hasattr(request.user, 'role') or not request.user.role or request.user.role.nom != "LIVREUR":
-        messages.error(request, "Accès réservé aux livreurs.")
-        return redirect("index")
-    
     # Récupérer les données de la session
     date_optimisation = request.session.get("date_optimisation")
     distance_totale = request.session.get("distance_totale")
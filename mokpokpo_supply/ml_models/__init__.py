@@ -1 +0,0 @@
-# Package pour les modèles ML
@@ -42,9 +42,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.BudgetRequetesMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.BackendSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -81,9 +83,30 @@ DATABASES = {
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
+# Cache partagé entre les workers gunicorn (données de référence, lots
+# disponibles...). Remplacer par RedisCache si plusieurs serveurs.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+# Durée de vie (s) des fragments de template des tableaux de bord ; ils sont
+# surtout invalidés par les tampons de version (voir core/fragments.py)
+DUREE_CACHE_FRAGMENTS = 600
+
 # modèle utilisateur personnalisé
 AUTH_USER_MODEL = 'core.Utilisateur'
 
+# Charge le rôle avec l'utilisateur. Un seul backend : login() n'a pas à le
+# préciser ; les sessions ouvertes avec ModelBackend sont reprises par
+# core.middleware.BackendSessionMiddleware
+AUTHENTICATION_BACKENDS = [
+    'core.backends.UtilisateurRoleBackend',
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -129,3 +152,32 @@ STATICFILES_DIRS = [
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Numérotation des lots et livraisons : nombre de numéros réservés
+# en base à chaque accès au compteur (voir core/sequences.py)
+SEQUENCE_TAILLE_BLOC = 100
+
+# Nombre de mois de mouvements gardés dans la table principale ;
+# les plus anciens sont archivés par `manage.py archiver_mouvements`
+MOUVEMENTS_RETENTION_MOIS = 12
+
+# Budget de requêtes SQL par requête HTTP (core/middleware.py) : au-delà,
+# un avertissement est journalisé. Budgets spécifiques par nom de vue.
+BUDGET_REQUETES_SQL = 30
+BUDGETS_REQUETES_SQL_PAR_VUE = {}
+# Ajoute les en-têtes X-SQL-Requetes / X-SQL-Temps-ms même sans DEBUG
+SQL_ENTETES_DEBUG = False
+
+# Modèle de prévision des ventes (core/ia/registre.py) : dossier des
+# artefacts et délai minimal (s) entre deux vérifications des fichiers
+ML_MODELS_DIR = BASE_DIR.parent / 'ml_models'
+ML_VERIFICATION_INTERVALLE = 30
+# Cache des prédictions unitaires (core/ia/cache_predictions.py), par processus :
+# nombre d'entrées et durée de vie (s)
+ML_CACHE_PREDICTIONS_TAILLE = 4096
+ML_CACHE_PREDICTIONS_DUREE = 3600
+
+# Réapprovisionnement (core/ia/reapprovisionnement.py) : délai de livraison
+# d'un réassort (jours) et niveau de service visé pour le stock de sécurité
+DELAI_REAPPRO_JOURS = 7
+NIVEAU_SERVICE_REAPPRO = 0.95